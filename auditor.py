@@ -1,19 +1,18 @@
+import argparse
+import json
 import os
 import sys
 import io
+import itertools
 
 # Configurar codificación UTF-8 para Windows
 if sys.platform == 'win32':
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
     sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
 
-from modules.evaluator import strength_score, classify, is_common_password
-from modules.crack_time import estimate_crack_time, format_time
-from modules.report import generate_report
-from modules.pattern_detector import detect_patterns, calculate_entropy, get_charset_info
-from modules.recommendations import get_recommendations, get_strength_emoji
-from modules.password_generator import generate_password, generate_passphrase
-from modules.pwned_checker import check_pwned_password, format_pwned_result
+# Al arrancar solo se importa la biblioteca estándar: cada acción importa los
+# módulos que usa (el análisis, los reportes, HIBP, el multiproceso, SQLite,
+# asyncio...), así que `--help` o `generate` no cargan nada de lo demás
 
 # Colores para terminal (compatible con Windows)
 try:
@@ -46,71 +45,43 @@ def print_banner():
 """
     print(banner)
 
-def load_common_passwords():
-    """Carga la lista de contraseñas comunes"""
-    try:
-        with open("data/common-passwords.txt", "r", encoding="utf8") as f:
-            return [line.strip().lower() for line in f if line.strip()]
-    except FileNotFoundError:
+DEFAULT_WORDLISTS = ["data/common-passwords.txt"]
+DEFAULT_PWNED_STORE = "data/pwned-passwords.bin"
+
+# Códigos de salida del modo no interactivo
+EXIT_OK = 0
+EXIT_ERROR = 1
+EXIT_FINDINGS = 2
+EXIT_INTERRUPTED = 130
+
+# Wordlists ya abiertas, para no recargarlas en cada acción del menú
+_wordlists = {}
+
+def resolve_wordlist_paths(paths=None):
+    """Retorna las wordlists existentes de `paths` (o las de por defecto)"""
+    paths = tuple(path for path in (paths or DEFAULT_WORDLISTS) if os.path.exists(path))
+    if not paths:
         print(f"{YELLOW}[WARN] No se encontró el archivo de contraseñas comunes{RESET}")
-        return []
-
-def analyze_password(password, wordlist):
-    """Analiza una contraseña y retorna un diccionario con todos los resultados"""
-    
-    # Análisis básico
-    score = strength_score(password)
-    classification = classify(score)
-    
-    # Tiempo de crackeo
-    crack_seconds = estimate_crack_time(password)
-    crack_time_readable = format_time(crack_seconds)
-    
-    # Verificar si es común
-    is_common = is_common_password(password, wordlist)
-    
-    # Verificar contra Have I Been Pwned
-    is_pwned, pwned_count = check_pwned_password(password)
-    pwned_message = format_pwned_result(is_pwned, pwned_count)
-    
-    # Detectar patrones
-    patterns = detect_patterns(password)
-    
-    # Calcular entropía
-    entropy = calculate_entropy(password)
-    
-    # Información de charset
-    charset_types = get_charset_info(password)
-    
-    # Ajustar clasificación si es común, pwned o tiene muchos patrones
-    if is_common or is_pwned:
-        classification = "Muy Débil"
-        score = min(score, 1)
-    elif len(patterns) >= 3:
-        classification = "Débil"
-        score = min(score, 3)
-    
-    # Generar recomendaciones
-    recommendations = get_recommendations(password, score, patterns, is_common or is_pwned)
-    
-    return {
-        "password": password,
-        "score": score,
-        "nivel": classification,
-        "estimado_crack_segundos": int(crack_seconds),
-        "tiempo_crack_legible": crack_time_readable,
-        "comun": is_common,
-        "pwned": is_pwned,
-        "pwned_count": pwned_count,
-        "pwned_message": pwned_message,
-        "patrones": patterns,
-        "entropia": entropy,
-        "charset_types": charset_types,
-        "recomendaciones": recommendations
-    }
+    return paths
+
+def load_common_passwords(paths=None):
+    """
+    Carga las listas de contraseñas comunes como índices compilados
+
+    Cada archivo de texto se compila a un índice .idx mapeado en memoria la
+    primera vez que se usa; también se aceptan índices .idx ya compilados.
+    """
+    from modules.wordlist_index import open_wordlists
+    
+    paths = resolve_wordlist_paths(paths)
+    if paths not in _wordlists:
+        _wordlists[paths] = open_wordlists(paths)
+    return _wordlists[paths]
 
 def print_analysis_result(result):
     """Imprime el resultado del análisis de forma visual"""
+    from modules.crack_time import ATTACKER_PROFILES
+    from modules.recommendations import get_strength_emoji
     
     emoji = get_strength_emoji(result['nivel'])
     
@@ -133,14 +104,24 @@ def print_analysis_result(result):
     print(f"\n{BOLD}📊 Evaluación:{RESET}")
     print(f"  {emoji} Nivel: {color}{BOLD}{result['nivel']}{RESET}")
     print(f"  📈 Puntuación: {result['score']}/10")
+    if result.get('log2_rango_modelo') is not None:
+        print(f"  🎲 Rango según el modelo entrenado: ~2^{result['log2_rango_modelo']:.0f} intentos")
     print(f"  🔢 Entropía: {result['entropia']} bits")
     print(f"  ⏱️  Tiempo estimado de crackeo: {BOLD}{result['tiempo_crack_legible']}{RESET}")
     
+    if result.get('tiempos_crack'):
+        for profile, readable in result['tiempos_crack'].items():
+            print(f"      - {ATTACKER_PROFILES[profile][0]}: {readable}")
+    
     if result['charset_types']:
         print(f"  🔤 Tipos de caracteres: {', '.join(result['charset_types'])}")
     
     if result['comun']:
-        print(f"  {RED}{BOLD}[!] ALERTA: Contraseña encontrada en listas comunes{RESET}")
+        sources = f" ({', '.join(result['listas'])})" if result.get('listas') else ""
+        print(f"  {RED}{BOLD}[!] ALERTA: Contraseña encontrada en listas comunes{sources}{RESET}")
+        if result.get('variante_comun'):
+            variant = result['variante_comun']
+            print(f"      Variante de '{variant['palabra']}': {', '.join(variant['transformaciones'])}")
     
     # Mostrar resultado de Have I Been Pwned
     if result.get('pwned_count', -1) != -1:
@@ -149,6 +130,15 @@ def print_analysis_result(result):
         else:
             print(f"  {GREEN}[OK] {result['pwned_message']}{RESET}")
     
+    # Políticas (--policy): una línea por política con las reglas incumplidas
+    if result.get('politicas'):
+        print(f"\n{BOLD}📋 Políticas:{RESET}")
+        for name, failed in result['politicas'].items():
+            if failed:
+                print(f"  {RED}[X] {name}: no cumple {', '.join(failed)}{RESET}")
+            else:
+                print(f"  {GREEN}[OK] {name}{RESET}")
+    
     if result['patrones']:
         print(f"\n{BOLD}Patrones detectados:{RESET}")
         for pattern in result['patrones']:
@@ -163,6 +153,9 @@ def print_analysis_result(result):
 
 def analyze_single_password():
     """Modo interactivo para analizar una sola contraseña"""
+    from modules.analyzer import analyze_password
+    from modules.report import generate_report
+    
     print(f"\n{BOLD}{BLUE}=== Análisis de Contraseña Individual ==={RESET}\n")
     
     password = input(f"{BOLD}Ingresa la contraseña a analizar: {RESET}")
@@ -182,6 +175,10 @@ def analyze_single_password():
 
 def analyze_batch_passwords():
     """Analiza múltiples contraseñas desde entrada manual"""
+    from modules.analyzer import analyze_passwords
+    from modules.recommendations import get_strength_emoji
+    from modules.report import generate_report
+    
     print(f"\n{BOLD}{BLUE}=== Análisis por Lotes ==={RESET}\n")
     print("Ingresa las contraseñas (una por línea). Escribe 'FIN' para terminar:\n")
     
@@ -198,14 +195,12 @@ def analyze_batch_passwords():
         return
     
     wordlist = load_common_passwords()
-    results = []
     
     print(f"\n{BOLD}Analizando {len(passwords)} contraseñas...{RESET}\n")
     
-    for pwd in passwords:
-        result = analyze_password(pwd, wordlist)
-        results.append(result)
-        
+    results = analyze_passwords(passwords, wordlist)
+    
+    for pwd, result in zip(passwords, results):
         # Resumen corto
         emoji = get_strength_emoji(result['nivel'])
         print(f"{emoji} {pwd:30s} → {result['nivel']:15s} | {result['tiempo_crack_legible']}")
@@ -224,34 +219,40 @@ def analyze_from_file():
         print(f"{RED}Error: El archivo '{filename}' no existe{RESET}")
         return
     
-    try:
-        with open(filename, 'r', encoding='utf-8') as f:
-            passwords = [line.strip() for line in f if line.strip()]
-    except Exception as e:
-        print(f"{RED}Error al leer el archivo: {e}{RESET}")
-        return
-    
-    if not passwords:
+    print(f"\n{BOLD}Analizando contraseñas del archivo...{RESET}\n")
+    
+    from modules.batch_engine import BatchEngine
+    from modules.recommendations import get_strength_emoji
+    from modules.report import ReportWriter
+    
+    # El análisis se reparte entre todos los núcleos y los reportes se escriben
+    # a medida que llegan los resultados. No se guarda nada en disco fuera de
+    # los reportes: el almacén reanudable es opcional (audit --store)
+    engine = BatchEngine(resolve_wordlist_paths())
+    with ReportWriter("audit_report.csv", "audit_report.html",
+                      output_summary="audit_summary.html") as writer:
+        try:
+            for result in engine.run(iter_input_passwords([filename])):
+                emoji = get_strength_emoji(result['nivel'])
+                print(f"{emoji} {result['password']:30s} → {result['nivel']:15s} | {result['tiempo_crack_legible']}")
+                writer.write(result)
+        except KeyboardInterrupt:
+            print(f"\n{YELLOW}Análisis interrumpido: se generan los reportes con lo analizado{RESET}")
+        except Exception as e:
+            print(f"{RED}Error al leer el archivo: {e}{RESET}")
+    
+    if not writer.count:
         print(f"{RED}El archivo no contiene contraseñas{RESET}")
         return
     
-    wordlist = load_common_passwords()
-    results = []
-    
-    print(f"\n{BOLD}Analizando {len(passwords)} contraseñas del archivo...{RESET}\n")
-    
-    for pwd in passwords:
-        result = analyze_password(pwd, wordlist)
-        results.append(result)
-        
-        emoji = get_strength_emoji(result['nivel'])
-        print(f"{emoji} {pwd:30s} → {result['nivel']:15s} | {result['tiempo_crack_legible']}")
-    
-    print(f"\n{BOLD}Generando reportes...{RESET}")
-    generate_report(results)
+    print(f"\n{BOLD}Reportes generados:{RESET}")
+    writer.print_summary()
 
 def generate_secure_password():
     """Genera contraseñas seguras"""
+    from modules.analyzer import analyze_password
+    from modules.password_generator import generate_password, generate_passphrase
+    
     print(f"\n{BOLD}{BLUE}=== Generador de Contraseñas Seguras ==={RESET}\n")
     
     print("Selecciona el tipo de contraseña:")
@@ -294,6 +295,10 @@ def generate_secure_password():
 
 def run_demo():
     """Ejecuta una demostración con contraseñas de ejemplo"""
+    from modules.analyzer import analyze_passwords
+    from modules.recommendations import get_strength_emoji
+    from modules.report import generate_report
+    
     print(f"\n{BOLD}{BLUE}=== Modo Demostración ==={RESET}\n")
     
     demo_passwords = [
@@ -308,14 +313,12 @@ def run_demo():
     ]
     
     wordlist = load_common_passwords()
-    results = []
     
     print(f"{BOLD}Analizando {len(demo_passwords)} contraseñas de ejemplo...{RESET}\n")
     
-    for pwd in demo_passwords:
-        result = analyze_password(pwd, wordlist)
-        results.append(result)
-        
+    results = analyze_passwords(demo_passwords, wordlist)
+    
+    for pwd, result in zip(demo_passwords, results):
         emoji = get_strength_emoji(result['nivel'])
         print(f"{emoji} {pwd:35s} → {result['nivel']:15s} | {result['tiempo_crack_legible']}")
     
@@ -341,8 +344,18 @@ def show_menu():
 
 def main():
     """Función principal con menú interactivo"""
+    from modules.hibp_cache import DEFAULT_CACHE_DIR
+    from modules.pwned_checker import use_offline_store, use_range_cache
+    
     print_banner()
     
+    # Usar el almacén HIBP offline si fue compilado
+    if os.path.exists(DEFAULT_PWNED_STORE):
+        use_offline_store(DEFAULT_PWNED_STORE)
+        print(f"{GREEN}[OK] Verificación HIBP offline: {DEFAULT_PWNED_STORE}{RESET}")
+    else:
+        use_range_cache(DEFAULT_CACHE_DIR)
+    
     while True:
         show_menu()
         choice = input(f"{BOLD}Selecciona una opción: {RESET}")
@@ -368,7 +381,566 @@ def main():
         # Limpiar pantalla (opcional)
         # os.system('cls' if os.name == 'nt' else 'clear')
 
+def iter_input_passwords(paths):
+    """Itera las contraseñas de varios archivos (una por línea, '-' para stdin)"""
+    for path in paths:
+        if path == '-':
+            lines = sys.stdin
+        else:
+            lines = open(path, 'r', encoding='utf-8', errors='replace')
+        try:
+            for line in lines:
+                line = line.strip()
+                if line:
+                    yield line
+        finally:
+            if lines is not sys.stdin:
+                lines.close()
+
+def configure_hibp(args):
+    """Configura la verificación HIBP según las opciones de línea de comandos"""
+    from modules.pwned_checker import use_offline_store, use_range_cache, configure_client
+    
+    if args.hibp_offline:
+        use_offline_store(args.hibp_offline, fallback_only=args.hibp_offline_fallback)
+    elif os.path.exists(DEFAULT_PWNED_STORE) and not args.hibp_online:
+        use_offline_store(DEFAULT_PWNED_STORE)
+    
+    use_range_cache(None if args.no_hibp_cache else args.hibp_cache)
+    configure_client(max_in_flight=args.hibp_concurrency)
+
+def print_progress(count):
+    """Contador de progreso en stderr"""
+    print(f"\r[...] {count:,} contraseñas analizadas", end="", file=sys.stderr, flush=True)
+
+def enable_metrics(args):
+    """Activa la instrumentación si se pidió --profile o --metrics-file"""
+    from modules import metrics
+    
+    if args.profile or args.metrics_file:
+        return metrics.enable()
+    return None
+
+def report_metrics(args, registry, result_cache=None):
+    """Muestra (--profile) y guarda (--metrics-file) las métricas de la ejecución"""
+    from modules.pwned_checker import hibp_counters
+    
+    counters = hibp_counters()
+    if result_cache is not None:
+        counters["result_cache_hits"] = result_cache.hits
+        counters["result_cache_misses"] = result_cache.misses
+    for name, value in counters.items():
+        registry.increment(name, value)
+    
+    if args.profile:
+        print(f"\n{registry.summary()}", file=sys.stderr)
+    if args.metrics_file:
+        registry.write_prometheus(args.metrics_file)
+        print(f"[OK] Métricas guardadas en: {args.metrics_file}", file=sys.stderr)
+
+def report_policies(summary):
+    """Resumen por política (--policy) al final de una auditoría"""
+    if summary is not None:
+        for line in summary.lines():
+            print(f"[POLÍTICA] {line}", file=sys.stderr)
+
+def run_audit(args):
+    """Auditoría no interactiva de archivos de contraseñas"""
+    from modules.aggregates import LEVELS
+    from modules.audit_store import AuditStore, analysis_fingerprint, source_fingerprint
+    from modules.batch_engine import BatchEngine
+    from modules.hibp_cache import DEFAULT_TTL as HIBP_TTL
+    from modules.password_model import get_model
+    from modules.policy import PolicySummary
+    from modules.pwned_checker import pwned_source
+    from modules.report import ReportWriter
+    
+    for path in args.inputs:
+        if path != '-' and not os.path.exists(path):
+            print(f"Error: El archivo '{path}' no existe", file=sys.stderr)
+            return EXIT_ERROR
+    
+    registry = enable_metrics(args)
+    if not args.no_hibp:
+        configure_hibp(args)
+    
+    # Con --store los resultados se guardan en SQLite y la auditoría se puede reanudar
+    store = None
+    passwords = iter_input_passwords(args.inputs)
+    wordlist_paths = resolve_wordlist_paths(args.wordlist)
+    if args.store:
+        # Los resultados guardados solo se reutilizan con la misma configuración;
+        # los datos de la API de HIBP, además, solo mientras no vencen
+        description, offline_path, online = pwned_source()
+        model = get_model()
+        settings = analysis_fingerprint(wordlist_paths, check_pwned=not args.no_hibp,
+                                        compute_entropy=not args.no_entropy,
+                                        model_path=model.path if model else None,
+                                        hibp_source=(description, offline_path))
+        max_age = HIBP_TTL if online and not args.no_hibp else None
+        store = AuditStore(args.store, keep_passwords=args.store_passwords)
+        skipped = store.begin(source_fingerprint(args.inputs), settings, max_age)
+        if skipped:
+            print(f"[INFO] Reanudando la auditoría: se omiten {skipped:,} filas ya analizadas",
+                  file=sys.stderr)
+            passwords = itertools.islice(passwords, skipped, None)
+    
+    engine = BatchEngine(wordlist_paths, workers=args.workers,
+                         chunk_size=args.batch_size, ordered=args.order == "input",
+                         check_pwned=not args.no_hibp, compute_entropy=not args.no_entropy,
+                         progress=print_progress if args.progress else None,
+                         cache_size=args.dedup_cache, store=store, model_path=args.model)
+    
+    # Sin almacén los resultados van directo a los reportes: la memoria no crece con el archivo
+    threshold = LEVELS.index(args.fail_on)
+    total = findings = 0
+    exit_code = None
+    policies = args.policies
+    policy_summary = PolicySummary(policies.names) if policies else None
+    outputs = (args.csv, args.html, args.json) if store is None else ()
+    summary = args.summary if store is None else None
+    try:
+        with ReportWriter(*outputs, output_summary=summary) as writer:
+            try:
+                for result in engine.run(passwords):
+                    if policies:
+                        result = policies.annotate(result)
+                        policy_summary.add(result['politicas'])
+                    if not args.quiet:
+                        print(f"{result['nivel']}\t{result['score']}\t{result['password']}")
+                    writer.write(result)
+                    total += 1
+                    if LEVELS.index(result['nivel']) <= threshold:
+                        findings += 1
+            except KeyboardInterrupt:
+                # Conservar y reportar lo analizado hasta el momento
+                print(f"\n[WARN] Interrumpido: se conservan {total} resultados", file=sys.stderr)
+                exit_code = EXIT_INTERRUPTED
+        if args.progress:
+            print(file=sys.stderr)
+        
+        if store is not None:
+            if exit_code is None:
+                store.finish()
+            # Los reportes salen del almacén (incluyen lo analizado antes de una interrupción):
+            # una fila por contraseña distinta con el total de ocurrencias
+            total = findings = 0
+            policy_summary = PolicySummary(policies.names) if policies else None
+            with ReportWriter(args.csv, args.html, args.json, output_summary=args.summary) as writer:
+                for result in store.iter_results():
+                    if policies:
+                        result = policies.annotate(result)
+                        policy_summary.add(result['politicas'], result['ocurrencias'])
+                    writer.write(result, result['ocurrencias'])
+                    total += result['ocurrencias']
+                    if LEVELS.index(result['nivel']) <= threshold:
+                        findings += result['ocurrencias']
+    finally:
+        if store is not None:
+            store.close()
+    
+    if args.csv or args.html or args.json or args.summary:
+        writer.print_summary()
+    
+    print(f"[OK] {total} contraseñas auditadas, {findings} con nivel {args.fail_on} o inferior",
+          file=sys.stderr)
+    report_policies(policy_summary)
+    if registry:
+        report_metrics(args, registry, engine.cache)
+    if exit_code is not None:
+        return exit_code
+    return EXIT_FINDINGS if findings else EXIT_OK
+
+def run_audit_hashes(args):
+    """Auditoría de volcados de hashes: se resuelven contra las wordlists y se analizan"""
+    from modules.aggregates import LEVELS
+    from modules.batch_engine import BatchEngine
+    from modules.hash_index import parse_hash_line, resolve_hashes
+    from modules.policy import PolicySummary
+    from modules.pwned_checker import check_pwned_hashes
+    from modules.report import ReportWriter
+    
+    for path in args.inputs:
+        if path != '-' and not os.path.exists(path):
+            print(f"Error: El archivo '{path}' no existe", file=sys.stderr)
+            return EXIT_ERROR
+    
+    registry = enable_metrics(args)
+    if not args.no_hibp:
+        configure_hibp(args)
+    
+    entries = []
+    invalid = 0
+    for line in iter_input_passwords(args.inputs):
+        entry = parse_hash_line(line, args.algorithm)
+        if entry is None:
+            invalid += 1
+        else:
+            entries.append(entry)
+    if invalid:
+        print(f"[WARN] Se ignoraron {invalid:,} líneas sin un hash reconocible", file=sys.stderr)
+    
+    # Una pasada por algoritmo y wordlist sobre los hashes distintos del volcado
+    wordlist_paths = resolve_wordlist_paths(args.wordlist)
+    resolved = resolve_hashes(entries, wordlist_paths)
+    matches = []
+    unresolved = []
+    for user, hex_hash, candidates in entries:
+        for algorithm in candidates:
+            password = resolved.get((algorithm, hex_hash))
+            if password is not None:
+                matches.append((user, hex_hash, algorithm, password))
+                break
+        else:
+            unresolved.append((user, hex_hash, candidates))
+    
+    engine = BatchEngine(wordlist_paths, workers=args.workers, chunk_size=args.batch_size,
+                         check_pwned=not args.no_hibp, compute_entropy=not args.no_entropy,
+                         progress=print_progress if args.progress else None,
+                         cache_size=args.dedup_cache, model_path=args.model)
+    
+    # Las contraseñas resueltas pasan por el análisis normal, en el orden del volcado
+    threshold = LEVELS.index(args.fail_on)
+    total = findings = 0
+    exit_code = None
+    policy_summary = PolicySummary(args.policies.names) if args.policies else None
+    with ReportWriter(args.csv, args.html, args.json, output_summary=args.summary) as writer:
+        try:
+            results = engine.run(password for _, _, _, password in matches)
+            for (user, hex_hash, algorithm, _), result in zip(matches, results):
+                row = dict(result, usuario=user, hash=hex_hash, algoritmo=algorithm)
+                if args.policies:
+                    row['politicas'] = args.policies.check(row)
+                    policy_summary.add(row['politicas'])
+                if not args.quiet:
+                    print(f"{row['nivel']}\t{row['score']}\t{user}\t{row['password']}")
+                writer.write(row)
+                total += 1
+                if LEVELS.index(row['nivel']) <= threshold:
+                    findings += 1
+        except KeyboardInterrupt:
+            print(f"\n[WARN] Interrumpido: se conservan {total} resultados", file=sys.stderr)
+            exit_code = EXIT_INTERRUPTED
+    if args.progress:
+        print(file=sys.stderr)
+    
+    # Los SHA-1 sin resolver se pueden verificar igual en HIBP (el hash es lo que se consulta)
+    pwned = {}
+    if not args.no_hibp and exit_code is None:
+        sha1_hashes = list(dict.fromkeys(hex_hash for _, hex_hash, candidates in unresolved
+                                         if "sha1" in candidates))
+        for hex_hash, (is_pwned, count) in zip(sha1_hashes, check_pwned_hashes(sha1_hashes)):
+            if is_pwned:
+                pwned[hex_hash] = count
+    unresolved_pwned = sum(1 for _, hex_hash, _ in unresolved if hex_hash in pwned)
+    findings += unresolved_pwned
+    
+    if args.unresolved:
+        with open(args.unresolved, 'w', encoding='utf-8') as f:
+            for user, hex_hash, candidates in unresolved:
+                fields = [user, hex_hash, "/".join(candidates)]
+                if hex_hash in pwned:
+                    fields.append(str(pwned[hex_hash]))
+                f.write(":".join(fields) + "\n")
+        print(f"[OK] Hashes no resueltos guardados en: {args.unresolved}", file=sys.stderr)
+    
+    if args.csv or args.html or args.json or args.summary:
+        writer.print_summary()
+    
+    print(f"[OK] {len(entries)} hashes: {len(matches)} resueltos ({findings - unresolved_pwned} con nivel "
+          f"{args.fail_on} o inferior), {len(unresolved)} sin resolver ({unresolved_pwned} en HIBP)",
+          file=sys.stderr)
+    report_policies(policy_summary)
+    if registry:
+        report_metrics(args, registry, engine.cache)
+    if exit_code is not None:
+        return exit_code
+    return EXIT_FINDINGS if findings else EXIT_OK
+
+def run_check(args):
+    """Analiza una sola contraseña y muestra el resultado"""
+    from modules.aggregates import LEVELS
+    from modules.analyzer import analyze_password
+    
+    registry = enable_metrics(args)
+    if not args.no_hibp:
+        configure_hibp(args)
+    wordlist = load_common_passwords(args.wordlist)
+    result = analyze_password(args.password, wordlist, check_pwned=not args.no_hibp,
+                              compute_entropy=not args.no_entropy)
+    if args.policies:
+        result = args.policies.annotate(result)
+    if args.json_output:
+        print(json.dumps(result, ensure_ascii=False))
+    else:
+        print_analysis_result(result)
+    if registry:
+        report_metrics(args, registry)
+    return EXIT_FINDINGS if LEVELS.index(result['nivel']) <= LEVELS.index(args.fail_on) else EXIT_OK
+
+def run_generate(args):
+    """Genera contraseñas sin cargar wordlists de auditoría ni configurar HIBP"""
+    from modules.password_generator import (PasswordPolicy, PassphrasePolicy, RandomSource, chi_square_uniformity,
+                                           write_generated)
+    
+    if args.passphrase:
+        policy = PassphrasePolicy(args.passphrase, wordlist=args.passphrase_wordlist)
+        description = f"passphrase de {args.passphrase} palabras ({len(policy.wordlist):,} en la lista)"
+    else:
+        policy = PasswordPolicy(args.length, use_symbols=not args.no_symbols)
+        description = f"{policy.length} caracteres de un alfabeto de {len(policy.alphabet)}"
+    
+    if args.verify:
+        if args.passphrase:
+            print("Error: --verify solo aplica a contraseñas de caracteres", file=sys.stderr)
+            return EXIT_ERROR
+        statistic, df, critical = chi_square_uniformity(policy, args.verify)
+        verdict = "uniforme" if statistic <= critical else "NO uniforme"
+        print(f"chi² = {statistic:.1f} con {df} grados de libertad (crítico al 0,1%: {critical:.1f}): {verdict}")
+        return EXIT_OK if statistic <= critical else EXIT_FINDINGS
+    
+    if args.entropy or args.output:
+        print(f"[INFO] Política: {description}; entropía exacta {policy.entropy():.2f} bits", file=sys.stderr)
+    if args.output:
+        write_generated(args.output, policy, args.count)
+        print(f"[OK] {args.count:,} contraseñas guardadas en: {args.output}", file=sys.stderr)
+    else:
+        for password in policy.generate(RandomSource(), args.count):
+            print(password)
+    return EXIT_OK
+
+def run_serve(args):
+    """Servicio local de análisis: carga todo una vez y atiende requests HTTP"""
+    from modules import audit_server
+    
+    registry = enable_metrics(args)
+    if not args.no_hibp:
+        configure_hibp(args)
+    
+    def ready(address):
+        print(f"[OK] Servidor de auditoría escuchando en {address} (Ctrl-C para detener)", file=sys.stderr)
+    
+    # Las opciones no indicadas toman los valores por defecto de audit_server.serve
+    options = {"host": args.host, "port": args.port, "batch_size": args.batch_size,
+               "max_concurrency": args.max_concurrency, "max_pending": args.max_pending,
+               "batch_window": args.batch_window_ms / 1000 if args.batch_window_ms is not None else None}
+    try:
+        audit_server.serve(resolve_wordlist_paths(args.wordlist), unix_path=args.unix, ready=ready,
+                           check_pwned=not args.no_hibp, compute_entropy=not args.no_entropy,
+                           **{name: value for name, value in options.items() if value is not None})
+    except KeyboardInterrupt:
+        print("\n[OK] Servidor detenido", file=sys.stderr)
+    except OSError as e:
+        print(f"Error: No se pudo iniciar el servidor: {e}", file=sys.stderr)
+        return EXIT_ERROR
+    if registry:
+        report_metrics(args, registry)
+    return EXIT_OK
+
+def run_build_index(args):
+    """Compila una wordlist (ver modules.wordlist_index)"""
+    from modules.wordlist_index import main as wordlist_index_main
+    return wordlist_index_main(args.extra) or EXIT_OK
+
+def run_build_hibp(args):
+    """Compila el almacén HIBP offline (ver modules.pwned_offline)"""
+    from modules.pwned_offline import main as pwned_offline_main
+    return pwned_offline_main(args.extra) or EXIT_OK
+
+def run_build_hash_index(args):
+    """Precalcula los hashes de una wordlist (ver modules.hash_index)"""
+    from modules.hash_index import main as hash_index_main
+    return hash_index_main(args.extra) or EXIT_OK
+
+def run_train_model(args):
+    """Entrena el modelo de Markov/PCFG (ver modules.password_model)"""
+    from modules.password_model import main as password_model_main
+    return password_model_main(args.extra) or EXIT_OK
+
+def run_policy(args):
+    """Evalúa políticas sobre un reporte JSON Lines (ver modules.policy)"""
+    from modules.policy import main as policy_main
+    return policy_main(args.extra) or EXIT_OK
+
+def run_benchmark(args):
+    """Benchmarks (ver modules.benchmark)"""
+    from modules.benchmark import main as benchmark_main
+    return benchmark_main(args.extra)
+
+def build_parser():
+    """Construye el parser de la línea de comandos"""
+    # Solo constantes de módulos que no importan nada fuera de la biblioteca estándar
+    from modules.aggregates import LEVELS
+    from modules.hash_index import ALGORITHMS as HASH_ALGORITHMS
+    from modules.hibp_cache import DEFAULT_CACHE_DIR
+    from modules.password_generator import PASSPHRASE_WORDLIST
+    from modules.result_cache import DEFAULT_MAX_ENTRIES
+    
+    parser = argparse.ArgumentParser(
+        prog="auditor.py",
+        description="Password Auditor. Sin argumentos inicia el menú interactivo.",
+        epilog="Códigos de salida: 0 sin hallazgos, 1 error, 2 contraseñas con nivel --fail-on o inferior")
+    subparsers = parser.add_subparsers(dest="command")
+    
+    analysis = argparse.ArgumentParser(add_help=False)
+    analysis.add_argument("--wordlist", action="append", metavar="RUTA",
+                          help="Wordlist .txt o índice .idx (repetible; por defecto data/common-passwords.txt)")
+    analysis.add_argument("--no-hibp", action="store_true", help="Omitir la verificación contra HIBP")
+    analysis.add_argument("--no-entropy", action="store_true", help="Omitir el cálculo de entropía")
+    analysis.add_argument("--hibp-offline", metavar="RUTA", help="Almacén HIBP offline (modules.pwned_offline)")
+    analysis.add_argument("--hibp-offline-fallback", action="store_true",
+                          help="Usar el almacén offline solo cuando la API falla")
+    analysis.add_argument("--hibp-online", action="store_true",
+                          help=f"No usar {DEFAULT_PWNED_STORE} aunque exista")
+    analysis.add_argument("--hibp-cache", default=DEFAULT_CACHE_DIR, metavar="DIR",
+                          help="Carpeta de la caché de rangos HIBP")
+    analysis.add_argument("--no-hibp-cache", action="store_true", help="Desactivar la caché de rangos HIBP")
+    analysis.add_argument("--hibp-concurrency", type=int, default=8, metavar="N",
+                          help="Peticiones HIBP simultáneas (por defecto 8)")
+    analysis.add_argument("--fail-on", choices=LEVELS, default="Débil",
+                          help="Nivel a partir del cual el código de salida es 2 (por defecto Débil)")
+    analysis.add_argument("--model", metavar="RUTA",
+                          help="Modelo de Markov/PCFG (por defecto data/password-model.bin, si existe)")
+    analysis.add_argument("--profile", action="store_true",
+                          help="Mostrar al final el tiempo por etapa y los contadores")
+    analysis.add_argument("--metrics-file", metavar="RUTA",
+                          help="Guardar las métricas en formato de texto de Prometheus")
+    
+    batch = argparse.ArgumentParser(add_help=False)
+    batch.add_argument("--csv", metavar="RUTA", help="Reporte CSV")
+    batch.add_argument("--html", metavar="RUTA", help="Reporte HTML")
+    batch.add_argument("--json", metavar="RUTA", help="Reporte JSON Lines")
+    batch.add_argument("--summary", metavar="RUTA",
+                       help="Resumen agregado de tamaño fijo (HTML, o JSON si termina en .json)")
+    batch.add_argument("--workers", type=int, default=None,
+                       help="Procesos de análisis (por defecto uno por núcleo)")
+    batch.add_argument("--batch-size", type=int, default=1000,
+                       help="Contraseñas por bloque de trabajo y de consultas HIBP (por defecto 1000)")
+    batch.add_argument("--dedup-cache", type=int, default=DEFAULT_MAX_ENTRIES, metavar="N",
+                       help="Contraseñas distintas que se recuerdan para no repetir el análisis "
+                            f"(por defecto {DEFAULT_MAX_ENTRIES:,})")
+    batch.add_argument("--policy", metavar="RUTA",
+                       help="Archivo JSON de políticas: agrega 'politicas' a cada fila y un resumen "
+                            "por política (ver modules.policy)")
+    batch.add_argument("--progress", action="store_true", help="Mostrar un contador de progreso")
+    batch.add_argument("-q", "--quiet", action="store_true", help="No imprimir una línea por contraseña")
+    
+    audit = subparsers.add_parser("audit", parents=[analysis, batch], help="Auditar archivos de contraseñas")
+    audit.add_argument("inputs", nargs="+", help="Archivos con una contraseña por línea ('-' para stdin)")
+    audit.add_argument("--store", metavar="RUTA",
+                       help="Base SQLite donde guardar los resultados; permite reanudar una "
+                            "auditoría interrumpida y reutilizar resultados anteriores obtenidos "
+                            "con la misma configuración")
+    audit.add_argument("--store-passwords", action="store_true",
+                       help="Guardar en el almacén las contraseñas en texto plano (por defecto solo su hash)")
+    audit.add_argument("--order", choices=["input", "stream"], default="input",
+                       help="Resultados en el orden de entrada o a medida que terminan")
+    audit.set_defaults(handler=run_audit)
+    
+    audit_hashes = subparsers.add_parser("audit-hashes", parents=[analysis, batch],
+                                         help="Auditar volcados de hashes NTLM, SHA-1 o MD5 sin sal")
+    audit_hashes.add_argument("inputs", nargs="+",
+                              help="Archivos con HASH, usuario:HASH o líneas de pwdump ('-' para stdin)")
+    audit_hashes.add_argument("--algorithm", choices=HASH_ALGORITHMS,
+                              help="Algoritmo de los hashes (por defecto se deduce de la longitud)")
+    audit_hashes.add_argument("--unresolved", metavar="RUTA",
+                              help="Guardar los hashes no resueltos (usuario:hash:algoritmo[:apariciones HIBP])")
+    audit_hashes.set_defaults(handler=run_audit_hashes)
+    
+    check = subparsers.add_parser("check", parents=[analysis], help="Analizar una contraseña")
+    check.add_argument("password", help="Contraseña a analizar")
+    check.add_argument("--json", dest="json_output", action="store_true", help="Salida en JSON")
+    check.add_argument("--policy", metavar="RUTA", help="Archivo JSON de políticas a verificar")
+    check.set_defaults(handler=run_check)
+    
+    generate = subparsers.add_parser("generate", help="Generar contraseñas seguras (una o miles)")
+    generate.add_argument("-l", "--length", type=int, default=16, help="Longitud (por defecto 16, mínimo 8)")
+    generate.add_argument("--no-symbols", action="store_true", help="Solo letras y números")
+    generate.add_argument("--passphrase", type=int, metavar="PALABRAS",
+                          help="Generar passphrases con esta cantidad de palabras")
+    generate.add_argument("--passphrase-wordlist", default=PASSPHRASE_WORDLIST, metavar="RUTA",
+                          help="Lista de palabras (diceware o una por línea; por defecto la de la EFF)")
+    generate.add_argument("-c", "--count", type=int, default=1, help="Cantidad a generar (por defecto 1)")
+    generate.add_argument("-o", "--output", metavar="RUTA", help="Escribir las contraseñas en un archivo")
+    generate.add_argument("--entropy", action="store_true", help="Mostrar la entropía exacta de la política")
+    generate.add_argument("--verify", type=int, metavar="N",
+                          help="Generar N contraseñas y verificar que los caracteres sean uniformes (chi²)")
+    generate.set_defaults(handler=run_generate)
+    
+    serve = subparsers.add_parser("serve", parents=[analysis],
+                                  help="Servicio local de análisis por HTTP (ver modules.audit_server)")
+    serve.add_argument("--host", help="Dirección de escucha (por defecto 127.0.0.1)")
+    serve.add_argument("--port", type=int, help="Puerto (por defecto 8765; 0 = uno libre)")
+    serve.add_argument("--unix", metavar="RUTA", help="Escuchar en un socket Unix en lugar de TCP")
+    serve.add_argument("--batch-size", type=int,
+                       help="Máximo de contraseñas de distintos requests analizadas juntas (por defecto 64)")
+    serve.add_argument("--batch-window-ms", type=float, metavar="MS",
+                       help="Espera para completar un lote (por defecto 0: solo lo que ya está en cola)")
+    serve.add_argument("--max-concurrency", type=int,
+                       help="Lotes en curso a la vez, consultas HIBP en paralelo (por defecto 4)")
+    serve.add_argument("--max-pending", type=int,
+                       help="Contraseñas en espera antes de responder 503 (por defecto 10.000)")
+    serve.set_defaults(handler=run_serve)
+    
+    build_index = subparsers.add_parser("build-index", add_help=False,
+                                        help="Compilar una wordlist (ver modules.wordlist_index)")
+    build_index.set_defaults(handler=run_build_index)
+    
+    build_hibp = subparsers.add_parser("build-hibp", add_help=False,
+                                       help="Compilar el almacén HIBP offline (ver modules.pwned_offline)")
+    build_hibp.set_defaults(handler=run_build_hibp)
+    
+    build_hashes = subparsers.add_parser("build-hash-index", add_help=False,
+                                         help="Precalcular los hashes de una wordlist (ver modules.hash_index)")
+    build_hashes.set_defaults(handler=run_build_hash_index)
+    
+    train_model = subparsers.add_parser("train-model", add_help=False,
+                                        help="Entrenar el modelo de Markov/PCFG (ver modules.password_model)")
+    train_model.set_defaults(handler=run_train_model)
+    
+    policy = subparsers.add_parser("policy", add_help=False,
+                                   help="Evaluar políticas sobre un reporte JSON Lines ya generado "
+                                        "(ver modules.policy)")
+    policy.set_defaults(handler=run_policy)
+    
+    benchmark = subparsers.add_parser("benchmark", add_help=False,
+                                      help="Medir el rendimiento de cada etapa (ver modules.benchmark)")
+    benchmark.set_defaults(handler=run_benchmark)
+    
+    return parser
+
+def run_cli(argv):
+    """Punto de entrada no interactivo; retorna el código de salida"""
+    parser = build_parser()
+    args, extra = parser.parse_known_args(argv)
+    if args.command in ("build-index", "build-hibp", "build-hash-index", "train-model", "policy", "benchmark"):
+        args.extra = extra
+    elif extra:
+        parser.error(f"argumentos no reconocidos: {' '.join(extra)}")
+    if getattr(args, "model", None):
+        from modules.password_model import use_model
+        try:
+            use_model(args.model)
+        except (OSError, ValueError) as e:
+            print(f"Error: No se pudo abrir el modelo: {e}", file=sys.stderr)
+            return EXIT_ERROR
+    args.policies = None
+    if getattr(args, "policy", None):
+        from modules.policy import load_policies
+        try:
+            args.policies = load_policies(args.policy)
+        except (OSError, ValueError) as e:
+            print(f"Error: No se pudo cargar la política: {e}", file=sys.stderr)
+            return EXIT_ERROR
+    return args.handler(args)
+
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        try:
+            sys.exit(run_cli(sys.argv[1:]))
+        except KeyboardInterrupt:
+            sys.exit(EXIT_INTERRUPTED)
+    
     try:
         main()
     except KeyboardInterrupt:
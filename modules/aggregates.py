@@ -0,0 +1,257 @@
+import html
+import json
+import math
+from datetime import datetime
+
+LEVELS = ["Muy Débil", "Débil", "Media", "Fuerte", "Muy Fuerte"]
+
+# Tramos de apariciones en HIBP (mismos umbrales que format_pwned_result)
+PWNED_BUCKETS = [
+    ("Sin verificar", None),
+    ("No encontrada", 0),
+    ("BAJO (1-1.000)", 1_000),
+    ("MEDIO (1.001-10.000)", 10_000),
+    ("ALTO (10.001-100.000)", 100_000),
+    ("MUY ALTO (100.001-1.000.000)", 1_000_000),
+    ("CRITICO (> 1.000.000)", math.inf),
+]
+
+QUANTILES = (0.1, 0.25, 0.5, 0.75, 0.9, 0.99)
+
+
+def pwned_bucket(count):
+    """Índice del tramo de PWNED_BUCKETS para un pwned_count"""
+    if count is None or count < 0:
+        return 0
+    for i, (_, upper) in enumerate(PWNED_BUCKETS[1:], start=1):
+        if count <= upper:
+            return i
+    return len(PWNED_BUCKETS) - 1
+
+
+def reused_rows(result, weight=1):
+    """
+    Filas de un resultado que repiten una contraseña ya vista
+
+    Con `weight` > 1 el resultado representa varias filas (una por
+    ocurrencia) y todas salvo la primera son repeticiones; si no, es una
+    fila cuya 'ocurrencias' indica las apariciones hasta ese punto.
+    """
+    if weight > 1:
+        return weight - 1
+    return 1 if result.get('ocurrencias', 1) > 1 else 0
+
+
+def pattern_type(pattern):
+    """Tipo de un patrón sin el detalle: 'Palabra común (admin)' -> 'Palabra común'"""
+    return pattern.split(" (", 1)[0]
+
+
+class StreamingHistogram:
+    """
+    Histograma de ancho fijo con media, desviación y cuantiles en línea
+
+    Usa `bins` intervalos de ancho `width` desde 0 (los valores mayores van al
+    último), de modo que la memoria no depende de cuántos valores se agregan.
+    Los cuantiles se interpolan dentro del intervalo, con error acotado por
+    `width` (con `discrete=True`, para valores enteros, son exactos). La
+    media y la varianza usan el método de Welford con pesos.
+    """
+
+    def __init__(self, width, bins, discrete=False):
+        self.width = width
+        self.discrete = discrete
+        self.counts = [0] * bins
+        self.total = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+
+    def add(self, value, weight=1):
+        index = min(int(max(value, 0) / self.width), len(self.counts) - 1)
+        self.counts[index] += weight
+        self.total += weight
+        delta = value - self.mean
+        self.mean += delta * weight / self.total
+        self._m2 += weight * delta * (value - self.mean)
+        self.minimum = min(self.minimum, value)
+        self.maximum = max(self.maximum, value)
+
+    @property
+    def stddev(self):
+        return math.sqrt(self._m2 / self.total) if self.total else 0.0
+
+    def quantile(self, q):
+        if not self.total:
+            return None
+        target = q * self.total
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if count and seen + count >= target:
+                if self.discrete:
+                    value = i * self.width
+                else:
+                    value = (i + (target - seen) / count) * self.width
+                return min(max(value, self.minimum), self.maximum)
+            seen += count
+        return self.maximum
+
+    def to_dict(self):
+        if not self.total:
+            return {"count": 0}
+        return {
+            "count": self.total,
+            "mean": round(self.mean, 2),
+            "stddev": round(self.stddev, 2),
+            "min": self.minimum,
+            "max": self.maximum,
+            "quantiles": {f"p{round(q * 100)}": round(self.quantile(q), 2) for q in QUANTILES},
+        }
+
+
+class AuditSummary:
+    """
+    Estadísticas agregadas de una auditoría en memoria constante
+
+    Se actualiza con cada resultado en O(1): histogramas de puntuación y
+    nivel, distribuciones de entropía y longitud con cuantiles, frecuencia de
+    cada tipo de patrón, tramos de apariciones en HIBP y contraseñas comunes.
+    `weight` permite contar un resultado varias veces (una fila por
+    contraseña distinta con su número de ocurrencias).
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.scores = [0] * 11
+        self.levels = dict.fromkeys(LEVELS, 0)
+        self.entropy = StreamingHistogram(width=0.5, bins=512)
+        self.length = StreamingHistogram(width=1, bins=257, discrete=True)
+        self.patterns = {}
+        self.pwned = [0] * len(PWNED_BUCKETS)
+        self.common = 0
+        self.reused = 0
+
+    def add(self, result, weight=1):
+        self.total += weight
+        self.scores[min(max(result.get('score', 0), 0), 10)] += weight
+        nivel = result.get('nivel')
+        if nivel in self.levels:
+            self.levels[nivel] += weight
+        if result.get('entropia') is not None:
+            self.entropy.add(result['entropia'], weight)
+        # Los resultados de una base de auditoría sin contraseñas traen 'longitud'
+        self.length.add(result.get('longitud', len(result.get('password', ''))), weight)
+        for kind in {pattern_type(pattern) for pattern in result.get('patrones', ())}:
+            self.patterns[kind] = self.patterns.get(kind, 0) + weight
+        self.pwned[pwned_bucket(result.get('pwned_count'))] += weight
+        if result.get('comun'):
+            self.common += weight
+        self.reused += reused_rows(result, weight)
+
+    def to_dict(self):
+        return {
+            "total": self.total,
+            "distinct": self.total - self.reused,
+            "reused": self.reused,
+            "common": self.common,
+            "levels": self.levels,
+            "scores": {str(score): count for score, count in enumerate(self.scores)},
+            "entropy": self.entropy.to_dict(),
+            "length": self.length.to_dict(),
+            "patterns": dict(sorted(self.patterns.items(), key=lambda item: -item[1])),
+            "pwned": {label: count for (label, _), count in zip(PWNED_BUCKETS, self.pwned)},
+        }
+
+    def write_json(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+
+    def render_html(self):
+        """Reporte resumido: su tamaño no depende de la cantidad de contraseñas"""
+        data = self.to_dict()
+        sections = [
+            _bar_table("Niveles", data["levels"], self.total),
+            _bar_table("Puntuación", data["scores"], self.total),
+            _bar_table("Tipos de patrón", data["patterns"], self.total),
+            _bar_table("Apariciones en HIBP", data["pwned"], self.total),
+            _distribution("Entropía (bits)", data["entropy"]),
+            _distribution("Longitud (caracteres)", data["length"]),
+        ]
+        cards = [
+            (f"{self.total:,}", "Contraseñas analizadas"),
+            (f"{self.total - self.reused:,}", "Contraseñas distintas"),
+            (f"{self.common:,}", "Contraseñas comunes"),
+            (f"{self.reused:,}", "Filas repetidas"),
+        ]
+        return SUMMARY_HTML.format(
+            timestamp=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            cards="\n".join(f'<div class="card"><h3>{value}</h3><p>{label}</p></div>'
+                            for value, label in cards),
+            sections="\n".join(sections),
+        )
+
+    def write_html(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.render_html())
+
+
+def _bar_table(title, counts, total):
+    rows = []
+    for label, count in counts.items():
+        share = count / total if total else 0
+        rows.append(f'<tr><td>{html.escape(str(label))}</td><td class="num">{count:,}</td>'
+                    f'<td class="num">{share:.1%}</td>'
+                    f'<td><div class="bar" style="width: {share * 100:.1f}%"></div></td></tr>')
+    body = "\n".join(rows) or '<tr><td colspan="4">Sin datos</td></tr>'
+    return f'<section><h2>{html.escape(title)}</h2><table>{body}</table></section>'
+
+
+def _distribution(title, stats):
+    if not stats["count"]:
+        return f'<section><h2>{html.escape(title)}</h2><p>Sin datos</p></section>'
+    rows = [("Media", stats["mean"]), ("Desviación", stats["stddev"]),
+            ("Mínimo", stats["min"]), ("Máximo", stats["max"])]
+    rows += list(stats["quantiles"].items())
+    body = "\n".join(f'<tr><td>{label}</td><td class="num">{value}</td></tr>' for label, value in rows)
+    return f'<section><h2>{html.escape(title)}</h2><table>{body}</table></section>'
+
+
+SUMMARY_HTML = """<!DOCTYPE html>
+<html lang="es">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Password Audit Summary</title>
+    <style>
+        body {{ font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; background: #f8f9fa; margin: 0; padding: 20px; }}
+        .container {{ max-width: 1200px; margin: 0 auto; background: white; border-radius: 20px; box-shadow: 0 20px 60px rgba(0,0,0,0.15); overflow: hidden; }}
+        .header {{ background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 30px; text-align: center; }}
+        .cards {{ display: grid; grid-template-columns: repeat(auto-fit, minmax(200px, 1fr)); gap: 20px; padding: 30px; }}
+        .card {{ background: #f8f9fa; padding: 20px; border-radius: 10px; text-align: center; }}
+        .card h3 {{ color: #667eea; font-size: 2em; margin: 0 0 5px; }}
+        .card p {{ color: #666; margin: 0; }}
+        .sections {{ display: grid; grid-template-columns: repeat(auto-fit, minmax(450px, 1fr)); gap: 20px; padding: 0 30px 30px; }}
+        section h2 {{ color: #333; font-size: 1.2em; }}
+        table {{ width: 100%; border-collapse: collapse; }}
+        td {{ padding: 4px 8px; border-bottom: 1px solid #e9ecef; }}
+        td.num {{ text-align: right; font-family: 'Courier New', monospace; white-space: nowrap; }}
+        .bar {{ background: #667eea; height: 10px; border-radius: 5px; }}
+    </style>
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h1>🔐 Resumen de Auditoría</h1>
+            <p>Generado: {timestamp}</p>
+        </div>
+        <div class="cards">
+{cards}
+        </div>
+        <div class="sections">
+{sections}
+        </div>
+    </div>
+</body>
+</html>
+"""
@@ -0,0 +1,72 @@
+from collections import deque
+
+
+class AhoCorasick:
+    """
+    Autómata de Aho-Corasick para buscar muchas palabras en una sola pasada
+
+    El costo de `search` es lineal en la longitud del texto más el número de
+    coincidencias, sin importar cuántas palabras tenga el diccionario.
+    """
+
+    def __init__(self, words=()):
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [()]
+        self._pending = {}
+        self.size = 0
+        for key, word in words:
+            self._add(word, key)
+        self._build()
+
+    def _add(self, word, key):
+        """Agrega una palabra; `key` es lo que se reporta al encontrarla"""
+        state = 0
+        for char in word:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+            state = next_state
+        self._pending.setdefault(state, []).append(key)
+        self.size += 1
+
+    def _build(self):
+        """Calcula los enlaces de fallo (BFS) y las salidas acumuladas"""
+        for state, keys in self._pending.items():
+            self._output[state] = tuple(keys)
+        self._pending = {}
+
+        queue = deque()
+        for next_state in self._goto[0].values():
+            self._fail[next_state] = 0
+            queue.append(next_state)
+
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def search(self, text):
+        """Retorna el conjunto de claves de todas las palabras presentes en el texto"""
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        found = set()
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                found.update(output[state])
+        return found
@@ -0,0 +1,163 @@
+import math
+
+from modules.features import extract_features
+from modules.metrics import get_metrics
+from modules.evaluator import (strength_score, classify, common_password_sources, mangled_common_match,
+                               near_miss_match)
+from modules.crack_time import (estimate_crack_times, format_time, seconds_from_log2,
+                                DEFAULT_PROFILE)
+from modules.guess_estimator import estimate_guesses
+from modules.password_model import model_rank
+from modules.pattern_detector import detect_patterns, calculate_entropy, get_charset_info
+from modules.recommendations import get_recommendations
+from modules.pwned_checker import check_pwned_password, check_pwned_batch, format_pwned_result
+
+def analyze_password(password, wordlist, pwned=None, check_pwned=True, compute_entropy=True):
+    """
+    Analiza una contraseña y retorna un diccionario con todos los resultados
+    
+    Args:
+        password: Contraseña a analizar
+        wordlist: Listas de contraseñas comunes (ver load_common_passwords)
+        pwned: Resultado (is_pwned, count) ya obtenido de HIBP; si es None se consulta
+        check_pwned: Si es False se omite la verificación contra HIBP
+        compute_entropy: Si es False se omite el cálculo de entropía
+    """
+    
+    # Instrumentación opcional (--profile): una marca de tiempo por etapa
+    metrics = get_metrics()
+    if metrics:
+        clock = metrics.clock()
+    
+    # Características compartidas (una sola pasada sobre los caracteres)
+    features = extract_features(password)
+    if metrics:
+        clock = metrics.lap("features", clock)
+    
+    # Intentos estimados según los patrones (diccionarios, secuencias, fechas...)
+    guesses = estimate_guesses(password, features)
+    if metrics:
+        clock = metrics.lap("guesses", clock)
+    
+    # Análisis básico (limitado por los intentos estimados)
+    score = strength_score(password, features, guesses.log2_guesses)
+    classification = classify(score)
+    if metrics:
+        clock = metrics.lap("score", clock)
+    
+    # Rango según el modelo de Markov/PCFG entrenado (None si no hay modelo)
+    rank = model_rank(password)
+    if metrics:
+        clock = metrics.lap("model", clock)
+    
+    # Tiempo de crackeo (en log2, para todos los perfiles de atacante)
+    log2_times = {profile: times[0] for profile, times
+                  in estimate_crack_times([password], log2_guesses=[guesses.log2_guesses]).items()}
+    crack_seconds = seconds_from_log2(log2_times[DEFAULT_PROFILE])
+    crack_time_readable = format_time(crack_seconds)
+    if metrics:
+        clock = metrics.lap("crack_time", clock)
+    
+    # Verificar si es común (y en qué listas aparece), también como variante
+    # leet, con mayúsculas, invertida o con prefijo/sufijo
+    common_sources = common_password_sources(password, wordlist)
+    variant = None if common_sources else mangled_common_match(password, wordlist)
+    if variant:
+        common_sources = [variant["lista"]]
+    is_common = bool(common_sources)
+    
+    # Contraseña común con una o dos ediciones ("pasword1", "qwerty12e")
+    near_miss = None if is_common else near_miss_match(password, wordlist)
+    if metrics:
+        clock = metrics.lap("wordlist", clock)
+    
+    # Verificar contra Have I Been Pwned
+    if not check_pwned:
+        is_pwned, pwned_count = False, -1
+        pwned_message = "Verificación omitida"
+    else:
+        if pwned is None:
+            pwned = check_pwned_password(password)
+        is_pwned, pwned_count = pwned
+        pwned_message = format_pwned_result(is_pwned, pwned_count)
+        if metrics:
+            clock = metrics.lap("hibp", clock)
+    
+    # Detectar patrones
+    patterns = detect_patterns(password, features)
+    if near_miss:
+        patterns.append(f"Casi igual a una contraseña común ({near_miss['palabra']}, "
+                        f"distancia {near_miss['distancia']})")
+    if metrics:
+        clock = metrics.lap("patterns", clock)
+    
+    # Calcular entropía
+    entropy = calculate_entropy(password, features) if compute_entropy else None
+    
+    # Información de charset
+    charset_types = get_charset_info(password, features)
+    if metrics:
+        clock = metrics.lap("entropy_charset", clock)
+    
+    # Ajustar clasificación si es común, pwned o tiene muchos patrones
+    if is_common or is_pwned:
+        classification = "Muy Débil"
+        score = min(score, 1)
+    elif len(patterns) >= 3:
+        classification = "Débil"
+        score = min(score, 3)
+    
+    # Generar recomendaciones
+    recommendations = get_recommendations(password, score, patterns, is_common or is_pwned, features)
+    if metrics:
+        metrics.lap("recommendations", clock)
+        metrics.increment("analyzed")
+    
+    return {
+        "password": password,
+        "score": score,
+        "nivel": classification,
+        "log2_rango_modelo": None if rank is None else round(rank, 2),
+        "estimado_crack_segundos": int(crack_seconds) if math.isfinite(crack_seconds) else None,
+        "log2_crack_segundos": round(log2_times[DEFAULT_PROFILE], 2),
+        "log2_intentos": round(guesses.log2_guesses, 2),
+        "descomposicion": guesses.labels,
+        "tiempo_crack_legible": crack_time_readable,
+        "tiempos_crack": {profile: format_time(seconds_from_log2(value))
+                          for profile, value in log2_times.items()},
+        "comun": is_common,
+        "listas": common_sources,
+        "variante_comun": variant,
+        "casi_comun": near_miss,
+        "pwned": is_pwned,
+        "pwned_count": pwned_count,
+        "pwned_message": pwned_message,
+        "patrones": patterns,
+        "entropia": entropy,
+        "charset_types": charset_types,
+        "recomendaciones": recommendations
+    }
+
+def analyze_passwords(passwords, wordlist, check_pwned=True, compute_entropy=True):
+    """
+    Analiza una lista de contraseñas consultando HIBP por lotes
+    
+    Las contraseñas se agrupan por prefijo SHA-1, de modo que cada rango
+    /range/ se obtiene una sola vez para todo el lote. Las contraseñas
+    repetidas se analizan una sola vez y cada fila indica en 'ocurrencias'
+    cuántas veces apareció hasta ese punto.
+    """
+    unique = list(dict.fromkeys(passwords))
+    if check_pwned:
+        pwned_results = check_pwned_batch(unique)
+    else:
+        pwned_results = [None] * len(unique)
+    results = {pwd: analyze_password(pwd, wordlist, pwned, check_pwned, compute_entropy)
+               for pwd, pwned in zip(unique, pwned_results)}
+    
+    seen = {}
+    rows = []
+    for pwd in passwords:
+        seen[pwd] = seen.get(pwd, 0) + 1
+        rows.append(dict(results[pwd], ocurrencias=seen[pwd]))
+    return rows
@@ -0,0 +1,340 @@
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+from modules import metrics
+from modules.analyzer import analyze_password
+from modules.guess_estimator import get_estimator
+from modules.password_model import get_model
+from modules.pattern_detector import get_matcher
+from modules.pwned_checker import check_pwned_batch
+from modules.wordlist_index import open_wordlists
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_BATCH_SIZE = 64
+DEFAULT_MAX_CONCURRENCY = 4
+DEFAULT_MAX_PENDING = 10_000
+MAX_BODY = 1 << 20          # Bytes por request
+MAX_BATCH = 1000            # Contraseñas por request de /batch
+
+
+class Overloaded(Exception):
+    """Hay demasiadas contraseñas esperando análisis"""
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class AnalysisBatcher:
+    """
+    Agrupa en lotes las contraseñas de requests concurrentes
+
+    Las contraseñas que llegan mientras se procesa un lote forman el
+    siguiente (como mucho `batch_size`, esperando hasta `batch_window`
+    segundos a que se complete), así que con carga la consulta a HIBP de
+    cada lote se agrupa por prefijo igual que en BatchEngine. Hay como mucho
+    `max_concurrency` lotes en curso y `max_pending` contraseñas en espera;
+    por encima de eso analyze() lanza Overloaded.
+
+    HIBP se consulta en un pool de hilos y el análisis (CPU) en un único
+    hilo, para que el bucle de eventos siga atendiendo conexiones.
+    """
+
+    def __init__(self, wordlist, check_pwned=True, compute_entropy=True, batch_size=DEFAULT_BATCH_SIZE,
+                 batch_window=0.0, max_concurrency=DEFAULT_MAX_CONCURRENCY, max_pending=DEFAULT_MAX_PENDING):
+        self.wordlist = wordlist
+        self.options = {"check_pwned": check_pwned, "compute_entropy": compute_entropy}
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.max_pending = max_pending
+        self.pending = 0
+        self.batches = 0
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._queue = asyncio.Queue()
+        self._hibp_executor = ThreadPoolExecutor(max_concurrency, thread_name_prefix="hibp")
+        self._cpu_executor = ThreadPoolExecutor(1, thread_name_prefix="analysis")
+        self._runner = None
+        self._tasks = set()
+
+    def start(self):
+        self._runner = asyncio.create_task(self._run())
+
+    async def close(self):
+        if self._runner is not None:
+            self._runner.cancel()
+        for task in list(self._tasks):
+            task.cancel()
+        self._hibp_executor.shutdown(wait=False, cancel_futures=True)
+        self._cpu_executor.shutdown(wait=False, cancel_futures=True)
+
+    async def analyze(self, passwords):
+        """Analiza una lista de contraseñas; retorna los resultados en el mismo orden"""
+        if self.pending + len(passwords) > self.max_pending:
+            raise Overloaded(f"{self.pending} contraseñas en espera")
+        loop = asyncio.get_running_loop()
+        futures = []
+        for password in passwords:
+            future = loop.create_future()
+            self._queue.put_nowait((password, future))
+            futures.append(future)
+        self.pending += len(passwords)
+        return await asyncio.gather(*futures)
+
+    async def _run(self):
+        while True:
+            batch = [await self._queue.get()]
+            deadline = time.monotonic() + self.batch_window
+            while len(batch) < self.batch_size:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            await self._slots.acquire()
+            task = asyncio.create_task(self._process(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _process(self, batch):
+        loop = asyncio.get_running_loop()
+        passwords = [password for password, _ in batch]
+        try:
+            if self.options["check_pwned"]:
+                pwned_results = await loop.run_in_executor(self._hibp_executor, check_pwned_batch, passwords)
+            else:
+                pwned_results = [None] * len(passwords)
+            results = await loop.run_in_executor(self._cpu_executor, self._analyze, passwords, pwned_results)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+        finally:
+            self.pending -= len(batch)
+            self.batches += 1
+            self._slots.release()
+            registry = metrics.get_metrics()
+            if registry:
+                registry.increment("records", len(batch))
+
+    def _analyze(self, passwords, pwned_results):
+        return [analyze_password(password, self.wordlist, pwned, **self.options)
+                for password, pwned in zip(passwords, pwned_results)]
+
+
+class AuditServer:
+    """
+    Servidor HTTP/1.1 mínimo (asyncio, sin dependencias) con los endpoints:
+
+        GET  /health   Estado y contadores del servidor
+        POST /check    {"password": "..."} -> resultado de analyze_password
+        POST /batch    {"passwords": [...]} -> {"results": [...]}
+        GET  /metrics  Métricas en formato Prometheus (si están activadas)
+
+    Las conexiones se mantienen abiertas (keep-alive) para que cada consulta
+    no pague el costo de conectar.
+    """
+
+    def __init__(self, batcher, max_body=MAX_BODY, max_batch=MAX_BATCH):
+        self.batcher = batcher
+        self.max_body = max_body
+        self.max_batch = max_batch
+        self.started = time.monotonic()
+        self.requests = 0
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except HTTPError as e:
+                    await self._send(writer, e.status, {"error": str(e)}, keep_alive=False)
+                    return
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    return
+                if request is None:
+                    return
+                method, path, headers, body = request
+                keep_alive = headers.get("connection", "").lower() != "close"
+
+                registry = metrics.get_metrics()
+                if registry:
+                    clock = registry.clock()
+                status, payload = await self._dispatch(method, path, body)
+                if registry:
+                    registry.lap("server_request", clock)
+                    registry.increment("requests")
+                self.requests += 1
+
+                await self._send(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    return
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader):
+        line = await reader.readline()
+        if not line:
+            return None
+        try:
+            method, target, _ = line.decode('latin-1').split()
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Línea de request inválida")
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode('latin-1').partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Content-Length inválido")
+        if length > self.max_body:
+            raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"El cuerpo supera {self.max_body} bytes")
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), target.split("?", 1)[0], headers, body
+
+    async def _dispatch(self, method, path, body):
+        routes = {
+            ("GET", "/health"): self._health,
+            ("POST", "/check"): self._check,
+            ("POST", "/batch"): self._batch,
+            ("GET", "/metrics"): self._metrics,
+        }
+        handler = routes.get((method, path))
+        if handler is None:
+            if any(route_path == path for _, route_path in routes):
+                return HTTPStatus.METHOD_NOT_ALLOWED, {"error": f"Método {method} no permitido"}
+            return HTTPStatus.NOT_FOUND, {"error": f"Ruta desconocida: {path}"}
+        try:
+            return HTTPStatus.OK, await handler(body)
+        except HTTPError as e:
+            return e.status, {"error": str(e)}
+        except Overloaded as e:
+            return HTTPStatus.SERVICE_UNAVAILABLE, {"error": f"Servidor saturado: {e}"}
+
+    def _json_body(self, body):
+        try:
+            data = json.loads(body)
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "El cuerpo no es JSON válido")
+        if not isinstance(data, dict):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Se esperaba un objeto JSON")
+        return data
+
+    async def _health(self, body):
+        return {
+            "status": "ok",
+            "uptime_seconds": round(time.monotonic() - self.started, 3),
+            "wordlist_entries": len(self.batcher.wordlist),
+            "requests": self.requests,
+            "batches": self.batcher.batches,
+            "pending": self.batcher.pending,
+        }
+
+    async def _check(self, body):
+        password = self._json_body(body).get("password")
+        if not isinstance(password, str) or not password:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Falta 'password' (texto no vacío)")
+        return (await self.batcher.analyze([password]))[0]
+
+    async def _batch(self, body):
+        passwords = self._json_body(body).get("passwords")
+        if not isinstance(passwords, list) or not all(isinstance(p, str) and p for p in passwords):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Falta 'passwords' (lista de textos no vacíos)")
+        if len(passwords) > self.max_batch:
+            raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                            f"Como mucho {self.max_batch} contraseñas por request")
+        return {"results": await self.batcher.analyze(passwords)}
+
+    async def _metrics(self, body):
+        registry = metrics.get_metrics()
+        if registry is None:
+            raise HTTPError(HTTPStatus.NOT_FOUND, "Métricas desactivadas (iniciar con --profile o --metrics-file)")
+        return registry.prometheus()
+
+    async def _send(self, writer, status, payload, keep_alive=True):
+        if isinstance(payload, str):
+            body, content_type = payload.encode('utf-8'), "text/plain; version=0.0.4"
+        else:
+            body, content_type = json.dumps(payload, ensure_ascii=False).encode('utf-8'), "application/json"
+        head = (f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                f"Content-Type: {content_type}; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode('latin-1') + body)
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+
+def _warm_up(wordlist):
+    """Carga los diccionarios, el modelo y los índices antes de aceptar conexiones"""
+    get_estimator()
+    get_matcher()
+    get_model()
+    # Un análisis completo (sin HIBP) abre además los índices de la wordlist
+    analyze_password("Warm-up2024!", wordlist, check_pwned=False)
+
+
+async def _serve(wordlist_paths, host, port, unix_path, ready, **options):
+    wordlist = open_wordlists(wordlist_paths)
+    # Así el primer request no paga la carga de los diccionarios
+    _warm_up(wordlist)
+    batcher = AnalysisBatcher(wordlist, **options)
+    batcher.start()
+    server = AuditServer(batcher)
+    if unix_path:
+        listener = await asyncio.start_unix_server(server.handle, unix_path)
+        address = f"unix:{unix_path}"
+    else:
+        listener = await asyncio.start_server(server.handle, host, port)
+        address = f"http://{host}:{listener.sockets[0].getsockname()[1]}"
+    if ready is not None:
+        ready(address)
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        await batcher.close()
+        wordlist.close()
+        if unix_path and os.path.exists(unix_path):
+            os.unlink(unix_path)
+
+
+def serve(wordlist_paths, host=DEFAULT_HOST, port=DEFAULT_PORT, unix_path=None, ready=None, **options):
+    """
+    Inicia el servidor y lo mantiene hasta Ctrl-C
+
+    Las wordlists, los diccionarios de patrones, el modelo y la caché de
+    rangos HIBP se cargan una sola vez, antes de empezar a escuchar, y
+    quedan en memoria entre requests.
+
+    Args:
+        wordlist_paths: Wordlists .txt/.idx
+        host, port: Dirección TCP (por defecto solo localhost; puerto 0 = uno libre)
+        unix_path: Socket Unix en lugar de TCP
+        ready: Función llamada con la dirección cuando el servidor ya escucha
+        **options: Opciones de AnalysisBatcher (check_pwned, batch_size, ...)
+    """
+    asyncio.run(_serve(wordlist_paths, host, port, unix_path, ready, **options))
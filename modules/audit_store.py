@@ -0,0 +1,285 @@
+import hashlib
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_STORE = "audit_store.db"
+CHECKPOINT_INTERVAL = 5.0  # Segundos entre commits
+
+# Los resultados dependen de la configuración del análisis (wordlists, modelo,
+# HIBP, entropía): se guardan por huella de configuración (analysis_fingerprint)
+# y solo se reutilizan con la misma. Sin --store-passwords no se guarda la
+# contraseña en texto plano, solo su hash (la clave de password_key).
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    settings TEXT NOT NULL,
+    key BLOB NOT NULL,
+    result TEXT NOT NULL,
+    created REAL NOT NULL,
+    PRIMARY KEY (settings, key)
+);
+CREATE TABLE IF NOT EXISTS audits (
+    id INTEGER PRIMARY KEY,
+    fingerprint TEXT,
+    settings TEXT NOT NULL DEFAULT '',
+    started TEXT NOT NULL,
+    rows_done INTEGER NOT NULL DEFAULT 0,
+    finished INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS audit_rows (
+    audit_id INTEGER NOT NULL,
+    key BLOB NOT NULL,
+    occurrences INTEGER NOT NULL,
+    PRIMARY KEY (audit_id, key)
+);
+"""
+
+# Máximo de parámetros por consulta IN (...)
+QUERY_BATCH = 500
+
+# Se incrementa cuando cambia el análisis de forma que los resultados guardados ya no sirven
+ANALYSIS_VERSION = 1
+
+
+def source_fingerprint(paths):
+    """
+    Identifica un conjunto de archivos de entrada (ruta, tamaño y fecha)
+
+    Returns:
+        str: Huella de los archivos, o None si se lee de stdin (no reanudable)
+    """
+    parts = []
+    for path in paths:
+        if path == '-':
+            return None
+        stat = os.stat(path)
+        parts.append(f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}")
+    return hashlib.sha256("\n".join(parts).encode('utf-8', 'surrogatepass')).hexdigest()
+
+
+def _file_identity(path):
+    stat = os.stat(path)
+    return f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}"
+
+
+def analysis_fingerprint(wordlist_paths, check_pwned=True, compute_entropy=True, model_path=None,
+                         hibp_source=None):
+    """
+    Identifica la configuración con la que se analizan las contraseñas
+
+    Incluye las wordlists (y, si se indican índices .idx, sus índices de
+    variantes y de borrados), el modelo, el origen de los datos HIBP y la
+    entropía. Un .txt se identifica por el propio archivo: sus índices se
+    recompilan cuando cambia.
+
+    Args:
+        hibp_source: (descripción, archivo offline o None), ver
+            modules.pwned_checker.pwned_source
+    """
+    from modules.near_miss import deletion_index_path_for
+    from modules.wordlist_index import canonical_index_path_for
+
+    parts = [f"version={ANALYSIS_VERSION}", f"entropy={bool(compute_entropy)}"]
+    if check_pwned:
+        description, offline_path = hibp_source or ("api", None)
+        parts.append(f"hibp={description}")
+        if offline_path:
+            parts.append(f"hibp_store={_file_identity(offline_path)}")
+    else:
+        parts.append("hibp=no")
+    for path in wordlist_paths:
+        parts.append(f"wordlist={_file_identity(path)}")
+        if path.endswith(".idx"):
+            for sibling in (canonical_index_path_for(path), deletion_index_path_for(path)):
+                if os.path.exists(sibling):
+                    parts.append(f"index={_file_identity(sibling)}")
+    if model_path:
+        parts.append(f"model={_file_identity(model_path)}")
+    return hashlib.sha256("\n".join(parts).encode('utf-8', 'surrogatepass')).hexdigest()
+
+
+def _stored_result(key, result):
+    """Resultado guardado; sin la contraseña, 'password' es su hash ("blake2b:...")"""
+    result = json.loads(result)
+    if 'password' not in result:
+        result = dict({'password': "blake2b:" + bytes(key).hex()}, **result)
+    return result
+
+
+class AuditStore:
+    """
+    Almacén SQLite de resultados de auditoría
+
+    Guarda el resultado de cada contraseña distinta (por el hash de
+    modules.result_cache.password_key) y, para cada auditoría, cuántas veces
+    aparece cada una y cuántas filas de la entrada ya se procesaron. Los
+    cambios se confirman cada `checkpoint_interval` segundos en una sola
+    transacción, así que tras un corte la auditoría se reanuda exactamente
+    desde la última fila confirmada. Los resultados ya guardados se reutilizan
+    en auditorías posteriores con la misma configuración de análisis (ver
+    begin) sin volver a analizarlos.
+
+    Args:
+        keep_passwords: Si es False (por defecto) los resultados se guardan
+            sin la contraseña; iter_results la reemplaza por su hash
+    """
+
+    def __init__(self, path=DEFAULT_STORE, checkpoint_interval=CHECKPOINT_INTERVAL, keep_passwords=False):
+        self.path = path
+        self.checkpoint_interval = checkpoint_interval
+        self.keep_passwords = keep_passwords
+        self.audit_id = None
+        self.settings = ""
+        self.max_age = None
+        self.rows_done = 0
+        self._last_checkpoint = time.monotonic()
+        self._lock = threading.Lock()
+        # La conexión se comparte entre el hilo que genera tareas y el principal
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._migrate()
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def _migrate(self):
+        """Adapta almacenes creados antes de guardar la configuración del análisis"""
+        results = [row[1] for row in self._conn.execute("PRAGMA table_info(results)")]
+        if results and "settings" not in results:
+            # No se sabe con qué configuración se obtuvieron: no se pueden reutilizar
+            self._conn.execute("DROP TABLE results")
+        audits = [row[1] for row in self._conn.execute("PRAGMA table_info(audits)")]
+        if audits and "settings" not in audits:
+            self._conn.execute("ALTER TABLE audits ADD COLUMN settings TEXT NOT NULL DEFAULT ''")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def begin(self, fingerprint=None, settings="", max_age=None):
+        """
+        Inicia una auditoría o reanuda la última sin terminar con la misma huella
+
+        Args:
+            fingerprint: Huella de la entrada (source_fingerprint)
+            settings: Huella de la configuración (analysis_fingerprint); solo
+                se reanuda y se reutilizan resultados con la misma
+            max_age: Segundos tras los que un resultado guardado ya no se
+                reutiliza (p. ej. datos de la API de HIBP); None = sin límite
+
+        Returns:
+            int: Filas de la entrada ya procesadas (las que hay que saltar)
+        """
+        with self._lock:
+            self.settings = settings
+            self.max_age = max_age
+            row = None
+            if fingerprint is not None:
+                row = self._conn.execute(
+                    "SELECT id, rows_done FROM audits WHERE fingerprint = ? AND settings = ? AND finished = 0 "
+                    "ORDER BY id DESC LIMIT 1", (fingerprint, settings)).fetchone()
+            if row is None:
+                cursor = self._conn.execute(
+                    "INSERT INTO audits (fingerprint, settings, started) VALUES (?, ?, ?)",
+                    (fingerprint, settings, time.strftime("%Y-%m-%d %H:%M:%S")))
+                row = (cursor.lastrowid, 0)
+                self._conn.commit()
+            self.audit_id, self.rows_done = row
+            return self.rows_done
+
+    def get_many(self, keys):
+        """
+        Busca resultados ya guardados con la configuración de la auditoría en curso
+
+        Returns:
+            dict: clave -> resultado, solo para las claves encontradas (si la
+            contraseña no se guardó, 'password' es su hash, como en iter_results)
+        """
+        found = {}
+        keys = list(keys)
+        oldest = time.time() - self.max_age if self.max_age is not None else -math.inf
+        with self._lock:
+            for i in range(0, len(keys), QUERY_BATCH):
+                batch = keys[i:i + QUERY_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                for key, result in self._conn.execute(
+                        f"SELECT key, result FROM results WHERE settings = ? AND created >= ? "
+                        f"AND key IN ({placeholders})", [self.settings, oldest] + batch):
+                    found[key] = _stored_result(key, result)
+        return found
+
+    def record(self, keys, new_results):
+        """
+        Registra un bloque de filas de la auditoría en curso
+
+        Args:
+            keys: Clave de cada fila del bloque, en orden
+            new_results: dict clave -> resultado para las contraseñas recién analizadas
+        """
+        counts = {}
+        for key in keys:
+            counts[key] = counts.get(key, 0) + 1
+
+        now = time.time()
+        rows = []
+        for key, result in new_results.items():
+            if not self.keep_passwords:
+                # Sin la contraseña se conserva su longitud (la usan las políticas)
+                result = {field: value for field, value in result.items() if field != 'password'}
+                result['longitud'] = len(new_results[key]['password'])
+            rows.append((self.settings, key, json.dumps(result, ensure_ascii=False), now))
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO results (settings, key, result, created) VALUES (?, ?, ?, ?)", rows)
+            self._conn.executemany(
+                "INSERT INTO audit_rows (audit_id, key, occurrences) VALUES (?, ?, ?) "
+                "ON CONFLICT (audit_id, key) DO UPDATE SET occurrences = occurrences + excluded.occurrences",
+                [(self.audit_id, key, count) for key, count in counts.items()])
+            self.rows_done += len(keys)
+            if time.monotonic() - self._last_checkpoint >= self.checkpoint_interval:
+                self._checkpoint()
+
+    def _checkpoint(self):
+        self._conn.execute("UPDATE audits SET rows_done = ? WHERE id = ?", (self.rows_done, self.audit_id))
+        self._conn.commit()
+        self._last_checkpoint = time.monotonic()
+
+    def checkpoint(self):
+        """Confirma en disco todo lo registrado hasta ahora"""
+        with self._lock:
+            self._checkpoint()
+
+    def finish(self):
+        """Marca la auditoría en curso como terminada"""
+        with self._lock:
+            self._conn.execute("UPDATE audits SET finished = 1 WHERE id = ?", (self.audit_id,))
+            self._checkpoint()
+
+    def iter_results(self, audit_id=None):
+        """
+        Itera los resultados de una auditoría (por defecto la actual)
+
+        Genera una fila por contraseña distinta, en el orden en que apareció
+        por primera vez, con el total de apariciones en 'ocurrencias'. Si la
+        contraseña no se guardó, 'password' es su hash ("blake2b:...") y
+        'longitud' su longitud.
+        """
+        audit_id = self.audit_id if audit_id is None else audit_id
+        cursor = self._conn.execute(
+            "SELECT a.key, r.result, a.occurrences FROM audit_rows a "
+            "JOIN audits au ON au.id = a.audit_id "
+            "JOIN results r ON r.settings = au.settings AND r.key = a.key "
+            "WHERE a.audit_id = ? ORDER BY a.rowid", (audit_id,))
+        for key, result, occurrences in cursor:
+            yield dict(_stored_result(key, result), ocurrencias=occurrences)
+
+    def close(self):
+        with self._lock:
+            if self.audit_id is not None:
+                self._checkpoint()
+            self._conn.close()
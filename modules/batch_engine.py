@@ -0,0 +1,192 @@
+import itertools
+import multiprocessing
+import os
+import signal
+import threading
+
+from modules import metrics
+from modules.analyzer import analyze_password
+from modules.password_model import use_model
+from modules.pwned_checker import check_pwned_batch
+from modules.result_cache import ResultCache, password_key, DEFAULT_MAX_ENTRIES
+from modules.wordlist_index import open_wordlists
+
+# Estado de cada proceso del pool (se inicializa una sola vez por worker)
+_worker_wordlist = None
+_worker_options = None
+_worker_metrics = None
+
+
+def _load_worker_state(wordlist_paths, options):
+    """Carga la wordlist una sola vez por proceso"""
+    global _worker_wordlist, _worker_options
+    _worker_wordlist = open_wordlists(wordlist_paths)
+    _worker_options = options
+
+
+def _init_worker(wordlist_paths, options, profile=False, model_path=None):
+    """Inicializador del pool; Ctrl-C solo lo atiende el proceso principal"""
+    global _worker_metrics
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _load_worker_state(wordlist_paths, options)
+    # Con spawn/forkserver el worker no hereda el modelo configurado en el proceso principal
+    if model_path:
+        use_model(model_path)
+    if profile:
+        _worker_metrics = metrics.enable()
+
+
+def _analyze_chunk(task):
+    """Analiza un bloque de contraseñas dentro de un worker"""
+    chunk_id, passwords, pwned_results = task
+    results = [analyze_password(password, _worker_wordlist, pwned, **_worker_options)
+               for password, pwned in zip(passwords, pwned_results)]
+    # Las métricas del worker viajan con cada bloque hasta el proceso principal
+    snapshot = _worker_metrics.snapshot() if _worker_metrics is not None else None
+    return chunk_id, results, snapshot
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class BatchEngine:
+    """
+    Motor de análisis por lotes sobre un pool de procesos
+
+    Las contraseñas se reparten en bloques de `chunk_size`. La consulta a HIBP
+    de cada bloque (agrupada por prefijo) se hace en el proceso principal,
+    en paralelo con el análisis de los bloques anteriores, y los workers
+    solo hacen el trabajo de CPU. Como mucho hay `2 * workers` bloques en
+    vuelo, así que la memoria no crece con el tamaño del archivo.
+
+    Las contraseñas repetidas se analizan (y se consultan en HIBP) una sola
+    vez: los resultados se guardan en un caché LRU de `cache_size` entradas
+    y se replican en cada fila, con la columna 'ocurrencias'. Con un
+    `store` (modules.audit_store.AuditStore) además se reutilizan los
+    resultados de auditorías anteriores y cada bloque se registra en él.
+
+    Args:
+        wordlist_paths: Wordlists .txt/.idx que cada worker abre una vez
+        workers: Número de procesos (None = todos los núcleos; 1 = sin pool)
+        chunk_size: Contraseñas por bloque
+        ordered: True para entregar los resultados en el orden de entrada,
+            False para entregarlos a medida que terminan
+        check_pwned, compute_entropy: Etapas opcionales de analyze_password
+        progress: Función llamada con el total de contraseñas analizadas
+        cache_size: Máximo de contraseñas distintas en el caché de resultados
+        store: Almacén persistente de resultados (opcional)
+        model_path: Modelo de modules.password_model que abre cada worker
+            (None = el modelo por defecto, si existe)
+    """
+
+    def __init__(self, wordlist_paths, workers=None, chunk_size=1000, ordered=True,
+                 check_pwned=True, compute_entropy=True, progress=None,
+                 cache_size=DEFAULT_MAX_ENTRIES, store=None, model_path=None):
+        self.wordlist_paths = list(wordlist_paths)
+        self.model_path = model_path
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        # Con un almacén los bloques se registran en orden, para poder reanudar
+        self.ordered = ordered or store is not None
+        self.check_pwned = check_pwned
+        self.options = {"check_pwned": check_pwned, "compute_entropy": compute_entropy}
+        self.progress = progress
+        self.processed = 0
+        self.cache = ResultCache(cache_size)
+        self.store = store
+        self._pending = {}
+
+    def _tasks(self, passwords, slots, stop):
+        for chunk_id, chunk in enumerate(_chunks(passwords, self.chunk_size)):
+            if slots is not None:
+                slots.acquire()
+                if stop.is_set():
+                    return
+
+            # Solo se envían a los workers las contraseñas que no están en el caché
+            keys = [password_key(password) for password in chunk]
+            cached = {}
+            fresh = {}
+            for key, password in zip(keys, chunk):
+                if key in cached or key in fresh:
+                    continue
+                result = self.cache.get(key)
+                if result is None:
+                    fresh[key] = password
+                else:
+                    cached[key] = result
+            if self.store is not None and fresh:
+                for key, result in self.store.get_many(fresh).items():
+                    cached[key] = result
+                    del fresh[key]
+            self._pending[chunk_id] = (keys, list(fresh), cached)
+
+            fresh_passwords = list(fresh.values())
+            if self.check_pwned:
+                registry = metrics.get_metrics()
+                if registry:
+                    clock = registry.clock()
+                pwned_results = check_pwned_batch(fresh_passwords)
+                if registry:
+                    registry.lap("hibp_batch", clock)
+            else:
+                pwned_results = [None] * len(fresh_passwords)
+            yield chunk_id, fresh_passwords, pwned_results
+
+    def _expand(self, chunk_id, results, snapshot=None):
+        """Replica los resultados de un bloque en todas sus filas"""
+        if snapshot is not None:
+            metrics.get_metrics().merge(snapshot)
+        keys, fresh_keys, cached = self._pending.pop(chunk_id)
+        new_results = dict(zip(fresh_keys, results))
+        if self.store is not None:
+            self.store.record(keys, new_results)
+        cached.update(new_results)
+        rows = [self.cache.record(key, cached[key]) for key in keys]
+
+        self.processed += len(rows)
+        registry = metrics.get_metrics()
+        if registry:
+            registry.increment("records", len(rows))
+        if self.progress is not None:
+            self.progress(self.processed)
+        return rows
+
+    def run(self, passwords):
+        """
+        Analiza un iterable de contraseñas y genera los resultados
+
+        Si se interrumpe con Ctrl-C, los resultados ya generados se conservan:
+        el pool se detiene y se vuelve a lanzar KeyboardInterrupt.
+        """
+        if self.workers <= 1:
+            _load_worker_state(self.wordlist_paths, self.options)
+            for task in self._tasks(passwords, None, None):
+                yield from self._expand(*_analyze_chunk(task))
+            return
+
+        slots = threading.Semaphore(self.workers * 2)
+        stop = threading.Event()
+        profile = metrics.get_metrics() is not None
+        pool = multiprocessing.Pool(self.workers, _init_worker,
+                                    (self.wordlist_paths, self.options, profile, self.model_path))
+        try:
+            mapper = pool.imap if self.ordered else pool.imap_unordered
+            for chunk_id, results, snapshot in mapper(_analyze_chunk, self._tasks(passwords, slots, stop)):
+                slots.release()
+                yield from self._expand(chunk_id, results, snapshot)
+            pool.close()
+        except BaseException:
+            # Desbloquear el generador de tareas antes de detener el pool
+            stop.set()
+            slots.release()
+            pool.terminate()
+            raise
+        finally:
+            pool.join()
@@ -0,0 +1,386 @@
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import os
+import platform
+import random
+import string
+import subprocess
+import sys
+import tempfile
+import time
+
+from modules.analyzer import analyze_password
+from modules.crack_time import estimate_crack_time
+from modules.evaluator import (strength_score, classify, common_password_sources, mangled_common_match,
+                               near_miss_match)
+from modules.features import extract_features
+from modules.guess_estimator import estimate_guesses
+from modules.password_model import PasswordModel, get_model, train_model
+from modules.pattern_detector import (detect_patterns, calculate_entropy, get_charset_info,
+                                      load_pattern_file, KEYBOARD_PATTERNS_FILE,
+                                      COMMON_WORDS_FILE, COMMON_NAMES_FILE)
+from modules.policy import load_policies, EXAMPLE_POLICIES
+from modules.recommendations import get_recommendations
+from modules.report import generate_report
+from modules.wordlist_index import build_wordlist_index, open_wordlists
+
+SIZES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+DEFAULT_THRESHOLD = 0.10  # 10% más lento que la línea base = regresión
+SYMBOLS = "!@#$%&*._-?"
+SYNTHETIC_WORDLIST_SIZE = 100_000
+SYNTHETIC_MODEL_CORPUS_SIZE = 100_000
+REPORT_SAMPLE_SIZE = 10_000
+
+# Comandos cuyo arranque se mide, cada uno en un proceso nuevo
+STARTUP_COMMANDS = {
+    "interpreter": ["-c", "pass"],
+    "import_auditor": ["-c", "import auditor"],
+    "help": ["auditor.py", "--help"],
+    "check": ["auditor.py", "check", "Maria2024!", "--no-hibp", "--json"],
+    "generate": ["auditor.py", "generate"],
+}
+# Dependencias pesadas que no deben cargarse al importar auditor.py
+STARTUP_FORBIDDEN = ("requests", "asyncio", "multiprocessing", "sqlite3", "numpy", "pandas")
+DEFAULT_STARTUP_BUDGET_MS = 75  # Costo de importar auditor.py por encima del intérprete
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Palabras base de los corpus sintéticos (las mismas que reconoce el detector)
+BASE_WORDS = (load_pattern_file(COMMON_WORDS_FILE) + load_pattern_file(COMMON_NAMES_FILE)
+              or ["password", "admin", "maria", "dragon"])
+KEYBOARD_WORDS = load_pattern_file(KEYBOARD_PATTERNS_FILE) or ["qwerty", "asdfgh"]
+
+
+def synthetic_password(rng):
+    """
+    Genera una contraseña con la forma de las que aparecen en volcados reales
+
+    La mayoría son palabras o nombres con números y algún símbolo al final,
+    con longitudes concentradas entre 6 y 12 caracteres; una minoría son
+    solo dígitos, patrones de teclado o contraseñas aleatorias largas.
+    """
+    kind = rng.random()
+    if kind < 0.35:
+        # palabra + número (maria1990, admin123)
+        word = rng.choice(BASE_WORDS)
+        digits = rng.choice([str(rng.randint(0, 99)), str(rng.randint(1950, 2025)), "123", "1234"])
+        return word + digits
+    if kind < 0.55:
+        # Palabra + número + símbolo (Maria2024!)
+        word = rng.choice(BASE_WORDS).capitalize()
+        return word + str(rng.randint(0, 9999)) + rng.choice(SYMBOLS)
+    if kind < 0.70:
+        # Solo dígitos (fechas, PIN, 123456)
+        return "".join(rng.choice(string.digits) for _ in range(rng.choice([4, 6, 6, 8, 8, 10])))
+    if kind < 0.80:
+        # Patrones de teclado con variaciones
+        return rng.choice(KEYBOARD_WORDS) + rng.choice(["", "1", "123", "!"])
+    if kind < 0.92:
+        # Minúsculas sin estructura
+        return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(5, 12)))
+    # Aleatorias de gestores de contraseñas
+    alphabet = string.ascii_letters + string.digits + SYMBOLS
+    return "".join(rng.choice(alphabet) for _ in range(rng.randint(12, 24)))
+
+
+def synthetic_corpus(size, seed=0):
+    """Corpus determinista de `size` contraseñas sintéticas"""
+    rng = random.Random(seed)
+    return [synthetic_password(rng) for _ in range(size)]
+
+
+def _time_stage(func, repeat):
+    """Mejor tiempo (pared y CPU) de `repeat` ejecuciones"""
+    best_wall = best_cpu = float("inf")
+    for _ in range(repeat):
+        wall, cpu = time.perf_counter(), time.process_time()
+        func()
+        best_wall = min(best_wall, time.perf_counter() - wall)
+        best_cpu = min(best_cpu, time.process_time() - cpu)
+    return best_wall, best_cpu
+
+
+def stage_functions(passwords, wordlist, workdir, model):
+    """
+    Etapas a medir sobre un corpus, en el orden de analyze_password
+
+    Las funciones por etapa reciben las características ya extraídas, como
+    dentro del pipeline, para que cada una mida solo su propio costo.
+    """
+    features = [extract_features(password) for password in passwords]
+    pairs = list(zip(passwords, features))
+    scores = [strength_score(password, f) for password, f in pairs]
+    patterns = [detect_patterns(password, f) for password, f in pairs]
+
+    # El reporte se mide con resultados ya calculados (una muestra que se repite
+    # hasta el tamaño del corpus, para no tener un millón de resultados en memoria)
+    sample = [analyze_password(password, wordlist, check_pwned=False)
+              for password in passwords[:REPORT_SAMPLE_SIZE]]
+
+    # Las políticas de ejemplo se evalúan sobre la misma muestra de resultados
+    policies = load_policies(EXAMPLE_POLICIES)
+
+    def report():
+        results = itertools.islice(itertools.cycle(sample), len(passwords))
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_report(results, os.path.join(workdir, "bench.csv"),
+                            os.path.join(workdir, "bench.html"), os.path.join(workdir, "bench.jsonl"))
+
+    return {
+        "extract_features": lambda: [extract_features(password) for password in passwords],
+        "estimate_guesses": lambda: [estimate_guesses(password, f) for password, f in pairs],
+        "strength_score": lambda: [strength_score(password, f) for password, f in pairs],
+        "model_rank": lambda: model.log2_ranks(passwords),
+        "classify": lambda: [classify(score) for score in scores],
+        "estimate_crack_time": lambda: [estimate_crack_time(password, features=f) for password, f in pairs],
+        "common_password_sources": lambda: [common_password_sources(password, wordlist)
+                                            for password in passwords],
+        "mangled_common_match": lambda: [mangled_common_match(password, wordlist) for password in passwords],
+        "near_miss_match": lambda: [near_miss_match(password, wordlist) for password in passwords],
+        "detect_patterns": lambda: [detect_patterns(password, f) for password, f in pairs],
+        "calculate_entropy": lambda: [calculate_entropy(password, f) for password, f in pairs],
+        "get_charset_info": lambda: [get_charset_info(password, f) for password, f in pairs],
+        "get_recommendations": lambda: [get_recommendations(password, score, found, False, f)
+                                        for (password, f), score, found in zip(pairs, scores, patterns)],
+        "analyze_password": lambda: [analyze_password(password, wordlist, check_pwned=False)
+                                     for password in passwords],
+        "evaluate_policies": lambda: [policies.evaluate(result) for result
+                                      in itertools.islice(itertools.cycle(sample), len(passwords))],
+        "generate_report": report,
+    }
+
+
+def run_benchmarks(sizes, repeat=3, wordlist_paths=None, seed=0, stages=None, log=None):
+    """
+    Mide cada etapa del análisis y el escritor de reportes
+
+    Sin `wordlist_paths` se compila una wordlist sintética de 100.000
+    entradas para que la búsqueda tenga un tamaño realista, y si no hay un
+    modelo de Markov/PCFG entrenado se entrena uno con un corpus sintético.
+    HIBP no se mide (depende de la red).
+
+    Returns:
+        dict: Resultados con la forma {"meta": ..., "results": {tamaño: {etapa: métricas}}}
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        if not wordlist_paths:
+            wordlist_file = os.path.join(workdir, "synthetic-common.txt")
+            with open(wordlist_file, 'w', encoding='utf-8') as f:
+                f.write("\n".join(synthetic_corpus(SYNTHETIC_WORDLIST_SIZE, seed + 1)) + "\n")
+            wordlist_paths = [build_wordlist_index(wordlist_file)]
+        wordlist = open_wordlists(wordlist_paths)
+        # Sin un modelo entrenado se entrena uno sintético, solo para medir la etapa
+        model = get_model()
+        if model is None:
+            corpus_file = os.path.join(workdir, "synthetic-corpus.txt")
+            with open(corpus_file, 'w', encoding='utf-8') as f:
+                f.write("\n".join(synthetic_corpus(SYNTHETIC_MODEL_CORPUS_SIZE, seed + 2)) + "\n")
+            train_model([corpus_file], os.path.join(workdir, "synthetic-model.bin"), seed=seed)
+            model = PasswordModel(os.path.join(workdir, "synthetic-model.bin"))
+
+        for label in sizes:
+            passwords = synthetic_corpus(SIZES[label], seed)
+            # Las corridas grandes se repiten menos para acotar la duración total
+            runs = 1 if SIZES[label] >= 1_000_000 else repeat
+            results[label] = {}
+            for name, func in stage_functions(passwords, wordlist, workdir, model).items():
+                if stages and name not in stages:
+                    continue
+                wall, cpu = _time_stage(func, runs)
+                results[label][name] = {
+                    "seconds": round(wall, 6),
+                    "cpu_seconds": round(cpu, 6),
+                    "per_item_us": round(wall / len(passwords) * 1e6, 3),
+                    "items_per_second": round(len(passwords) / wall, 1) if wall else None,
+                }
+                if log is not None:
+                    log(f"{label:>5} {name:24s} {wall:10.4f} s")
+        wordlist.close()
+        if model is not get_model():
+            model.close()
+
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": seed,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def _startup_env():
+    # Se mide con el bytecode en caché, como en una instalación normal
+    env = dict(os.environ)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    return env
+
+
+def startup_imports():
+    """Módulos de primer nivel que se cargan al importar auditor.py"""
+    output = subprocess.run([sys.executable, "-X", "importtime", "-c", "import auditor"],
+                            cwd=PROJECT_ROOT, env=_startup_env(), capture_output=True, text=True).stderr
+    modules = set()
+    for line in output.splitlines():
+        if line.startswith("import time:") and line.count("|") == 2:
+            modules.add(line.rsplit("|", 1)[1].strip().split(".")[0])
+    return modules
+
+
+def run_startup_benchmarks(repeat=5, log=None):
+    """
+    Mide el arranque de auditor.py en procesos nuevos
+
+    Cada comando se ejecuta una vez sin medir (para generar el bytecode) y
+    luego `repeat` veces, tomando la mejor. 'overhead_ms' es el tiempo por
+    encima de un intérprete que no importa nada.
+
+    Returns:
+        dict: Resultados con la misma forma que run_benchmarks (tamaño "startup")
+            y la lista de dependencias pesadas cargadas al importar auditor.py
+    """
+    env = _startup_env()
+    timings = {}
+    for name, command in STARTUP_COMMANDS.items():
+        best = float("inf")
+        for _ in range(repeat + 1):
+            started = time.perf_counter()
+            subprocess.run([sys.executable, *command], cwd=PROJECT_ROOT, env=env,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            best = min(best, time.perf_counter() - started)
+        timings[name] = best
+        if log is not None:
+            log(f"startup {name:24s} {best * 1000:8.1f} ms")
+
+    interpreter = timings["interpreter"]
+    results = {name: {"seconds": round(seconds, 6),
+                      "overhead_ms": round((seconds - interpreter) * 1000, 2)}
+               for name, seconds in timings.items()}
+    loaded = startup_imports()
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": repeat,
+        },
+        "results": {"startup": results},
+        "startup_heavy_imports": [name for name in STARTUP_FORBIDDEN if name in loaded],
+    }
+
+
+def check_startup_budget(report, budget_ms=DEFAULT_STARTUP_BUDGET_MS):
+    """
+    Verifica el presupuesto de arranque de una corrida de run_startup_benchmarks
+
+    Returns:
+        list: Descripción de cada incumplimiento (vacía si se respeta)
+    """
+    problems = []
+    overhead = report["results"]["startup"]["import_auditor"]["overhead_ms"]
+    if overhead > budget_ms:
+        problems.append(f"importar auditor.py cuesta {overhead:.1f} ms (presupuesto {budget_ms} ms)")
+    for name in report.get("startup_heavy_imports", []):
+        problems.append(f"'{name}' se importa al arrancar")
+    return problems
+
+
+def compare(current, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Compara dos corridas etapa por etapa
+
+    Returns:
+        list: Tuplas (tamaño, etapa, segundos_base, segundos_actual, cambio, regresión)
+            para las etapas presentes en ambas
+    """
+    rows = []
+    for label, stages in current["results"].items():
+        base_stages = baseline["results"].get(label, {})
+        for name, metrics in stages.items():
+            if name not in base_stages:
+                continue
+            before = base_stages[name]["seconds"]
+            after = metrics["seconds"]
+            change = (after - before) / before if before else 0.0
+            rows.append((label, name, before, after, change, change > threshold))
+    return rows
+
+
+def print_comparison(rows, threshold):
+    print(f"{'Tamaño':>6} {'Etapa':24s} {'Base (s)':>10} {'Actual (s)':>10} {'Cambio':>8}")
+    for label, name, before, after, change, regression in rows:
+        flag = "  [REGRESIÓN]" if regression else ""
+        print(f"{label:>6} {name:24s} {before:10.4f} {after:10.4f} {change:+8.1%}{flag}")
+    regressions = sum(1 for row in rows if row[5])
+    print(f"\n{regressions} regresiones (umbral {threshold:.0%})")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de las etapas del análisis y de los reportes")
+    parser.add_argument("--sizes", default="1k,100k,1m",
+                        help="Tamaños de corpus separados por comas: 1k, 100k, 1m (por defecto todos)")
+    parser.add_argument("--stages", help="Medir solo estas etapas (separadas por comas)")
+    parser.add_argument("--repeat", type=int, default=3, help="Repeticiones por etapa (se toma la mejor)")
+    parser.add_argument("--seed", type=int, default=0, help="Semilla de los corpus sintéticos")
+    parser.add_argument("--wordlist", action="append",
+                        help="Wordlist a usar en lugar de la sintética (repetible)")
+    parser.add_argument("-o", "--output", help="Guardar los resultados JSON en este archivo")
+    parser.add_argument("--compare", metavar="BASE",
+                        help="Comparar contra una línea base JSON; sale con 2 si hay regresiones")
+    parser.add_argument("--current", metavar="JSON",
+                        help="Con --compare, usar estos resultados en lugar de ejecutar los benchmarks")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Aumento relativo de tiempo que se considera regresión (por defecto 0.10)")
+    parser.add_argument("--startup", action="store_true",
+                        help="Medir el arranque de auditor.py en lugar de las etapas; sale con 2 si "
+                             "se excede el presupuesto o se cargan dependencias pesadas")
+    parser.add_argument("--startup-budget", type=float, default=DEFAULT_STARTUP_BUDGET_MS, metavar="MS",
+                        help=f"Presupuesto de importación de auditor.py (por defecto {DEFAULT_STARTUP_BUDGET_MS} ms)")
+    args = parser.parse_args(argv)
+
+    if args.current:
+        with open(args.current, 'r', encoding='utf-8') as f:
+            report = json.load(f)
+    elif args.startup:
+        report = run_startup_benchmarks(args.repeat, log=lambda line: print(line, file=sys.stderr))
+    else:
+        sizes = [size.strip().lower() for size in args.sizes.split(",") if size.strip()]
+        unknown = [size for size in sizes if size not in SIZES]
+        if unknown:
+            parser.error(f"tamaños desconocidos: {', '.join(unknown)}")
+        stages = set(args.stages.split(",")) if args.stages else None
+        report = run_benchmarks(sizes, args.repeat, args.wordlist, args.seed, stages,
+                                log=lambda line: print(line, file=sys.stderr))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"[OK] Resultados guardados en: {args.output}", file=sys.stderr)
+    elif not args.compare:
+        print(json.dumps(report, indent=2))
+
+    status = 0
+    if "startup" in report["results"]:
+        problems = check_startup_budget(report, args.startup_budget)
+        for problem in problems:
+            print(f"[REGRESIÓN] {problem}", file=sys.stderr)
+        if problems:
+            status = 2
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        rows = compare(report, baseline, args.threshold)
+        print_comparison(rows, args.threshold)
+        if any(row[5] for row in rows):
+            status = 2
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,6 @@
 import math
 
+
 CHARSETS = {
     "lower": 26,
     "lower_upper": 52,
@@ -7,18 +8,13 @@ CHARSETS = {
     "full": 94
 }
 
-def estimate_crack_time(password, attempts_per_second=1e10):
-    """
-    Estima el tiempo de crackeo en segundos
-    Asume 10 mil millones de intentos por segundo (GPU moderna)
-    """
-    length = len(password)
-
+def get_charset_size(features):
+    """Tamaño del espacio de caracteres que probaría un ataque de fuerza bruta"""
     # Detección del charset usado
-    has_lower = any(c.islower() for c in password)
-    has_upper = any(c.isupper() for c in password)
-    has_digit = any(c.isdigit() for c in password)
-    has_symbol = any(not c.isalnum() for c in password)
+    has_lower = features.has_lower
+    has_upper = features.has_upper
+    has_digit = features.has_digit
+    has_symbol = features.has_symbol
 
     # Determinar tamaño del charset
     charset_size = 0
@@ -38,16 +34,102 @@ def estimate_crack_time(password, attempts_per_second=1e10):
     else:
         charset_size = 10  # fallback
 
+    return charset_size
+
+# Velocidad de bcrypt con coste 5; cada punto de coste la divide por dos
+BCRYPT_COST5_RATE = 1.84e5
+
+# Perfiles de atacante: (descripción, intentos por segundo). Las velocidades
+# offline son benchmarks de hashcat en una sola GPU de gama alta (RTX 4090).
+ATTACKER_PROFILES = {
+    "gpu": ("Fuerza bruta genérica (10 mil millones/s)", 1e10),
+    "md5": ("Hash MD5, 1 GPU", 1.64e11),
+    "sha1": ("Hash SHA-1, 1 GPU", 5.06e10),
+    "ntlm": ("Hash NTLM, 1 GPU", 2.88e11),
+    "bcrypt-10": ("bcrypt coste 10, 1 GPU", BCRYPT_COST5_RATE / 2 ** 5),
+    "bcrypt-12": ("bcrypt coste 12, 1 GPU", BCRYPT_COST5_RATE / 2 ** 7),
+    "online": ("Ataque online limitado (100/hora)", 100 / 3600),
+}
+DEFAULT_PROFILE = "gpu"
+
+def profile_rate(profile):
+    """
+    Intentos por segundo de un perfil de ATTACKER_PROFILES
+
+    Además de los perfiles de la tabla acepta "bcrypt-N" con cualquier coste N.
+    """
+    if profile in ATTACKER_PROFILES:
+        return ATTACKER_PROFILES[profile][1]
+    if profile.startswith("bcrypt-") and profile[7:].isdigit():
+        return BCRYPT_COST5_RATE / 2 ** (int(profile[7:]) - 5)
+    raise ValueError(f"Perfil de atacante desconocido: {profile}")
+
+def log2_keyspace(charset_size, length):
+    """log2 del número medio de intentos (mitad del espacio de búsqueda)"""
     if charset_size == 0:
-        return 0
+        return -math.inf
+    return length * math.log2(charset_size) - 1
+
+def seconds_from_log2(log2_seconds):
+    """Convierte log2(segundos) a segundos (inf si no cabe en un float)"""
+    try:
+        return 2.0 ** log2_seconds
+    except OverflowError:
+        return math.inf
+
+def log2_brute_force_time(charset_size, length, attempts_per_second=1e10):
+    """log2 del tiempo promedio en segundos de un ataque de fuerza bruta"""
+    return log2_keyspace(charset_size, length) - math.log2(attempts_per_second)
 
-    # Calcular combinaciones totales
-    total_combinations = charset_size ** length
+def brute_force_time(charset_size, length, attempts_per_second=1e10):
+    """
+    Tiempo promedio en segundos para recorrer charset_size ** length combinaciones
+
+    Se calcula en espacio logarítmico: no hace aritmética de enteros grandes y
+    devuelve inf en lugar de lanzar OverflowError con contraseñas muy largas.
+    """
+    return seconds_from_log2(log2_brute_force_time(charset_size, length, attempts_per_second))
+
+def _log2_guesses(password, features=None):
+    # Import diferido: guess_estimator usa get_charset_size de este módulo
+    from modules.guess_estimator import estimate_guesses
+    return estimate_guesses(password, features).log2_guesses
+
+def estimate_crack_time(password, attempts_per_second=1e10, features=None):
+    """
+    Estima el tiempo de crackeo en segundos
+    Asume 10 mil millones de intentos por segundo (GPU moderna) y un atacante
+    que prueba primero los patrones de la contraseña (modules.guess_estimator)
+    """
+    return seconds_from_log2(_log2_guesses(password, features) - math.log2(attempts_per_second))
+
+def estimate_crack_times(passwords, profiles=None, features=None, log2_guesses=None):
+    """
+    Estima el tiempo de crackeo de un lote para varios perfiles de atacante
+
+    Los intentos de cada contraseña se estiman una sola vez con el estimador
+    de patrones (nunca superan el espacio de fuerza bruta); cada perfil solo
+    resta su log2(intentos por segundo).
+
+    Args:
+        passwords: Contraseñas a evaluar
+        profiles: Nombres de perfiles (por defecto todos los de ATTACKER_PROFILES)
+        features: Características ya extraídas, en el mismo orden (opcional)
+        log2_guesses: Intentos (log2) ya estimados, en el mismo orden (opcional)
+
+    Returns:
+        dict: perfil -> lista con log2(segundos) de cada contraseña
+    """
+    profiles = list(profiles or ATTACKER_PROFILES)
+    log2_rates = [math.log2(profile_rate(profile)) for profile in profiles]
 
-    # Tiempo promedio (mitad del espacio de búsqueda)
-    seconds = (total_combinations / 2) / attempts_per_second
+    if log2_guesses is None:
+        passwords = list(passwords)
+        features = features or [None] * len(passwords)
+        log2_guesses = [_log2_guesses(password, f) for password, f in zip(passwords, features)]
 
-    return seconds
+    return {profile: [guesses - log2_rate for guesses in log2_guesses]
+            for profile, log2_rate in zip(profiles, log2_rates)}
 
 def format_time(seconds):
     """Convierte segundos a formato legible"""
@@ -1,11 +1,34 @@
-import re
+import math
 
-def strength_score(password):
-    """Calcula un score de fortaleza de 0-10 basado en múltiples criterios"""
+from modules.features import extract_features
+
+# Score máximo según los intentos estimados: (log10 de intentos, tope). Los
+# cortes son los de zxcvbn (10^3, 10^6, 10^8, 10^10) más uno a 10^12.
+GUESS_SCORE_CAPS = ((3, 0), (6, 2), (8, 4), (10, 6), (12, 8))
+
+def guess_score_cap(log2_guesses):
+    """Score máximo que admite una contraseña que se adivina en 2^log2_guesses intentos"""
+    log10_guesses = log2_guesses * math.log10(2)
+    for limit, cap in GUESS_SCORE_CAPS:
+        if log10_guesses < limit:
+            return cap
+    return 10
+
+def strength_score(password, features=None, log2_guesses=None):
+    """
+    Calcula un score de fortaleza de 0-10 basado en múltiples criterios
+
+    Args:
+        password: Contraseña a evaluar
+        features: PasswordFeatures ya calculadas (opcional)
+        log2_guesses: Intentos estimados (modules.guess_estimator); si se
+            indican, el score no supera guess_score_cap
+    """
+    features = features or extract_features(password)
     score = 0
 
     # Longitud (0-3 puntos)
-    length = len(password)
+    length = features.length
     if length >= 16:
         score += 3
     elif length >= 12:
@@ -14,17 +37,17 @@ def strength_score(password):
         score += 1
 
     # Tipos de caracteres (0-4 puntos)
-    if re.search(r"[A-Z]", password):
+    if features.has_ascii_upper:
         score += 1
-    if re.search(r"[a-z]", password):
+    if features.has_ascii_lower:
         score += 1
-    if re.search(r"\d", password):
+    if features.has_decimal:
         score += 1
-    if re.search(r"[!@#$%^&*(),.?\":{}|<>_\-+=\[\]\\/'`~;]", password):
+    if features.has_score_symbol:
         score += 1
 
     # Diversidad de caracteres (0-2 puntos)
-    unique_chars = len(set(password))
+    unique_chars = features.unique_count
     if unique_chars >= length * 0.8:  # 80% de caracteres únicos
         score += 2
     elif unique_chars >= length * 0.6:  # 60% de caracteres únicos
@@ -34,6 +57,9 @@ def strength_score(password):
     if length >= 20:
         score += 1
 
+    if log2_guesses is not None:
+        score = min(score, guess_score_cap(log2_guesses))
+
     return min(score, 10)  # Máximo 10 puntos
 
 def classify(score):
@@ -53,3 +79,26 @@ def is_common_password(password, wordlist):
     """Verifica si la contraseña está en la lista de contraseñas comunes"""
     return password.lower() in wordlist
 
+def common_password_sources(password, wordlist):
+    """Retorna las etiquetas de las listas comunes en las que aparece la contraseña"""
+    if hasattr(wordlist, "matching_tags"):
+        return wordlist.matching_tags(password)
+    return ["common-passwords"] if is_common_password(password, wordlist) else []
+
+def mangled_common_match(password, wordlist):
+    """
+    Busca la contraseña como variante (leet, mayúsculas, invertida, prefijo o
+    sufijo) de una contraseña común; ver WordlistSet.mangled_match
+    """
+    if hasattr(wordlist, "mangled_match"):
+        return wordlist.mangled_match(password)
+    return None
+
+def near_miss_match(password, wordlist):
+    """
+    Busca la contraseña común más cercana a distancia de edición 1-2
+    ("pasword1" -> "password1"); ver WordlistSet.near_miss
+    """
+    if hasattr(wordlist, "near_miss"):
+        return wordlist.near_miss(password)
+    return None
@@ -0,0 +1,68 @@
+from collections import Counter
+
+# Símbolos que reconoce strength_score (mismo conjunto que su expresión regular original)
+SCORE_SYMBOLS = frozenset("!@#$%^&*(),.?\":{}|<>_-+=[]\\/'`~;")
+
+
+class PasswordFeatures:
+    """
+    Características de una contraseña calculadas en una sola pasada
+
+    Se construye una vez por contraseña en analyze_password y se comparte con
+    todos los módulos, que así no vuelven a recorrer los caracteres.
+    Las banderas se calculan sobre los caracteres distintos (claves de
+    `counts`), por lo que el costo es una pasada de Counter más una por
+    carácter único.
+
+    Banderas Unicode (str.islower, str.isupper, str.isdigit, not str.isalnum):
+        has_lower, has_upper, has_digit, has_symbol
+    Banderas de strength_score ([A-Z], [a-z], \\d y su conjunto de símbolos):
+        has_ascii_upper, has_ascii_lower, has_decimal, has_score_symbol
+    """
+
+    __slots__ = (
+        "password", "length", "lower", "counts", "unique_count",
+        "has_lower", "has_upper", "has_digit", "has_symbol",
+        "has_ascii_upper", "has_ascii_lower", "has_decimal", "has_score_symbol",
+    )
+
+    def __init__(self, password):
+        self.password = password
+        self.length = len(password)
+        self.lower = password.lower()
+        self.counts = Counter(password)
+        self.unique_count = len(self.counts)
+
+        has_lower = has_upper = has_digit = has_symbol = False
+        has_ascii_upper = has_ascii_lower = has_decimal = has_score_symbol = False
+        for char in self.counts:
+            if char.islower():
+                has_lower = True
+                if 'a' <= char <= 'z':
+                    has_ascii_lower = True
+            elif char.isupper():
+                has_upper = True
+                if 'A' <= char <= 'Z':
+                    has_ascii_upper = True
+            if char.isdigit():
+                has_digit = True
+                if char.isdecimal():
+                    has_decimal = True
+            if not char.isalnum():
+                has_symbol = True
+                if char in SCORE_SYMBOLS:
+                    has_score_symbol = True
+
+        self.has_lower = has_lower
+        self.has_upper = has_upper
+        self.has_digit = has_digit
+        self.has_symbol = has_symbol
+        self.has_ascii_upper = has_ascii_upper
+        self.has_ascii_lower = has_ascii_lower
+        self.has_decimal = has_decimal
+        self.has_score_symbol = has_score_symbol
+
+
+def extract_features(password):
+    """Calcula las características compartidas de una contraseña"""
+    return PasswordFeatures(password)
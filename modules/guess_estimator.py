@@ -0,0 +1,574 @@
+import math
+import os
+import re
+from datetime import date
+from bisect import bisect_left
+from functools import lru_cache
+from operator import add, sub
+
+from modules.crack_time import get_charset_size, log2_keyspace
+from modules.features import extract_features
+from modules.mangling import CANONICAL, SUBSTITUTION_CHARS, leet_substitutions
+from modules.password_generator import PASSPHRASE_WORDLIST, load_wordlist
+from modules.pattern_detector import (DATA_DIR, KEYBOARD_PATTERNS_FILE, COMMON_WORDS_FILE,
+                                      COMMON_NAMES_FILE, YEAR_RE, load_pattern_file)
+
+# Estimador de intentos al estilo de zxcvbn: se enumeran las coincidencias
+# (diccionario, también con sustituciones leet, secuencia, teclado,
+# repetición, fecha) y se busca la
+# descomposición de la contraseña que un atacante adivinaría con menos intentos.
+
+COMMON_PASSWORDS_FILE = os.path.join(DATA_DIR, "common-passwords.txt")
+
+# Diccionarios con ranking (el orden del archivo es el ranking) y su nombre en los resultados
+RANKED_DICTIONARIES = (
+    ("contraseñas", COMMON_PASSWORDS_FILE),
+    ("palabras", COMMON_WORDS_FILE),
+    ("nombres", COMMON_NAMES_FILE),
+    ("teclado", KEYBOARD_PATTERNS_FILE),
+)
+# Lista sin ranking: cualquier palabra cuesta el tamaño de la lista
+PASSPHRASE_DICTIONARY = "diceware"
+
+# Entradas por diccionario (como zxcvbn): más allá del ranking 30.000 una
+# palabra cuesta casi lo mismo que adivinarla por fuerza bruta
+MAX_DICTIONARY_RANK = 30_000
+# Palabras más cortas no mejoran lo que cuesta adivinarlas por fuerza bruta
+MIN_WORD_LENGTH = 3
+# Solo se buscan patrones en los primeros caracteres; el resto es fuerza bruta
+MAX_MATCH_LENGTH = 100
+
+MIN_SUBMATCH_GUESSES_SINGLE_CHAR = 10
+MIN_SUBMATCH_GUESSES_MULTI_CHAR = 50
+# log2 del mínimo, indexado por "el tramo tiene un solo carácter"
+MIN_SUBMATCH_LOG2 = (math.log2(MIN_SUBMATCH_GUESSES_MULTI_CHAR), math.log2(MIN_SUBMATCH_GUESSES_SINGLE_CHAR))
+# Costo de cada tramo adicional de la descomposición. zxcvbn multiplica por
+# l! (l = número de tramos); un factor fijo por tramo da un resultado
+# parecido para 2-4 tramos y permite un programa dinámico lineal.
+SEGMENT_GUESSES = 3
+SEQUENCE_DELTAS = frozenset(range(-5, 6)) - {0}
+
+REFERENCE_YEAR = date.today().year
+MIN_YEAR_SPACE = 20
+DATE_MIN_YEAR = 1000
+DATE_MAX_YEAR = 2050
+DATE_SEPARATOR_RE = re.compile(r"(\d{1,4})([\s/\\_.-])(\d{1,2})\2(\d{1,4})")
+DIGITS_RE = re.compile(r"\d{4,}")
+# Cortes posibles de una fecha sin separadores, según su longitud
+DATE_SPLITS = {
+    4: ((1, 2), (2, 3)),
+    5: ((1, 3), (2, 3)),
+    6: ((1, 2), (2, 4), (4, 5)),
+    7: ((1, 3), (2, 3), (4, 5), (4, 6)),
+    8: ((2, 4), (4, 6)),
+}
+
+GREEDY_REPEAT_RE = re.compile(r"(.+)\1+")
+LAZY_REPEAT_RE = re.compile(r"(.+?)\1+")
+LAZY_ANCHORED_REPEAT_RE = re.compile(r"^(.+?)\1+$")
+
+# Teclados: (desplazamiento de la fila en anchos de tecla, teclas "normal+shift")
+KEYBOARD_LAYOUTS = {
+    "qwerty": (
+        (0.0, "`~ 1! 2@ 3# 4$ 5% 6^ 7& 8* 9( 0) -_ =+"),
+        (1.5, "qQ wW eE rR tT yY uU iI oO pP [{ ]} \\|"),
+        (1.75, "aA sS dD fF gG hH jJ kK lL ;: '\""),
+        (2.25, "zZ xX cC vV bB nN mM ,< .> /?"),
+    ),
+    "numérico": (
+        (1.0, "/ * -"),
+        (0.0, "7 8 9 +"),
+        (0.0, "4 5 6"),
+        (0.0, "1 2 3"),
+        (0.5, "0 ."),
+    ),
+}
+
+_estimator = None
+
+
+class KeyboardGraph:
+    """
+    Grafo de adyacencia de un teclado
+
+    Dos teclas son vecinas si están en la misma fila o en filas contiguas y
+    sus centros distan como mucho un ancho de tecla. La dirección de cada
+    paso (fila y desplazamiento) sirve para contar los giros de un recorrido.
+    """
+
+    def __init__(self, name, rows):
+        self.name = name
+        keys = {}            # carácter -> tecla
+        self.shifted = set()
+        positions = []
+        for row, (offset, row_keys) in enumerate(rows):
+            for column, key in enumerate(row_keys.split()):
+                keys.update(dict.fromkeys(key, len(positions)))
+                self.shifted.update(key[1:])
+                positions.append((row, offset + column))
+
+        neighbors = [{} for _ in positions]
+        for a, (row_a, x_a) in enumerate(positions):
+            for b, (row_b, x_b) in enumerate(positions):
+                if a != b and abs(row_a - row_b) <= 1 and abs(x_a - x_b) <= 1:
+                    neighbors[a][b] = (row_b - row_a, round(x_b - x_a, 2))
+        self.starting_positions = len(positions)
+        self.average_degree = sum(map(len, neighbors)) / len(positions)
+
+        # Tabla de pasos por carácter: carácter -> {carácter vecino: dirección}
+        self.steps = {char: {other: neighbors[key][other_key] for other, other_key in keys.items()
+                             if other_key in neighbors[key]}
+                      for char, key in keys.items()}
+        # Pares de caracteres vecinos ("qw", "wq", "q1", ...)
+        self.pairs = frozenset(char + other for char, step in self.steps.items() for other in step)
+
+    @lru_cache(maxsize=4096)
+    def log2_guesses(self, length, turns, shifted):
+        """Intentos para un recorrido de `length` teclas con `turns` giros (fórmula de zxcvbn)"""
+        guesses = 0.0
+        for i in range(2, length + 1):
+            for j in range(1, min(turns, i - 1) + 1):
+                guesses += math.comb(i - 1, j - 1) * self.starting_positions * self.average_degree ** j
+        if shifted:
+            unshifted = length - shifted
+            if unshifted == 0:
+                guesses *= 2
+            else:
+                guesses *= sum(math.comb(length, i) for i in range(1, min(shifted, unshifted) + 1))
+        return math.log2(guesses)
+
+
+class GuessEstimate:
+    """Intentos estimados (log2) y la descomposición que los produce"""
+
+    __slots__ = ("log2_guesses", "sequence")
+
+    def __init__(self, log2_guesses, sequence):
+        self.log2_guesses = log2_guesses
+        self.sequence = sequence
+
+    @property
+    def labels(self):
+        return [label for _, _, _, label in self.sequence]
+
+
+def load_ranked_words(path, limit=MAX_DICTIONARY_RANK):
+    """Lee las primeras `limit` palabras distintas de un diccionario ordenado por frecuencia"""
+    return load_pattern_file(path)[:limit]
+
+
+def uppercase_variations(token):
+    """Formas de poner mayúsculas en una palabra con la cantidad de mayúsculas de `token`"""
+    if token == token.lower():
+        return 1
+    # Todas en mayúsculas, o solo la primera o la última: lo primero que se prueba
+    if token == token.upper() or token[1:] == token[1:].lower() or token[:-1] == token[:-1].lower():
+        return 2
+    upper = sum(1 for char in token if char.isupper())
+    lower = sum(1 for char in token if char.islower())
+    return sum(math.comb(upper + lower, i) for i in range(1, min(upper, lower) + 1))
+
+
+def leet_variations(token, substitutions):
+    """
+    Formas de aplicar las sustituciones leet de `token` a la palabra original
+
+    Como en zxcvbn: por cada sustitución, si el texto también conserva la
+    letra original cuenta las combinaciones de cuáles se sustituyen; si no,
+    2 (con o sin la sustitución).
+    """
+    variations = 1
+    for char, original in substitutions.items():
+        substituted = token.count(char)
+        unsubstituted = token.count(original)
+        if not unsubstituted:
+            variations *= 2
+        else:
+            total = substituted + unsubstituted
+            variations *= sum(math.comb(total, i) for i in range(1, min(substituted, unsubstituted) + 1))
+    return variations
+
+
+def sequence_log2_guesses(token, ascending):
+    """Intentos de una secuencia (abcd, 9753, ...): primer carácter por longitud"""
+    if token[0] in "aAzZ019":
+        base = 4
+    elif token[0].isdigit():
+        base = 10
+    else:
+        base = 26
+    if not ascending:
+        base *= 2
+    return math.log2(base * len(token))
+
+
+def _two_to_four(year):
+    if year > 99:
+        return year
+    return year + (1900 if year > 50 else 2000)
+
+
+def _day_month(first, second):
+    for day, month in ((first, second), (second, first)):
+        if 1 <= day <= 31 and 1 <= month <= 12:
+            return day, month
+    return None
+
+
+def _parse_date(values):
+    """Año de tres números (día, mes y año en cualquier orden habitual), o None"""
+    if values[1] > 31 or values[1] <= 0:
+        return None
+    if any(value > 99 and not DATE_MIN_YEAR <= value <= DATE_MAX_YEAR for value in values):
+        return None
+    candidates = ((values[2], values[0], values[1]), (values[0], values[1], values[2]))
+    for year, first, second in candidates:
+        if DATE_MIN_YEAR <= year <= DATE_MAX_YEAR and _day_month(first, second):
+            return year
+    for year, first, second in candidates:
+        if year <= 99 and _day_month(first, second):
+            return _two_to_four(year)
+    return None
+
+
+def date_log2_guesses(year, separator):
+    guesses = max(abs(year - REFERENCE_YEAR), MIN_YEAR_SPACE) * 365
+    if separator:
+        guesses *= 4
+    return math.log2(guesses)
+
+
+@lru_cache(maxsize=1 << 16)
+def digit_date_log2_guesses(token):
+    """
+    Intentos (log2) de un texto de 4 a 8 dígitos sin separadores leído como
+    fecha (la más cercana a REFERENCE_YEAR), o None si no es una fecha
+
+    Los mismos fragmentos se repiten mucho entre contraseñas (años, fechas,
+    123456), así que el resultado se guarda por fragmento.
+    """
+    best = None
+    for k, l in DATE_SPLITS[len(token)]:
+        year = _parse_date((int(token[:k]), int(token[k:l]), int(token[l:])))
+        if year is not None and (best is None or abs(year - REFERENCE_YEAR) < abs(best - REFERENCE_YEAR)):
+            best = year
+    return None if best is None else date_log2_guesses(best, False)
+
+
+class GuessEstimator:
+    """
+    Estimador de intentos con descomposición de mínimo costo
+
+    Los diccionarios se cargan una sola vez en una tabla plana (palabra ->
+    entero con ranking, diccionario y si está invertida), que incluye las
+    palabras invertidas para no recorrer la contraseña dos veces y todos los
+    prefijos de al menos MIN_WORD_LENGTH caracteres (con valor 0): desde cada
+    posición se extiende el texto mientras siga siendo un prefijo, así que
+    casi todas las posiciones cuestan una sola consulta. Una segunda tabla
+    indexa las mismas palabras por su forma canónica (modules.mangling) para
+    encontrar variantes leet ("p@ssw0rd") sin enumerar sustituciones.
+
+    La descomposición se calcula con un programa dinámico de un solo
+    recorrido: para cada posición se guarda el mejor costo (log2 de intentos)
+    terminando en una coincidencia y terminando en fuerza bruta, así que el
+    costo es lineal en la longitud más el número de coincidencias. Los
+    caracteres sueltos cuestan el tamaño del charset de la contraseña, de
+    modo que una contraseña sin patrones da el mismo espacio de búsqueda que
+    la fuerza bruta de crack_time.
+    """
+
+    def __init__(self, dictionaries, keyboards=None):
+        # dictionaries: lista de (nombre, palabras en orden de ranking, con_ranking)
+        self.dictionary_names = []
+        self.table = {}
+        for name, words, ranked in dictionaries:
+            dictionary_id = len(self.dictionary_names)
+            self.dictionary_names.append(name)
+            for rank, word in enumerate(words, start=1):
+                if len(word) < MIN_WORD_LENGTH:
+                    continue
+                rank = rank if ranked else len(words)
+                self._add_word(word, rank << 4 | dictionary_id << 1)
+                self._add_word(word[::-1], rank << 4 | dictionary_id << 1 | 1)
+        # Forma canónica -> palabras (o invertidas) que la tienen; () para los prefijos
+        self.leet_table = {}
+        for word in self.table:
+            self.leet_table.setdefault(word.translate(CANONICAL), []).append(word)
+        for word in list(self.table):
+            for end in range(MIN_WORD_LENGTH, len(word)):
+                self.table.setdefault(word[:end], 0)
+        for form in list(self.leet_table):
+            for end in range(MIN_WORD_LENGTH, len(form)):
+                self.leet_table.setdefault(form[:end], ())
+        self.keyboards = [KeyboardGraph(name, rows)
+                          for name, rows in (keyboards or KEYBOARD_LAYOUTS).items()]
+        self._segment_log2 = math.log2(SEGMENT_GUESSES)
+        # Las bases de las repeticiones ("ab" en "ababab") se repiten mucho entre contraseñas
+        self._base_log2_guesses = lru_cache(maxsize=65536)(lambda base: self.estimate(base).log2_guesses)
+
+    def _add_word(self, word, entry):
+        current = self.table.get(word)
+        # Se conserva la entrada de menor costo (ranking, y x2 si está invertida)
+        if not current or (entry >> 4) << (entry & 1) < (current >> 4) << (current & 1):
+            self.table[word] = entry
+
+    # Coincidencias: tuplas (inicio, fin, log2 de intentos, descripción)
+
+    def dictionary_matches(self, password, lower, matches):
+        lookup = self.table.get
+        n = len(lower)
+        # Solo se recorren las posiciones donde empieza un prefijo (una consulta en C por posición)
+        starts = map("".join, zip(*(lower[k:] for k in range(MIN_WORD_LENGTH))))
+        hits = bytes(map(self.table.__contains__, starts))
+        i = hits.find(1)
+        while i != -1:
+            for j in range(i + MIN_WORD_LENGTH, n + 1):
+                entry = lookup(lower[i:j])
+                if entry is None:
+                    break
+                if not entry:
+                    continue
+                token = password[i:j]
+                guesses = (entry >> 4) * uppercase_variations(token)
+                word = lower[i:j]
+                detail = ""
+                if entry & 1:
+                    guesses *= 2
+                    word = word[::-1]
+                    detail = ", invertida"
+                name = self.dictionary_names[entry >> 1 & 7]
+                matches.append((i, j, math.log2(guesses), f"Diccionario {name} ({word}{detail})"))
+            i = hits.find(1, i + 1)
+
+    def leet_matches(self, password, lower, matches):
+        # Solo interesan los tramos con al menos una sustitución (dígito o
+        # símbolo); el resto ya lo encuentra dictionary_matches
+        if SUBSTITUTION_CHARS.isdisjoint(lower):
+            return
+        canonical = lower.translate(CANONICAL)
+        lookup = self.leet_table.get
+        n = len(canonical)
+        starts = map("".join, zip(*(canonical[k:] for k in range(MIN_WORD_LENGTH))))
+        hits = bytes(map(self.leet_table.__contains__, starts))
+        i = hits.find(1)
+        while i != -1:
+            for j in range(i + MIN_WORD_LENGTH, n + 1):
+                words = lookup(canonical[i:j])
+                if words is None:
+                    break
+                token = lower[i:j]
+                if not words or SUBSTITUTION_CHARS.isdisjoint(token):
+                    continue
+                # Palabras con la misma forma canónica: se confirma cada una
+                best = None
+                for word in words:
+                    substitutions = leet_substitutions(token, word)
+                    if not substitutions:
+                        continue
+                    entry = self.table[word]
+                    guesses = (entry >> 4) * leet_variations(token, substitutions) << (entry & 1)
+                    if best is None or guesses < best[0]:
+                        best = (guesses, word, entry, substitutions)
+                if best is None:
+                    continue
+                guesses, word, entry, substitutions = best
+                guesses *= uppercase_variations(password[i:j])
+                detail = ", invertida" if entry & 1 else ""
+                if entry & 1:
+                    word = word[::-1]
+                leet = ", ".join(f"{char}→{original}" for char, original in sorted(substitutions.items()))
+                name = self.dictionary_names[entry >> 1 & 7]
+                matches.append((i, j, math.log2(guesses), f"Diccionario {name} ({word}, leet {leet}{detail})"))
+            i = hits.find(1, i + 1)
+
+    def spatial_matches(self, password, matches):
+        pairs = list(map(add, password, password[1:]))
+        for graph in self.keyboards:
+            # Un recorrido son al menos dos pares de vecinos seguidos
+            adjacent = bytes(map(graph.pairs.__contains__, pairs))
+            i = adjacent.find(b"\1\1")
+            while i != -1:
+                end = adjacent.find(0, i)
+                if end == -1:
+                    end = len(adjacent)
+                token = password[i:end + 1]
+                turns = 0
+                last_direction = None
+                for previous, char in zip(token, token[1:]):
+                    direction = graph.steps[previous][char]
+                    if direction != last_direction:
+                        turns += 1
+                        last_direction = direction
+                shifted = sum(1 for char in token if char in graph.shifted)
+                matches.append((i, end + 1, graph.log2_guesses(len(token), turns, shifted),
+                                f"Teclado {graph.name} ({token})"))
+                i = adjacent.find(b"\1\1", end)
+
+    def sequence_matches(self, password, matches):
+        codes = list(map(ord, password))
+        deltas = list(map(sub, codes[1:], codes[:-1]))
+        if SEQUENCE_DELTAS.isdisjoint(deltas):
+            return
+        # Tramos de diferencia constante: deltas[k:end] cubre password[k:end + 1]
+        k = 0
+        while k < len(deltas):
+            delta = deltas[k]
+            end = k + 1
+            while end < len(deltas) and deltas[end] == delta:
+                end += 1
+            if delta in SEQUENCE_DELTAS and (end - k > 1 or abs(delta) == 1):
+                token = password[k:end + 1]
+                if token.islower() or token.isupper() or token.isdigit():
+                    matches.append((k, end + 1, sequence_log2_guesses(token, delta > 0),
+                                    f"Secuencia ({token})"))
+            k = end
+
+    def repeat_matches(self, password, matches):
+        if len(set(password)) == len(password):
+            return
+        position = 0
+        while position < len(password):
+            greedy = GREEDY_REPEAT_RE.search(password, position)
+            if greedy is None:
+                return
+            lazy = LAZY_REPEAT_RE.search(password, position)
+            if len(greedy.group(0)) > len(lazy.group(0)):
+                match = greedy
+                base = LAZY_ANCHORED_REPEAT_RE.match(greedy.group(0)).group(1)
+            else:
+                match = lazy
+                base = lazy.group(1)
+            start, end = match.span()
+            count = (end - start) // len(base)
+            log2_guesses = self._base_log2_guesses(base) + math.log2(count)
+            matches.append((start, end, log2_guesses, f"Repetición ({base} x{count})"))
+            position = end
+
+    def date_matches(self, password, matches):
+        for run in DIGITS_RE.finditer(password):
+            digits = run.group(0)
+            for i in range(len(digits) - 3):
+                for j in range(i + 4, min(len(digits), i + 8) + 1):
+                    log2_guesses = digit_date_log2_guesses(digits[i:j])
+                    if log2_guesses is not None:
+                        matches.append((run.start() + i, run.start() + j, log2_guesses, f"Fecha ({digits[i:j]})"))
+        for match in DATE_SEPARATOR_RE.finditer(password):
+            year = _parse_date((int(match.group(1)), int(match.group(3)), int(match.group(4))))
+            if year is not None:
+                matches.append((match.start(), match.end(), date_log2_guesses(year, True),
+                                f"Fecha ({match.group(0)})"))
+        for match in YEAR_RE.finditer(password):
+            year = int(match.group(0))
+            matches.append((match.start(), match.end(),
+                            math.log2(max(abs(year - REFERENCE_YEAR), MIN_YEAR_SPACE)),
+                            f"Año ({match.group(0)})"))
+
+    def matches(self, password, lower=None):
+        """Todas las coincidencias de la contraseña (se pueden solapar)"""
+        password = password[:MAX_MATCH_LENGTH]
+        if lower is None or len(lower) != len(password):
+            lower = password.lower()
+            if len(lower) != len(password):
+                # Algunos caracteres cambian de longitud al pasar a minúsculas
+                lower = "".join(c if len(c.lower()) != 1 else c.lower() for c in password)
+        matches = []
+        self.dictionary_matches(password, lower, matches)
+        self.leet_matches(password, lower, matches)
+        self.spatial_matches(password, matches)
+        self.sequence_matches(password, matches)
+        self.repeat_matches(password, matches)
+        self.date_matches(password, matches)
+        return matches
+
+    def estimate(self, password, features=None):
+        """
+        Intentos que necesita un atacante que conoce estos patrones
+
+        Returns:
+            GuessEstimate: log2 de los intentos y la descomposición elegida
+            (tuplas (inicio, fin, log2 de intentos, descripción))
+        """
+        features = features or extract_features(password)
+        n = len(password)
+        charset_size = get_charset_size(features)
+        keyspace = log2_keyspace(charset_size, n)
+        matches = self.matches(password, features.lower[:MAX_MATCH_LENGTH])
+        if not matches:
+            return GuessEstimate(keyspace, [(0, n, keyspace, f"Fuerza bruta ({password})")] if n else [])
+
+        brute_log2 = math.log2(charset_size)
+        segment_log2 = self._segment_log2
+        ending_at = {}
+        for match in matches:
+            ending_at.setdefault(match[1], []).append(match)
+
+        # Estados: el inicio y cada posición donde termina una coincidencia, con
+        # el mejor costo de la contraseña hasta ahí. Un tramo de fuerza bruta
+        # [s, k) cuesta lo mismo por carácter, así que su mejor inicio sale del
+        # mínimo acumulado de costo(s) - s * c entre los estados anteriores.
+        ends = [0]
+        costs = {0: 0.0}
+        links = {}
+        runs = [(0.0, 0)]
+        for end in sorted(ending_at):
+            best = math.inf
+            for match in ending_at[end]:
+                start, _, log2_guesses, _ = match
+                # Un tramo que no es toda la contraseña cuesta al menos lo que fija zxcvbn
+                if end - start < n:
+                    log2_guesses = max(log2_guesses, MIN_SUBMATCH_LOG2[end - start == 1])
+                # Lo anterior termina en una coincidencia o en un tramo de fuerza bruta
+                previous, in_pattern, run_start = 0.0, True, None
+                if start:
+                    run_key, run_start = runs[bisect_left(ends, start) - 1]
+                    after_brute = run_key + start * brute_log2
+                    after_pattern = costs.get(start, math.inf)
+                    in_pattern = after_pattern <= after_brute
+                    previous = (after_pattern if in_pattern else after_brute) + segment_log2
+                if previous + log2_guesses < best:
+                    best = previous + log2_guesses
+                    links[end] = ((start, end, log2_guesses, match[3]), in_pattern, run_start)
+            ends.append(end)
+            costs[end] = best
+            runs.append(min(runs[-1], (best + segment_log2 - end * brute_log2, end)))
+
+        run_key, run_start = runs[bisect_left(ends, n) - 1]
+        after_brute = run_key + n * brute_log2
+        log2_guesses = min(costs.get(n, math.inf), after_brute)
+        if keyspace < log2_guesses:
+            return GuessEstimate(keyspace, [(0, n, keyspace, f"Fuerza bruta ({password})")])
+
+        # Reconstrucción de la descomposición
+        sequence = []
+        k = n
+        in_pattern = costs.get(n, math.inf) <= after_brute
+        while k > 0:
+            if in_pattern:
+                match, in_pattern, run_start = links[k]
+                sequence.append(match)
+                k = match[0]
+            else:
+                sequence.append((run_start, k, brute_log2 * (k - run_start),
+                                 f"Fuerza bruta ({password[run_start:k]})"))
+                k = run_start
+                in_pattern = True
+        sequence.reverse()
+        return GuessEstimate(log2_guesses, sequence)
+
+
+def get_estimator():
+    """Retorna el estimador con los diccionarios de data/ (se carga una vez por proceso)"""
+    global _estimator
+    if _estimator is None:
+        dictionaries = [(name, load_ranked_words(path), True) for name, path in RANKED_DICTIONARIES]
+        try:
+            dictionaries.append((PASSPHRASE_DICTIONARY, load_wordlist(PASSPHRASE_WORDLIST), False))
+        except FileNotFoundError:
+            pass
+        _estimator = GuessEstimator(dictionaries)
+    return _estimator
+
+
+def estimate_guesses(password, features=None):
+    """Estima los intentos (log2) con los patrones de la contraseña"""
+    return get_estimator().estimate(password, features)
@@ -0,0 +1,387 @@
+import argparse
+import hashlib
+import math
+import mmap
+import os
+import re
+import shutil
+import struct
+import tempfile
+
+# Formato del índice de hashes (uno por wordlist y algoritmo):
+#   cabecera (32 bytes) | registros ordenados por digest | blob de contraseñas
+# Cada registro es (digest binario, offset de la contraseña en el blob). Como
+# los registros están ordenados, un volcado de hashes se resuelve con una sola
+# pasada de merge (o búsquedas binarias si el volcado es chico).
+MAGIC = b"PWHASH01"
+HEADER = struct.Struct(">8s8sQQ")
+# La compilación reparte las contraseñas en 256 particiones por el primer
+# byte del digest y ordena una por vez, como el índice de wordlists, así que
+# los registros no se juntan en memoria. En las particiones cada entrada es
+# el digest y la longitud de la contraseña, seguidos de la contraseña.
+PARTITION_BITS = 8
+
+ALGORITHMS = ("ntlm", "sha1", "md5")
+DIGEST_SIZES = {"ntlm": 16, "sha1": 20, "md5": 16}
+
+# Línea de pwdump/secretsdump: usuario:RID:LM:NT:::
+PWDUMP_LINE = re.compile(r"^(?P<user>[^:]*):\d+:(?P<lm>[0-9a-fA-F]{32}):(?P<nt>[0-9a-fA-F]{32}):")
+HEX_HASH = re.compile(r"^[0-9a-fA-F]+$")
+
+
+def _record_struct(algorithm):
+    return struct.Struct(f">{DIGEST_SIZES[algorithm]}sQ")
+
+
+# hashlib solo ofrece MD4 si OpenSSL tiene habilitados los algoritmos "legacy"
+_MASK = 0xFFFFFFFF
+_MD4_ROUND3 = (0, 8, 4, 12, 2, 10, 6, 14, 1, 9, 5, 13, 3, 11, 7, 15)
+
+
+def _rotl(x, n):
+    x &= _MASK
+    return ((x << n) | (x >> (32 - n))) & _MASK
+
+
+def _md4(data):
+    """MD4 (RFC 1320) en Python puro"""
+    bit_length = len(data) * 8
+    data += b"\x80" + b"\x00" * ((55 - len(data)) % 64) + struct.pack("<Q", bit_length)
+    state = (0x67452301, 0xEFCDAB89, 0x98BADCFE, 0x10325476)
+    for start in range(0, len(data), 64):
+        x = struct.unpack("<16I", data[start:start + 64])
+        a, b, c, d = state
+        for i in range(16):
+            a = _rotl(a + ((b & c) | (~b & d)) + x[i], (3, 7, 11, 19)[i % 4])
+            a, b, c, d = d, a, b, c
+        for i in range(16):
+            a = _rotl(a + ((b & c) | (b & d) | (c & d)) + x[(i % 4) * 4 + i // 4] + 0x5A827999,
+                      (3, 5, 9, 13)[i % 4])
+            a, b, c, d = d, a, b, c
+        for i in range(16):
+            a = _rotl(a + (b ^ c ^ d) + x[_MD4_ROUND3[i]] + 0x6ED9EBA1, (3, 9, 11, 15)[i % 4])
+            a, b, c, d = d, a, b, c
+        state = tuple((v + w) & _MASK for v, w in zip(state, (a, b, c, d)))
+    return struct.pack("<4I", *state)
+
+
+def _md4_digest():
+    try:
+        hashlib.new("md4", b"")
+        return lambda data: hashlib.new("md4", data).digest()
+    except ValueError:
+        return _md4
+
+
+_md4_function = _md4_digest()
+
+
+def hash_password(password, algorithm):
+    """
+    Calcula el digest binario de una contraseña
+
+    NTLM es MD4 sobre UTF-16LE; SHA-1 y MD5 se calculan sobre UTF-8, como en
+    las aplicaciones que los guardan sin sal.
+    """
+    if algorithm == "ntlm":
+        return _md4_function(password.encode('utf-16-le', 'surrogatepass'))
+    return hashlib.new(algorithm, password.encode('utf-8', 'surrogatepass')).digest()
+
+
+def hash_index_path_for(wordlist_path, algorithm):
+    """Retorna la ruta del índice de hashes de una wordlist"""
+    base, _ = os.path.splitext(wordlist_path)
+    return f"{base}.{algorithm}.hidx"
+
+
+def iter_candidates(wordlist_path):
+    """
+    Itera las contraseñas de una wordlist de texto o de un índice .idx
+
+    A diferencia de la búsqueda de contraseñas comunes, aquí no se pasa a
+    minúsculas: el hash depende de la contraseña exacta.
+    """
+    if wordlist_path.endswith(".idx"):
+        from modules.wordlist_index import WordlistIndex
+        index = WordlistIndex(wordlist_path)
+        try:
+            yield from index.values()
+        finally:
+            index.close()
+        return
+    with open(wordlist_path, 'r', encoding='utf-8', errors='ignore') as f:
+        for line in f:
+            word = line.strip()
+            if word:
+                yield word
+
+
+def build_hash_index(wordlist_path, algorithm, output_path=None):
+    """
+    Precalcula los hashes de una wordlist con un algoritmo
+
+    Las contraseñas repetidas se guardan una sola vez; se descartan al
+    ordenar cada partición, así que no hace falta recordar las ya vistas.
+
+    Returns:
+        int: Número de registros escritos
+    """
+    output_path = output_path or hash_index_path_for(wordlist_path, algorithm)
+    record = _record_struct(algorithm)
+
+    entry = struct.Struct(f">{DIGEST_SIZES[algorithm]}sI")
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(output_path))) as workdir:
+        partitions = [open(os.path.join(workdir, f"{i}.part"), 'w+b') for i in range(1 << PARTITION_BITS)]
+        blob_path = os.path.join(workdir, "blob")
+        count = 0
+        try:
+            for password in iter_candidates(wordlist_path):
+                digest = hash_password(password, algorithm)
+                data = password.encode('utf-8', 'surrogatepass')
+                partitions[digest[0] >> (8 - PARTITION_BITS)].write(entry.pack(digest, len(data)) + data)
+
+            tmp_path = output_path + ".tmp"
+            with open(tmp_path, 'wb') as f, open(blob_path, 'w+b') as blob:
+                f.write(HEADER.pack(MAGIC, algorithm.encode('ascii'), 0, 0))
+                for partition in partitions:
+                    for digest, data in _read_partition(partition, entry):
+                        f.write(record.pack(digest, blob.tell()))
+                        blob.write(data + b"\n")
+                        count += 1
+                blob.seek(0)
+                shutil.copyfileobj(blob, f)
+                f.seek(0)
+                f.write(HEADER.pack(MAGIC, algorithm.encode('ascii'), count, HEADER.size + record.size * count))
+            os.replace(tmp_path, output_path)
+        finally:
+            for partition in partitions:
+                partition.close()
+
+    return count
+
+
+def _read_partition(partition, entry):
+    """
+    Lee una partición temporal de build_hash_index
+
+    Returns:
+        list: Pares (digest, contraseña en bytes) distintos, ordenados por
+        digest. Las contraseñas repetidas se guardan una sola vez.
+    """
+    partition.seek(0)
+    data = partition.read()
+    entries = set()
+    position = 0
+    while position < len(data):
+        digest, size = entry.unpack_from(data, position)
+        position += entry.size
+        entries.add((digest, data[position:position + size]))
+        position += size
+    return sorted(entries)
+
+
+def ensure_hash_index(wordlist_path, algorithm):
+    """Compila el índice de hashes solo si no existe o está desactualizado"""
+    output_path = hash_index_path_for(wordlist_path, algorithm)
+    if (not os.path.exists(output_path)
+            or os.path.getmtime(output_path) < os.path.getmtime(wordlist_path)):
+        build_hash_index(wordlist_path, algorithm, output_path)
+    return output_path
+
+
+def open_hash_index(wordlist_path, algorithm):
+    """Abre el índice de hashes de una wordlist; lo recompila si falta, está desactualizado o dañado"""
+    path = ensure_hash_index(wordlist_path, algorithm)
+    try:
+        index = HashIndex(path)
+    except ValueError:
+        build_hash_index(wordlist_path, algorithm, path)
+        index = HashIndex(path)
+    if index.algorithm != algorithm:
+        index.close()
+        build_hash_index(wordlist_path, algorithm, path)
+        index = HashIndex(path)
+    return index
+
+
+class HashIndex:
+    """Índice de hashes mapeado en memoria"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size < HEADER.size:
+                raise ValueError(f"'{path}' no es un índice de hashes válido")
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, algorithm, count, blob_offset = HEADER.unpack_from(self._mm, 0)
+        algorithm = algorithm.rstrip(b"\0").decode('ascii', 'replace')
+        if magic != MAGIC or algorithm not in DIGEST_SIZES:
+            self._mm.close()
+            raise ValueError(f"'{path}' no es un índice de hashes válido")
+        record = _record_struct(algorithm)
+        if blob_offset != HEADER.size + record.size * count or blob_offset > len(self._mm):
+            # Archivo truncado (p. ej. una compilación interrumpida)
+            self._mm.close()
+            raise ValueError(f"'{path}' está incompleto; vuelva a compilarlo")
+
+        self.algorithm = algorithm
+        self.count = count
+        self._record = record
+        self._blob_offset = blob_offset
+
+    def __len__(self):
+        return self.count
+
+    def _digest_at(self, i):
+        offset = HEADER.size + i * self._record.size
+        return self._mm[offset:offset + DIGEST_SIZES[self.algorithm]]
+
+    def _password_at(self, blob_offset):
+        start = self._blob_offset + blob_offset
+        end = self._mm.find(b"\n", start)
+        return self._mm[start:end].decode('utf-8', 'surrogatepass')
+
+    def lookup(self, digest):
+        """Retorna la contraseña con ese digest, o None"""
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._digest_at(mid) < digest:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.count and self._digest_at(lo) == digest:
+            return self._password_at(self._record.unpack_from(
+                self._mm, HEADER.size + lo * self._record.size)[1])
+        return None
+
+    def resolve(self, digests):
+        """
+        Resuelve un conjunto de digests en una sola pasada
+
+        Si el volcado es chico frente al índice conviene una búsqueda binaria
+        por hash (m·log n); si no, se recorre el índice una vez en paralelo
+        con los digests ordenados (merge, n + m).
+
+        Returns:
+            dict: digest -> contraseña, solo para los encontrados
+        """
+        targets = sorted(set(digests))
+        if not targets or not self.count:
+            return {}
+        if len(targets) * math.log2(self.count + 1) < self.count:
+            found = {}
+            for digest in targets:
+                password = self.lookup(digest)
+                if password is not None:
+                    found[digest] = password
+            return found
+
+        found = {}
+        records = memoryview(self._mm)[HEADER.size:self._blob_offset]
+        try:
+            position = 0
+            target = targets[0]
+            for digest, blob_offset in self._record.iter_unpack(records):
+                while target < digest:
+                    position += 1
+                    if position == len(targets):
+                        return found
+                    target = targets[position]
+                if target == digest:
+                    found[digest] = self._password_at(blob_offset)
+        finally:
+            records.release()
+        return found
+
+    def close(self):
+        self._mm.close()
+
+
+def parse_hash_line(line, algorithm=None):
+    """
+    Interpreta una línea de un volcado de hashes
+
+    Acepta "HASH", "usuario:HASH" y el formato de pwdump/secretsdump
+    (usuario:RID:LM:NT:::), del que se toma el hash NT.
+
+    Args:
+        line: Línea del volcado
+        algorithm: Algoritmo de los hashes, o None para deducirlo de la longitud
+            (40 hex = SHA-1; 32 hex = NTLM o MD5, se prueban ambos)
+
+    Returns:
+        tuple: (usuario, hash_hex, algoritmos candidatos), o None si la línea no es válida
+    """
+    line = line.strip()
+    if not line:
+        return None
+
+    match = PWDUMP_LINE.match(line)
+    if match and algorithm in (None, "ntlm"):
+        return match.group("user"), match.group("nt").lower(), ("ntlm",)
+
+    user, _, hex_hash = line.rpartition(":")
+    if not HEX_HASH.match(hex_hash):
+        return None
+    candidates = tuple(name for name in ((algorithm,) if algorithm else ALGORITHMS)
+                       if DIGEST_SIZES[name] * 2 == len(hex_hash))
+    if not candidates:
+        return None
+    return user, hex_hash.lower(), candidates
+
+
+def resolve_hashes(entries, wordlist_paths):
+    """
+    Resuelve los hashes de un volcado contra los índices de las wordlists
+
+    Cada algoritmo necesario se resuelve con una pasada por índice sobre el
+    conjunto de digests distintos del volcado, sin importar cuántas veces se
+    repita cada hash.
+
+    Args:
+        entries: Lista de tuplas (usuario, hash_hex, algoritmos) de parse_hash_line
+        wordlist_paths: Wordlists .txt/.idx (los índices .hidx se compilan si faltan
+            o están dañados)
+
+    Returns:
+        dict: (algoritmo, hash_hex) -> contraseña, solo para los resueltos
+    """
+    pending = {}
+    for _, hex_hash, candidates in entries:
+        for algorithm in candidates:
+            pending.setdefault(algorithm, set()).add(hex_hash)
+
+    resolved = {}
+    for algorithm, hex_hashes in pending.items():
+        digests = {bytes.fromhex(hex_hash) for hex_hash in hex_hashes}
+        for wordlist_path in wordlist_paths:
+            index = open_hash_index(wordlist_path, algorithm)
+            try:
+                found = index.resolve(digests)
+            finally:
+                index.close()
+            for digest, password in found.items():
+                resolved[(algorithm, digest.hex())] = password
+            digests.difference_update(found)
+            if not digests:
+                break
+    return resolved
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precalcula los hashes de una wordlist para auditar volcados")
+    parser.add_argument("wordlist", help="Wordlist de texto o índice .idx")
+    parser.add_argument("-a", "--algorithm", action="append", choices=ALGORITHMS,
+                        help="Algoritmo a precalcular (repetible; por defecto todos)")
+    args = parser.parse_args(argv)
+
+    for algorithm in args.algorithm or ALGORITHMS:
+        output_path = hash_index_path_for(args.wordlist, algorithm)
+        count = build_hash_index(args.wordlist, algorithm, output_path)
+        print(f"[OK] Índice {algorithm.upper()} con {count:,} hashes guardado en: {output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+import os
+import re
+import time
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "password-auditor", "hibp")
+DEFAULT_TTL = 7 * 24 * 3600          # Una semana
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024  # 512 MB
+
+# Una línea de /range/: sufijo SHA-1 de 35 caracteres y ocurrencias
+RANGE_LINE_RE = re.compile(r"[0-9A-F]{35}:[0-9]+")
+
+
+def valid_range(text):
+    """
+    True si el texto tiene la forma de una respuesta /range/
+
+    Un 200 con otro contenido (un portal cautivo, una página de error de un
+    proxy) no se cachea ni se interpreta como rango: se trata como un error
+    de la consulta.
+    """
+    lines = text.splitlines()
+    return bool(lines) and all(map(RANGE_LINE_RE.fullmatch, lines))
+
+
+class RangeCache:
+    """
+    Caché en disco de respuestas /range/ de Have I Been Pwned
+
+    Guarda un archivo por prefijo de 5 caracteres. Las entradas expiran tras
+    `ttl` segundos y, si el tamaño total supera `max_bytes`, se eliminan
+    primero las respuestas descargadas hace más tiempo.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+        self._sizes = {}
+        for entry in os.scandir(directory):
+            if entry.is_file() and entry.name.endswith(".txt"):
+                self._sizes[entry.name[:-4]] = entry.stat().st_size
+        self._total = sum(self._sizes.values())
+
+    def _path(self, prefix):
+        return os.path.join(self.directory, prefix + ".txt")
+
+    def get(self, prefix):
+        """Retorna la respuesta cacheada de un prefijo, o None si no existe, expiró o no es válida"""
+        path = self._path(prefix)
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl:
+                self._remove(prefix)
+                self.misses += 1
+                return None
+            with open(path, 'r', encoding='ascii') as f:
+                text = f.read()
+        except (OSError, UnicodeDecodeError):
+            self.misses += 1
+            return None
+        if not valid_range(text):
+            # Entrada corrupta (o guardada por una versión que no validaba)
+            self._remove(prefix)
+            self.misses += 1
+            return None
+        self.hits += 1
+        return text
+
+    def put(self, prefix, text):
+        """Guarda la respuesta de un prefijo y aplica el límite de tamaño"""
+        if not valid_range(text):
+            raise ValueError(f"Respuesta /range/ inválida para el prefijo {prefix}")
+        path = self._path(prefix)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w', encoding='ascii') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+
+        size = os.path.getsize(path)
+        self._total += size - self._sizes.get(prefix, 0)
+        self._sizes[prefix] = size
+
+        if self._total > self.max_bytes:
+            self._evict()
+
+    def _remove(self, prefix):
+        try:
+            os.remove(self._path(prefix))
+        except OSError:
+            pass
+        self._total -= self._sizes.pop(prefix, 0)
+
+    def _evict(self):
+        """Elimina las entradas más antiguas hasta quedar por debajo del 90% del límite"""
+        target = self.max_bytes * 0.9
+        by_age = []
+        for prefix in self._sizes:
+            try:
+                by_age.append((os.path.getmtime(self._path(prefix)), prefix))
+            except OSError:
+                by_age.append((0, prefix))
+        by_age.sort()
+
+        for _, prefix in by_age:
+            if self._total <= target:
+                break
+            self._remove(prefix)
@@ -0,0 +1,175 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from modules.hibp_cache import valid_range
+from modules.metrics import get_metrics
+
+DEFAULT_BASE_URL = "https://api.pwnedpasswords.com"
+
+
+class HIBPClient:
+    """
+    Cliente concurrente para el endpoint /range/ de Have I Been Pwned
+
+    - Sesión HTTP con keep-alive y un pool de conexiones del tamaño del límite
+    - Límite configurable de peticiones simultáneas, que se reduce a la mitad
+      ante un 429/503 (respetando Retry-After) y vuelve a crecer de a uno con
+      cada respuesta correcta
+    - Circuit breaker: tras `breaker_threshold` fallos consecutivos deja de
+      usar la red durante `breaker_cooldown` segundos y responde None, para
+      que quien llama degrade a la ruta offline
+    - Una respuesta 200 que no tiene la forma de un rango (un portal cautivo)
+      cuenta como fallo y responde None
+
+    `base_url` permite apuntar el cliente a un servidor local de pruebas.
+    """
+
+    def __init__(self, base_url=DEFAULT_BASE_URL, max_in_flight=8, timeout=3, max_retries=3,
+                 breaker_threshold=5, breaker_cooldown=30):
+        self.base_url = base_url.rstrip('/')
+        self.max_in_flight = max(1, max_in_flight)
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown = breaker_cooldown
+
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = "Password-Auditor"
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_in_flight)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self.limit = self.max_in_flight
+        self.requests_made = 0
+        self.throttled = 0
+        self.errors = 0
+        self._in_flight = 0
+        self._consecutive_failures = 0
+        self._opened_at = None
+        self._cond = threading.Condition()
+
+    # --- Control de concurrencia -------------------------------------------
+
+    def _acquire(self):
+        with self._cond:
+            while self._in_flight >= self.limit:
+                self._cond.wait()
+            self._in_flight += 1
+            self.requests_made += 1
+
+    def _release(self):
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    def _on_throttled(self):
+        with self._cond:
+            self.throttled += 1
+            self.limit = max(1, self.limit // 2)
+
+    def _on_success(self):
+        with self._cond:
+            self._consecutive_failures = 0
+            self._opened_at = None
+            if self.limit < self.max_in_flight:
+                self.limit += 1
+                self._cond.notify_all()
+
+    def _on_failure(self):
+        with self._cond:
+            self.errors += 1
+            self._consecutive_failures += 1
+            if self._consecutive_failures >= self.breaker_threshold:
+                self._opened_at = time.monotonic()
+
+    # --- Circuit breaker ---------------------------------------------------
+
+    @property
+    def breaker_open(self):
+        """True mientras el circuito está abierto (sin usar la red)"""
+        with self._cond:
+            if self._opened_at is None:
+                return False
+            if time.monotonic() - self._opened_at >= self.breaker_cooldown:
+                # Semiabierto: se permite un nuevo intento; si falla se vuelve a abrir
+                self._opened_at = None
+                self._consecutive_failures = self.breaker_threshold - 1
+                return False
+            return True
+
+    # --- Peticiones --------------------------------------------------------
+
+    @staticmethod
+    def _retry_after(response, attempt):
+        value = response.headers.get("Retry-After")
+        try:
+            return min(float(value), 60.0)
+        except (TypeError, ValueError):
+            return min(0.5 * (2 ** attempt), 8.0)
+
+    def fetch_range(self, prefix):
+        """
+        Obtiene la respuesta /range/{prefix}
+
+        Returns:
+            str: Texto de la respuesta, o None si falló o el circuito está abierto
+        """
+        if self.breaker_open:
+            return None
+
+        url = f"{self.base_url}/range/{prefix}"
+        for attempt in range(self.max_retries + 1):
+            self._acquire()
+            started = time.perf_counter()
+            try:
+                response = self.session.get(url, timeout=self.timeout)
+            except requests.exceptions.RequestException:
+                response = None
+            finally:
+                self._release()
+            registry = get_metrics()
+            if registry:
+                registry.observe("hibp_request", time.perf_counter() - started)
+
+            if response is None:
+                time.sleep(min(0.1 * (2 ** attempt), 2.0))
+                continue
+
+            if response.status_code == 200:
+                if not valid_range(response.text):
+                    # Portal cautivo o proxy: no se reintenta, cuenta como fallo
+                    break
+                self._on_success()
+                return response.text
+
+            if response.status_code in (429, 503):
+                self._on_throttled()
+                time.sleep(self._retry_after(response, attempt))
+                continue
+
+            # Otros códigos de error no se reintentan
+            break
+
+        self._on_failure()
+        return None
+
+    def fetch_ranges(self, prefixes):
+        """
+        Obtiene varios rangos en paralelo
+
+        Returns:
+            dict: prefijo -> texto de la respuesta (o None si falló)
+        """
+        prefixes = list(dict.fromkeys(prefixes))
+        if not prefixes:
+            return {}
+        workers = min(self.max_in_flight, len(prefixes))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return dict(zip(prefixes, executor.map(self.fetch_range, prefixes)))
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,108 @@
+import re
+
+# Variantes de contraseñas comunes (leet, mayúsculas, invertidas, prefijos y
+# sufijos) sin enumerar sustituciones: cada texto se lleva a una forma
+# canónica en la que todos los caracteres intercambiables quedan iguales
+# ("P@ssw0rd" y "password" -> "passwori"). La wordlist se indexa una vez por
+# forma canónica, así que cada contraseña cuesta unas pocas búsquedas.
+
+# Clases de caracteres intercambiables; el primero es el representante
+CANONICAL_CLASSES = ("a@4", "b8", "c(<", "e3€", "g96", "il1!|", "o0", "s$5", "t7+", "z2")
+CANONICAL = str.maketrans({char: chars[0] for chars in CANONICAL_CLASSES for char in chars[1:]})
+CLASS_OF = {char: chars for chars in CANONICAL_CLASSES for char in chars}
+# Caracteres que solo aparecen como sustitución (dígitos y símbolos)
+SUBSTITUTION_CHARS = frozenset(char for chars in CANONICAL_CLASSES for char in chars if not char.isalpha())
+
+# Núcleos más cortos dan demasiadas coincidencias casuales
+MIN_MANGLED_LENGTH = 4
+
+AFFIX_RE = re.compile(r"^([\W\d_]*)(.*?)([\W\d_]*)$", re.DOTALL)
+
+
+def canonical_form(text):
+    """Forma canónica: minúsculas y cada sustitución reemplazada por su representante"""
+    return text.lower().translate(CANONICAL)
+
+
+def mangled_candidates(password):
+    """
+    Textos a buscar en el índice canónico, de la variante más probable a la menos
+
+    Se prueba la contraseña completa, sin el sufijo, sin el prefijo y sin
+    ambos (prefijo y sufijo son tramos de dígitos y símbolos), cada uno
+    también invertido: como mucho ocho búsquedas.
+
+    Yields:
+        tuple: (texto, prefijo, sufijo, invertido)
+    """
+    prefix, _, suffix = AFFIX_RE.match(password).groups()
+    splits = [("", password, "")]
+    if suffix:
+        splits.append(("", password[:-len(suffix)], suffix))
+    if prefix:
+        splits.append((prefix, password[len(prefix):], ""))
+        if suffix:
+            splits.append((prefix, password[len(prefix):-len(suffix)], suffix))
+
+    for prefix, core, suffix in splits:
+        if len(core) < MIN_MANGLED_LENGTH:
+            continue
+        yield core, prefix, suffix, False
+        reversed_core = core[::-1]
+        if reversed_core != core:
+            yield reversed_core, prefix, suffix, True
+
+
+def leet_substitutions(lowered, word):
+    """
+    Sustituciones que llevan de la palabra al texto (ya en minúsculas)
+
+    Returns:
+        dict: carácter del texto -> letra de la palabra que reemplaza (vacío
+        si son iguales), o None si el texto no es una variante leet de la
+        palabra
+    """
+    if len(lowered) != len(word):
+        return None
+    substitutions = {}
+    for char, original in zip(lowered, word):
+        if char == original:
+            continue
+        if char.isalpha() or char not in CLASS_OF.get(original, ""):
+            return None
+        substitutions[char] = original
+    return substitutions
+
+
+def describe_mangling(text, word, prefix="", suffix="", reversed_text=False):
+    """
+    Transformaciones que llevan de la palabra de la lista al texto
+
+    Returns:
+        list: Descripciones ("leet (0→o)", "invertida", "sufijo '1'", ...),
+        o None si el texto no es una variante de la palabra (solo comparten
+        la forma canónica, p. ej. "iime" y "lime")
+    """
+    lowered = text.lower()
+    substitutions = leet_substitutions(lowered, word)
+    if substitutions is None:
+        return None
+
+    transformations = []
+    if substitutions:
+        transformations.append("leet (" + ", ".join(f"{char}→{original}"
+                                                   for char, original in sorted(substitutions.items())) + ")")
+    if text != lowered:
+        if text[0].isupper() and text[1:] == lowered[1:]:
+            transformations.append("mayúscula inicial")
+        elif text == text.upper():
+            transformations.append("mayúsculas")
+        else:
+            transformations.append("mayúsculas mezcladas")
+    if reversed_text:
+        transformations.append("invertida")
+    if prefix:
+        transformations.append(f"prefijo '{prefix}'")
+    if suffix:
+        transformations.append(f"sufijo '{suffix}'")
+    return transformations
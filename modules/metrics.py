@@ -0,0 +1,184 @@
+import bisect
+import threading
+import time
+
+# Límites (en segundos) de los buckets de los histogramas, como en Prometheus
+BUCKETS = (1e-6, 5e-6, 1e-5, 5e-5, 1e-4, 5e-4, 1e-3, 5e-3, 1e-2, 5e-2, 0.1, 0.5, 1.0, 5.0)
+PREFIX = "password_auditor"
+
+# Registro activo; None = instrumentación desactivada (sin costo en el camino caliente)
+_metrics = None
+
+
+class Histogram:
+    """Histograma de duraciones con buckets fijos"""
+
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def merge(self, counts, total, count):
+        self.counts = [a + b for a, b in zip(self.counts, counts)]
+        self.total += total
+        self.count += count
+
+    def quantile(self, q):
+        """Aproximación de un cuantil: límite superior del bucket que lo contiene"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for bound, bucket in zip(BUCKETS + (float("inf"),), self.counts):
+            seen += bucket
+            if seen >= target:
+                return bound
+        return float("inf")
+
+
+class Metrics:
+    """
+    Tiempos por etapa y contadores de una ejecución
+
+    Cada etapa tiene un histograma de tiempo de pared y otro de CPU del hilo.
+    Los workers del pool acumulan sus propias métricas y las envían al proceso
+    principal con snapshot(), que se combinan con merge().
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def clock(self):
+        """Marca de tiempo (pared, CPU del hilo) para pasar a lap()"""
+        return time.perf_counter(), time.thread_time()
+
+    def lap(self, stage, since):
+        """Registra el tiempo transcurrido desde `since` y retorna una nueva marca"""
+        now = self.clock()
+        self.observe(stage, now[0] - since[0], now[1] - since[1])
+        return now
+
+    def observe(self, stage, wall, cpu=None):
+        with self._lock:
+            histograms = self.stages.get(stage)
+            if histograms is None:
+                histograms = self.stages[stage] = (Histogram(), Histogram())
+            histograms[0].observe(wall)
+            if cpu is not None:
+                histograms[1].observe(cpu)
+
+    def increment(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def snapshot(self):
+        """Retorna las métricas acumuladas como datos serializables y las reinicia"""
+        with self._lock:
+            data = {
+                "stages": {stage: [(h.counts, h.total, h.count) for h in histograms]
+                           for stage, histograms in self.stages.items()},
+                "counters": self.counters,
+            }
+            self.stages = {}
+            self.counters = {}
+        return data
+
+    def merge(self, data):
+        """Suma un snapshot() de otro proceso"""
+        with self._lock:
+            for stage, parts in data["stages"].items():
+                histograms = self.stages.get(stage)
+                if histograms is None:
+                    histograms = self.stages[stage] = (Histogram(), Histogram())
+                for histogram, part in zip(histograms, parts):
+                    histogram.merge(*part)
+            for name, value in data["counters"].items():
+                self.counters[name] = self.counters.get(name, 0) + value
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def records_per_second(self):
+        records = self.counters.get("records", 0)
+        return records / self.elapsed if self.elapsed else 0.0
+
+    def summary(self):
+        """Resumen legible de las etapas y contadores"""
+        lines = [f"{'Etapa':22s} {'Llamadas':>10} {'Pared (s)':>10} {'CPU (s)':>10} "
+                 f"{'Media (µs)':>11} {'p50 (µs)':>10} {'p95 (µs)':>10}"]
+        for stage, (wall, cpu) in sorted(self.stages.items(), key=lambda item: -item[1][0].total):
+            mean = wall.total / wall.count * 1e6 if wall.count else 0.0
+            lines.append(f"{stage:22s} {wall.count:10,} {wall.total:10.3f} {cpu.total:10.3f} "
+                         f"{mean:11.1f} {wall.quantile(0.5) * 1e6:10.0f} {wall.quantile(0.95) * 1e6:10.0f}")
+
+        lines.append("")
+        for name, value in sorted(self.counters.items()):
+            lines.append(f"{name:30s} {value:>12,}")
+        for prefix in ("result_cache", "range_cache"):
+            hits = self.counters.get(f"{prefix}_hits", 0)
+            misses = self.counters.get(f"{prefix}_misses", 0)
+            if hits + misses:
+                lines.append(f"{prefix + '_hit_rate':30s} {hits / (hits + misses):>12.1%}")
+        lines.append(f"{'records_per_second':30s} {self.records_per_second():>12,.1f}")
+        lines.append(f"{'elapsed_seconds':30s} {self.elapsed:>12,.2f}")
+        return "\n".join(lines)
+
+    def prometheus(self):
+        """Métricas en el formato de texto de Prometheus"""
+        lines = [f"# HELP {PREFIX}_stage_seconds Duración de cada etapa (clock=wall|cpu)",
+                 f"# TYPE {PREFIX}_stage_seconds histogram"]
+        for stage, histograms in sorted(self.stages.items()):
+            for clock, histogram in zip(("wall", "cpu"), histograms):
+                if not histogram.count:
+                    continue
+                labels = f'stage="{stage}",clock="{clock}"'
+                cumulative = 0
+                for bound, bucket in zip(BUCKETS + (float("inf"),), histogram.counts):
+                    cumulative += bucket
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'{PREFIX}_stage_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+                lines.append(f"{PREFIX}_stage_seconds_sum{{{labels}}} {histogram.total!r}")
+                lines.append(f"{PREFIX}_stage_seconds_count{{{labels}}} {histogram.count}")
+
+        lines.append(f"# HELP {PREFIX}_events_total Contadores de eventos (caché, HIBP, registros)")
+        lines.append(f"# TYPE {PREFIX}_events_total counter")
+        for name, value in sorted(self.counters.items()):
+            lines.append(f'{PREFIX}_events_total{{event="{name}"}} {value}')
+
+        lines.append(f"# HELP {PREFIX}_records_per_second Registros procesados por segundo")
+        lines.append(f"# TYPE {PREFIX}_records_per_second gauge")
+        lines.append(f"{PREFIX}_records_per_second {self.records_per_second()!r}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.prometheus())
+
+
+def enable():
+    """Activa la instrumentación en este proceso y retorna el registro"""
+    global _metrics
+    if _metrics is None:
+        _metrics = Metrics()
+    return _metrics
+
+
+def disable():
+    global _metrics
+    _metrics = None
+
+
+def get_metrics():
+    """Registro activo, o None si la instrumentación está desactivada"""
+    return _metrics
@@ -0,0 +1,251 @@
+import mmap
+import os
+import shutil
+import struct
+import sys
+import tempfile
+import zlib
+from array import array
+from bisect import bisect_left
+
+# Índice de borrados al estilo de SymSpell para encontrar contraseñas a
+# distancia de edición 1-2 de una palabra de la wordlist ("pasword1",
+# "qwerty12e"). Cada palabra se guarda bajo todos los textos que resultan de
+# borrarle hasta dos caracteres; una contraseña se busca por sus propios
+# borrados, así que dos textos a distancia <= 2 siempre comparten alguna
+# clave. Cada consulta cuesta unas decenas de búsquedas sin importar el
+# tamaño de la lista, y los candidatos se verifican con la distancia real.
+#
+# SymSpell suele borrar solo sobre un prefijo de 7 caracteres; en listas de
+# contraseñas eso no sirve (todas las "password..." comparten prefijo y cada
+# consulta traería miles de candidatos), así que se borra sobre la palabra
+# completa y se acota su longitud.
+#
+# Formato (secciones en el orden de bytes de la máquina que lo compiló):
+#   cabecera (40 bytes) | tabla de cubetas (2^bits + 1 uint64) | registros | blob
+# Cada registro es un uint64: CRC-32 del borrado en la parte alta y offset de
+# la palabra en el blob en la parte baja. Los registros están ordenados y la
+# tabla de cubetas indica dónde empieza cada valor de los bits altos de la
+# clave, como en el almacén HIBP offline.
+MAGIC = b"PWDEL001"
+HEADER = struct.Struct("<8sIIIIQQ")
+
+MAX_DISTANCE = 2
+MIN_WORD_LENGTH = 4
+# Las palabras más largas no se indexan (tendrían cientos de borrados)
+MAX_WORD_LENGTH = 16
+# Con palabras cortas, dos ediciones cambian demasiado la palabra
+MIN_LENGTH_FOR_DISTANCE_2 = 6
+MIN_BUCKET_BITS = 8
+MAX_BUCKET_BITS = 24
+# La compilación reparte los registros en 256 particiones por el byte alto de
+# la clave y ordena una por vez, así que los registros no se juntan en memoria
+PARTITION_BITS = 8
+FLUSH_RECORDS = 1 << 16
+
+
+def allowed_distance(text):
+    """Distancia máxima a la que un texto de esa longitud cuenta como casi igual"""
+    return MAX_DISTANCE if len(text) >= MIN_LENGTH_FOR_DISTANCE_2 else 1
+
+
+def deletion_layers(text, max_distance):
+    """Textos que resultan de borrar 0, 1, ... `max_distance` caracteres, por cantidad de borrados"""
+    layers = [{text}]
+    for _ in range(max_distance):
+        layers.append({variant[:i] + variant[i + 1:] for variant in layers[-1] for i in range(len(variant))})
+    return layers
+
+
+def deletion_keys(variants):
+    """Claves de 32 bits de un conjunto de borrados"""
+    return {zlib.crc32(variant.encode('utf-8', 'surrogatepass')) for variant in variants}
+
+
+def within_distance(a, b, limit):
+    """
+    True si la distancia de Damerau-Levenshtein (alineamiento óptimo) es <= limit
+
+    Se salta el prefijo común y se prueba cada edición en la primera
+    diferencia; con limit <= 2 son a lo sumo 16 comparaciones de cadenas.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return False
+    if a == b:
+        return True
+    if not limit:
+        return False
+    i = 0
+    shortest = min(len(a), len(b))
+    while i < shortest and a[i] == b[i]:
+        i += 1
+    a, b = a[i:], b[i:]
+    if a and b:
+        if within_distance(a[1:], b[1:], limit - 1):
+            return True
+        if len(a) > 1 and len(b) > 1 and a[0] == b[1] and a[1] == b[0] and within_distance(a[2:], b[2:], limit - 1):
+            return True
+    return ((a and within_distance(a[1:], b, limit - 1))
+            or (b and within_distance(a, b[1:], limit - 1))) or False
+
+
+def deletion_index_path_for(index_path):
+    """Retorna la ruta del índice de borrados de un índice de wordlist"""
+    base, _ = os.path.splitext(index_path)
+    return base + ".didx"
+
+
+def build_deletion_index(words, output_path):
+    """
+    Compila el índice de borrados de una lista de palabras (ya normalizadas)
+
+    Los registros (unos 40 de 8 bytes por palabra de 8 caracteres) se
+    escriben en particiones temporales y se ordenan de a una, y las palabras
+    van directo a un archivo temporal. Las palabras repetidas se indexan una
+    sola vez: cada copia sería otro candidato en todas sus consultas.
+
+    Returns:
+        int: Número de registros escritos
+    """
+    shift = 32 - PARTITION_BITS
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(output_path))) as workdir:
+        partitions = [open(os.path.join(workdir, f"{i}.part"), 'w+b') for i in range(1 << PARTITION_BITS)]
+        pending = [array('Q') for _ in partitions]
+        blob_path = os.path.join(workdir, "blob")
+        count = 0
+        offset = 0
+        try:
+            with open(blob_path, 'wb') as blob:
+                for word in dict.fromkeys(words):
+                    if not MIN_WORD_LENGTH <= len(word) <= MAX_WORD_LENGTH:
+                        continue
+                    for key in deletion_keys(set().union(*deletion_layers(word, allowed_distance(word)))):
+                        buffer = pending[key >> shift]
+                        buffer.append(key << 32 | offset)
+                        if len(buffer) >= FLUSH_RECORDS:
+                            buffer.tofile(partitions[key >> shift])
+                            del buffer[:]
+                        count += 1
+                    data = word.encode('utf-8', 'surrogatepass') + b"\n"
+                    blob.write(data)
+                    offset += len(data)
+                    if offset > 0xFFFFFFFF:
+                        raise ValueError("La wordlist es demasiado grande para un índice de borrados")
+            for buffer, partition in zip(pending, partitions):
+                buffer.tofile(partition)
+
+            bits = min(max(count.bit_length() - 4, MIN_BUCKET_BITS), MAX_BUCKET_BITS)
+            buckets = array('Q', bytes(8 * ((1 << bits) + 1)))
+            tmp_path = output_path + ".tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(HEADER.pack(MAGIC, MAX_DISTANCE, MAX_WORD_LENGTH, bits, sys.byteorder == "little",
+                                    count, HEADER.size + 8 * (len(buckets) + count)))
+                f.write(buckets.tobytes())
+                for partition in partitions:
+                    partition.seek(0)
+                    records = array('Q', sorted(array('Q', partition.read())))
+                    for record in records:
+                        buckets[(record >> (64 - bits)) + 1] += 1
+                    records.tofile(f)
+                with open(blob_path, 'rb') as blob:
+                    shutil.copyfileobj(blob, f)
+                for i in range(1, len(buckets)):
+                    buckets[i] += buckets[i - 1]
+                f.seek(HEADER.size)
+                f.write(buckets.tobytes())
+            os.replace(tmp_path, output_path)
+        finally:
+            for partition in partitions:
+                partition.close()
+    return count
+
+
+class DeletionIndex:
+    """Índice de borrados mapeado en memoria"""
+
+    def __init__(self, path, tag=""):
+        self.path = path
+        self.tag = tag
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, max_distance, max_length, bits, little, count, blob_offset = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self._mm.close()
+            raise ValueError(f"'{path}' no es un índice de borrados válido")
+        if bool(little) != (sys.byteorder == "little"):
+            self._mm.close()
+            raise ValueError(f"'{path}' fue compilado en otra arquitectura; hay que volver a compilarlo")
+
+        self.max_distance = max_distance
+        self.max_length = max_length
+        self.count = count
+        self._shift = 32 - bits
+        self._blob_offset = blob_offset
+        table_end = HEADER.size + 8 * ((1 << bits) + 1)
+        self._buckets = memoryview(self._mm)[HEADER.size:table_end].cast('Q')
+        self._records = memoryview(self._mm)[table_end:table_end + 8 * count].cast('Q')
+
+    def __len__(self):
+        return self.count
+
+    def _word_at(self, offset):
+        start = self._blob_offset + offset
+        return self._mm[start:self._mm.find(b"\n", start)].decode('utf-8', 'surrogatepass')
+
+    def _collect(self, variants, depth, found):
+        """Agrega a `found` (offset -> borrados de la consulta) las palabras que comparten un borrado"""
+        records, buckets, shift = self._records, self._buckets, self._shift
+        for key in deletion_keys(variants):
+            start, end = buckets[key >> shift], buckets[(key >> shift) + 1]
+            if start == end:
+                continue
+            i = bisect_left(records, key << 32, start, end)
+            while i < end and records[i] >> 32 == key:
+                found.setdefault(records[i] & 0xFFFFFFFF, depth)
+                i += 1
+
+    def nearest(self, password):
+        """
+        Palabra más cercana a la contraseña (en minúsculas) dentro de la distancia permitida
+
+        Primero se buscan los borrados de 0 y 1 caracteres de la consulta
+        (ahí aparecen todas las palabras a distancia 1) y solo si no hay
+        ninguna se agregan los de 2. Las claves son CRC-32, así que un
+        registro puede ser una colisión: cada candidato se confirma comparando
+        las cadenas. Si la consulta perdió `a` caracteres, la palabra tuvo que
+        perder b = a + (diferencia de longitudes); con b fuera de lo que se
+        indexó el registro es una colisión y se descarta sin comparar. Entre
+        palabras a la misma distancia gana la que está antes en la lista.
+
+        Returns:
+            tuple: (palabra, distancia), o None. Una coincidencia exacta
+            (distancia 0) no cuenta: eso ya es una contraseña común.
+        """
+        text = password.lower()
+        if not MIN_WORD_LENGTH - 1 <= len(text) <= self.max_length + self.max_distance:
+            return None
+        layers = deletion_layers(text, min(allowed_distance(text), self.max_distance))
+        found = {}
+        for depth in (0, 1):
+            self._collect(layers[depth], depth, found)
+
+        for distance in (1, 2):
+            if distance == 2:
+                if len(layers) < 3:
+                    return None
+                self._collect(layers[2], 2, found)
+            for offset in sorted(found):
+                a = found[offset]
+                word = self._word_at(offset)
+                b = a + len(word) - len(text)
+                if not 0 <= b <= allowed_distance(word) or distance > allowed_distance(word) or word == text:
+                    continue
+                if within_distance(text, word, distance):
+                    return word, distance
+        return None
+
+    def close(self):
+        self._buckets.release()
+        self._records.release()
+        self._mm.close()
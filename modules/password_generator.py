@@ -1,63 +1,243 @@
-import secrets
+import math
+import os
 import string
+import threading
+from functools import lru_cache
+from itertools import combinations
+
+SYMBOLS = "!@#$%^&*()_+-=[]{}|;:,.<>?"
+MIN_LENGTH = 8
+BUFFER_SIZE = 1 << 16  # Bytes de os.urandom por recarga del buffer
+GENERATE_BATCH = 4096  # Contraseñas por pedido de símbolos en la generación masiva
+
+# Lista diceware de la EFF (7.776 palabras, CC BY 3.0)
+PASSPHRASE_WORDLIST = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                   "data", "eff_large_wordlist.txt")
+
+# Listas de palabras ya cargadas, por ruta
+_wordlists = {}
+
+
+class RandomSource:
+    """
+    Enteros y caracteres uniformes a partir de un buffer grande de os.urandom
+
+    Se pide entropía al sistema de a `buffer_size` bytes y se reparte en
+    muestras con muestreo por rechazo: un byte (o grupo de bytes) se descarta
+    si cae en el resto que no alcanza para un ciclo completo del rango, así
+    que ningún valor queda favorecido como con `byte % n`.
+    """
+
+    def __init__(self, buffer_size=BUFFER_SIZE):
+        self.buffer_size = buffer_size
+        self._buffer = b""
+        self._position = 0
+        self._lock = threading.Lock()
+
+    def _take(self, size):
+        with self._lock:
+            if self._position + size > len(self._buffer):
+                self._buffer = self._buffer[self._position:] + os.urandom(max(self.buffer_size, size))
+                self._position = 0
+            data = self._buffer[self._position:self._position + size]
+            self._position += size
+            return data
+
+    def below(self, n):
+        """Entero uniforme en [0, n)"""
+        size = max(1, ((n - 1).bit_length() + 7) // 8)
+        space = 1 << (8 * size)
+        limit = space - space % n
+        while True:
+            value = int.from_bytes(self._take(size), 'big')
+            if value < limit:
+                return value % n
+
+    def symbols(self, alphabet, count):
+        """
+        Texto de `count` caracteres uniformes e independientes de `alphabet`
+
+        Con alfabetos de hasta 256 caracteres ASCII cada byte se convierte en
+        un carácter con bytes.translate (los bytes rechazados se eliminan en
+        la misma operación), sin un bucle de Python por carácter.
+        """
+        if len(alphabet) > 256 or not alphabet.isascii():
+            return "".join(alphabet[self.below(len(alphabet))] for _ in range(count))
+        table, rejected = _translation(alphabet)
+        out = bytearray()
+        while len(out) < count:
+            # Se pide un poco más de lo necesario para compensar los rechazos
+            missing = count - len(out)
+            out += self._take(missing + missing // 4 + 16).translate(table, rejected)
+        return out[:count].decode('ascii')
+
+
+@lru_cache(maxsize=32)
+def _translation(alphabet):
+    n = len(alphabet)
+    limit = 256 - 256 % n
+    table = bytes(ord(alphabet[b % n]) if b < limit else 0 for b in range(256))
+    return table, bytes(range(limit, 256))
+
+
+class PasswordPolicy:
+    """
+    Contraseñas de `length` caracteres con al menos uno de cada clase elegida
+
+    Las contraseñas se eligen con probabilidad uniforme entre todas las que
+    cumplen la política: se genera un texto uniforme sobre el alfabeto
+    completo y se descarta si le falta alguna clase. Forzar un carácter de
+    cada clase y mezclar después no es uniforme (favorece a las contraseñas
+    con más caracteres de las clases chicas).
+    """
+
+    def __init__(self, length=16, use_upper=True, use_lower=True, use_digits=True, use_symbols=True):
+        self.length = max(length, MIN_LENGTH)
+        self.classes = [chars for chars, enabled in ((string.ascii_lowercase, use_lower),
+                                                     (string.ascii_uppercase, use_upper),
+                                                     (string.digits, use_digits),
+                                                     (SYMBOLS, use_symbols)) if enabled]
+        # Sin ninguna clase se usan letras y dígitos, sin exigir ninguna
+        self.alphabet = "".join(self.classes) or string.ascii_letters + string.digits
+        self._class_sets = [frozenset(chars) for chars in self.classes]
+
+    def accepts(self, password):
+        return all(not chars.isdisjoint(password) for chars in self._class_sets)
+
+    def _count_without(self, excluded, length):
+        """Textos de `length` caracteres con todas las clases salvo `excluded` (exclusión-inclusión)"""
+        others = [chars for i, chars in enumerate(self.classes) if i not in excluded]
+        total = 0
+        for k in range(len(others) + 1):
+            for subset in combinations(others, k):
+                total += (-1) ** k * (len(self.alphabet) - sum(map(len, subset))) ** length
+        return total
+
+    def count(self):
+        """Número exacto de contraseñas que cumplen la política"""
+        return self._count_without((), self.length)
+
+    def entropy(self):
+        """Entropía exacta en bits (log2 del número de contraseñas posibles)"""
+        return math.log2(self.count())
+
+    def symbol_probabilities(self):
+        """Probabilidad exacta de cada carácter en una posición cualquiera"""
+        total = self.count()
+        probabilities = {}
+        for i, chars in enumerate(self.classes):
+            # Con la posición fija en esta clase, el resto debe cubrir las demás
+            p = self._count_without((i,), self.length - 1) / total
+            probabilities.update(dict.fromkeys(chars, p))
+        if not self.classes:
+            probabilities = dict.fromkeys(self.alphabet, 1 / len(self.alphabet))
+        return probabilities
+
+    def generate(self, source, count):
+        """Genera `count` contraseñas (un solo pedido de símbolos por tanda)"""
+        produced = 0
+        while produced < count:
+            batch = min(count - produced, GENERATE_BATCH)
+            text = source.symbols(self.alphabet, batch * self.length)
+            for start in range(0, len(text), self.length):
+                password = text[start:start + self.length]
+                if self.accepts(password) and produced < count:
+                    produced += 1
+                    yield password
+
+
+def load_wordlist(path=PASSPHRASE_WORDLIST):
+    """
+    Carga una lista de palabras para passphrases (una sola vez por ruta)
+
+    Acepta el formato diceware ("11111<TAB>palabra") o una palabra por
+    línea. Solo se usan palabras de letras (sin repetir, en minúsculas), para
+    que ni el separador ni las mayúsculas hagan que dos passphrases distintas
+    se escriban igual y la entropía calculada sea exacta.
+    """
+    words = _wordlists.get(path)
+    if words is None:
+        with open(path, 'r', encoding='utf-8') as f:
+            candidates = (line.split()[-1].lower() for line in f if line.strip())
+            words = tuple(dict.fromkeys(word for word in candidates if word.isalpha()))
+        _wordlists[path] = words
+    return words
+
+
+class PassphrasePolicy:
+    """Passphrases de `words` palabras al azar, con mayúsculas y número opcionales"""
+
+    def __init__(self, words=4, separator="-", capitalize=True, number=True, wordlist=PASSPHRASE_WORDLIST):
+        self.words = words
+        self.separator = separator
+        self.capitalize = capitalize
+        self.number = number
+        self.wordlist = load_wordlist(wordlist)
+
+    def entropy(self):
+        """Entropía exacta en bits"""
+        bits = self.words * math.log2(len(self.wordlist))
+        if self.capitalize:
+            bits += self.words
+        if self.number:
+            bits += math.log2(1000)
+        return bits
+
+    def generate(self, source, count):
+        for _ in range(count):
+            selected = [self.wordlist[source.below(len(self.wordlist))] for _ in range(self.words)]
+            if self.capitalize:
+                selected = [word.capitalize() if source.below(2) else word for word in selected]
+            passphrase = self.separator.join(selected)
+            if self.number:
+                passphrase += str(source.below(1000))
+            yield passphrase
+
+
+# Fuente compartida por las funciones de una sola contraseña
+_source = RandomSource()
+
+
+def chi_square_uniformity(policy, samples, source=None):
+    """
+    Prueba chi-cuadrado de las frecuencias de caracteres de `samples` contraseñas
+
+    Compara lo observado con la probabilidad exacta de cada carácter bajo la
+    política (symbol_probabilities).
+
+    Returns:
+        tuple: (estadístico, grados de libertad, valor crítico al 0,1%)
+    """
+    source = source or _source
+    counts = dict.fromkeys(policy.alphabet, 0)
+    for password in policy.generate(source, samples):
+        for char in password:
+            counts[char] += 1
+    positions = samples * policy.length
+    statistic = 0.0
+    for char, p in policy.symbol_probabilities().items():
+        expected = positions * p
+        statistic += (counts[char] - expected) ** 2 / expected
+    df = len(counts) - 1
+    # Aproximación de Wilson-Hilferty del cuantil 0,999 de chi-cuadrado
+    critical = df * (1 - 2 / (9 * df) + 3.0902 * math.sqrt(2 / (9 * df))) ** 3
+    return statistic, df, critical
+
+
+def write_generated(path, policy, count, source=None):
+    """Genera `count` contraseñas y las escribe en un archivo a medida que salen"""
+    source = source or RandomSource()
+    with open(path, 'w', encoding='utf-8') as f:
+        for password in policy.generate(source, count):
+            f.write(password + "\n")
+
 
 def generate_password(length=16, use_upper=True, use_lower=True, use_digits=True, use_symbols=True):
-    """Genera una contraseña segura usando secrets (criptográficamente seguro)"""
-    
-    if length < 8:
-        length = 8
-    
-    # Construir el conjunto de caracteres
-    charset = ""
-    if use_lower:
-        charset += string.ascii_lowercase
-    if use_upper:
-        charset += string.ascii_uppercase
-    if use_digits:
-        charset += string.digits
-    if use_symbols:
-        charset += "!@#$%^&*()_+-=[]{}|;:,.<>?"
-    
-    if not charset:
-        charset = string.ascii_letters + string.digits
-    
-    # Generar contraseña
-    password = ''.join(secrets.choice(charset) for _ in range(length))
-    
-    # Asegurar que tenga al menos un carácter de cada tipo seleccionado
-    if use_lower and not any(c.islower() for c in password):
-        password = secrets.choice(string.ascii_lowercase) + password[1:]
-    if use_upper and not any(c.isupper() for c in password):
-        password = secrets.choice(string.ascii_uppercase) + password[1:]
-    if use_digits and not any(c.isdigit() for c in password):
-        password = secrets.choice(string.digits) + password[1:]
-    if use_symbols and not any(c in "!@#$%^&*()_+-=[]{}|;:,.<>?" for c in password):
-        password = secrets.choice("!@#$%^&*()_+-=[]{}|;:,.<>?") + password[1:]
-    
-    # Mezclar para evitar patrones predecibles
-    password_list = list(password)
-    for i in range(len(password_list)):
-        j = secrets.randbelow(len(password_list))
-        password_list[i], password_list[j] = password_list[j], password_list[i]
-    
-    return ''.join(password_list)
+    """Genera una contraseña segura (uniforme entre las que cumplen la política)"""
+    policy = PasswordPolicy(length, use_upper, use_lower, use_digits, use_symbols)
+    return next(policy.generate(_source, 1))
+
 
 def generate_passphrase(num_words=4, separator="-"):
-    """Genera una passphrase usando palabras aleatorias"""
-    # Lista de palabras comunes en español
-    words = [
-        "arbol", "casa", "perro", "gato", "sol", "luna", "mar", "rio",
-        "monte", "valle", "flor", "rosa", "cielo", "nube", "viento", "fuego",
-        "agua", "tierra", "piedra", "roca", "playa", "bosque", "selva", "campo",
-        "ciudad", "pueblo", "calle", "camino", "puente", "torre", "castillo", "palacio"
-    ]
-    
-    selected_words = [secrets.choice(words) for _ in range(num_words)]
-    
-    # Capitalizar aleatoriamente algunas palabras
-    selected_words = [word.capitalize() if secrets.randbelow(2) else word for word in selected_words]
-    
-    # Agregar un número aleatorio
-    passphrase = separator.join(selected_words) + str(secrets.randbelow(1000))
-    
-    return passphrase
+    """Genera una passphrase con palabras de la lista diceware"""
+    return next(PassphrasePolicy(num_words, separator).generate(_source, 1))
@@ -0,0 +1,497 @@
+import argparse
+import math
+import mmap
+import os
+import random
+import re
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from collections import Counter
+
+from modules.pattern_detector import DATA_DIR
+from modules.wordlist_index import hash_key
+
+# Modelo probabilístico entrenado con contraseñas filtradas: una cadena de
+# Markov de caracteres (orden 2) y una gramática PCFG de estructuras (como
+# Weir et al.: "Password2024!" = L8 D4 S1, con terminales y mayúsculas
+# aprendidas del corpus). El rango de cada contraseña (cuántas contraseñas
+# más probables prueba antes un atacante con ese modelo) se estima con el
+# método de Monte Carlo de Dell'Amico y Filippone a partir de muestras del
+# propio modelo.
+#
+# Formato del archivo (little-endian, secciones alineadas a 8 bytes):
+#   cabecera (48 bytes)
+#   tabla de Markov: ALPHABET^3 bytes, -log2 P(c | a, b) cuantizado
+#   tabla hash PCFG: `slots` claves de 64 bits + `slots` valores uint16
+#   muestras de Markov: bits ordenados (double) + log2 del rango acumulado (double)
+#   muestras de la PCFG: ídem
+MAGIC = b"PWMODEL1"
+HEADER = struct.Struct("<8sIIQQQQ")
+SCALE = 8                   # Pasos de cuantización por bit
+MAX_CHAR_COST = 255         # Máximo de la tabla de Markov (uint8)
+MAX_ENTRY_COST = 0xFFFF     # Máximo de la tabla PCFG (uint16)
+
+DEFAULT_MODEL = os.path.join(DATA_DIR, "password-model.bin")
+DEFAULT_CORPUS = os.path.join(DATA_DIR, "common-passwords.txt")
+DEFAULT_SAMPLES = 10_000
+MAX_SAMPLE_LENGTH = 64
+
+# Alfabeto de Markov: 0 = inicio/fin, 1-95 = ASCII imprimible, 96 = cualquier otro
+ALPHABET = 97
+BOUNDARY = 0
+OTHER = ALPHABET - 1
+SYMBOLS = bytes(b - 31 if 32 <= b <= 126 else OTHER for b in range(256))
+
+SEGMENT_RE = re.compile(r"(?P<L>[a-zA-Z]+)|(?P<D>[0-9]+)|(?P<S>[^a-zA-Z0-9]+)")
+CLASS_SIZES = {"L": 26, "D": 10, "S": 33}
+CASE_MASK = str.maketrans("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ", "l" * 26 + "U" * 26)
+
+# Modelo en uso (None = todavía no se buscó el modelo por defecto)
+_model = None
+_model_loaded = False
+
+
+def _symbols(password):
+    """Códigos del alfabeto de Markov de una contraseña"""
+    if not password.isascii():
+        password = "".join(char if char.isascii() else "\x7f" for char in password)
+    return password.encode('ascii').translate(SYMBOLS)
+
+
+def _segments(password):
+    """Tramos (clase, texto) de la contraseña: letras, dígitos y el resto"""
+    return [(match.lastgroup, match.group()) for match in SEGMENT_RE.finditer(password)]
+
+
+def _structure(segments):
+    return "".join(f"{cls}{len(text)}" for cls, text in segments)
+
+
+def _quantize(bits, limit):
+    return min(limit, max(0, round(bits * SCALE)))
+
+
+def _align(size):
+    return (size + 7) & ~7
+
+
+def iter_corpus(path, with_counts=False):
+    """
+    Itera tuplas (contraseña, ocurrencias) de un corpus
+
+    Una contraseña por línea, o con `with_counts` el formato "ocurrencias
+    contraseña" (como rockyou-withcount.txt).
+    """
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        for line in f:
+            line = line.rstrip("\r\n")
+            if with_counts:
+                count, _, line = line.lstrip().partition(" ")
+                if not count.isdigit():
+                    continue
+                weight = int(count)
+            else:
+                weight = 1
+            if line:
+                yield line, weight
+
+
+class _Trainer:
+    """Conteos del corpus y construcción de las tablas del modelo"""
+
+    def __init__(self):
+        self.passwords = 0
+        self.trigrams = Counter()
+        self.bigrams = Counter()
+        self.unigrams = Counter()
+        self.structures = Counter()
+        self.terminals = {}     # (clase, longitud) -> Counter de terminales
+        self.masks = {}         # longitud -> Counter de máscaras de mayúsculas
+
+    def add(self, password, weight=1):
+        self.passwords += weight
+        s = b"\0\0" + _symbols(password) + b"\0"
+        for counter, grams in ((self.trigrams, zip(s, s[1:], s[2:])),
+                               (self.bigrams, zip(s[1:], s[2:])),
+                               (self.unigrams, s[2:])):
+            if weight == 1:
+                counter.update(grams)
+            else:
+                for gram in grams:
+                    counter[gram] += weight
+
+        segments = _segments(password)
+        self.structures[_structure(segments)] += weight
+        for cls, text in segments:
+            if cls == "L":
+                self.masks.setdefault(len(text), Counter())[text.translate(CASE_MASK)] += weight
+                text = text.lower()
+            self.terminals.setdefault((cls, len(text)), Counter())[text] += weight
+
+    def markov_table(self):
+        """
+        Tabla de -log2 P(c | a, b) cuantizada, con suavizado de Witten-Bell
+
+        Cada orden se interpola con el anterior según cuántos símbolos
+        distintos siguieron al contexto, así que los contextos poco vistos
+        (o nunca vistos) se apoyan en el modelo de orden 1 y 0.
+        """
+        total = sum(self.unigrams.values())
+        unigram = [(self.unigrams[c] + 1) / (total + ALPHABET) for c in range(ALPHABET)]
+
+        def rows(counts):
+            by_context = {}
+            for (context, c), n in counts.items():
+                by_context.setdefault(context, {})[c] = n
+            return by_context
+
+        bigram = [unigram] * ALPHABET
+        for b, follow in rows(self.bigrams).items():
+            seen, distinct = sum(follow.values()), len(follow)
+            bigram[b] = [(follow.get(c, 0) + distinct * unigram[c]) / (seen + distinct) for c in range(ALPHABET)]
+
+        def quantized(row):
+            return bytes(_quantize(-math.log2(p), MAX_CHAR_COST) for p in row)
+
+        fallback = [quantized(row) for row in bigram]
+        table = [fallback[b] for _ in range(ALPHABET) for b in range(ALPHABET)]
+        trigram_rows = rows({((a, b), c): n for (a, b, c), n in self.trigrams.items()})
+        for (a, b), follow in trigram_rows.items():
+            seen, distinct = sum(follow.values()), len(follow)
+            lower = bigram[b]
+            table[a * ALPHABET + b] = quantized(
+                (follow.get(c, 0) + distinct * lower[c]) / (seen + distinct) for c in range(ALPHABET))
+        return b"".join(table)
+
+    def pcfg_entries(self):
+        """
+        Entradas de la PCFG: clave de texto -> costo cuantizado
+
+        E<estructura>, T<terminal>, C<máscara>; U<clase><n> y V<n> son el
+        costo de un terminal o una máscara de ese largo que no aparece en el
+        corpus (Witten-Bell: la masa reservada se reparte uniformemente).
+        """
+        entries = {}
+        total = sum(self.structures.values())
+        for structure, n in self.structures.items():
+            entries["E" + structure] = _quantize(-math.log2(n / total), MAX_ENTRY_COST)
+
+        def add_group(prefix, counts, unseen_key, space):
+            seen, distinct = sum(counts.values()), len(counts)
+            for text, n in counts.items():
+                entries[prefix + text] = _quantize(-math.log2(n / (seen + distinct)), MAX_ENTRY_COST)
+            unseen = distinct / (seen + distinct)
+            entries[unseen_key] = _quantize(-math.log2(unseen) + math.log2(space), MAX_ENTRY_COST)
+
+        for (cls, length), counts in self.terminals.items():
+            add_group("T", counts, f"U{cls}{length}", CLASS_SIZES[cls] ** length)
+        for length, counts in self.masks.items():
+            add_group("C", counts, f"V{length}", 2 ** length)
+        return entries
+
+    def markov_samples(self, table, count, rng):
+        """Costos (en pasos de cuantización) de `count` contraseñas generadas por la cadena"""
+        cumulative = {}
+        symbols = range(ALPHABET)
+        costs = []
+        for _ in range(count):
+            a = b = BOUNDARY
+            cost = 0
+            for _ in range(MAX_SAMPLE_LENGTH):
+                row = a * ALPHABET + b
+                weights = cumulative.get(row)
+                if weights is None:
+                    weights = cumulative[row] = list(_accumulate(
+                        2 ** (-q / SCALE) for q in table[row * ALPHABET:(row + 1) * ALPHABET]))
+                c = rng.choices(symbols, cum_weights=weights)[0]
+                cost += table[row * ALPHABET + c]
+                if c == BOUNDARY:
+                    break
+                a, b = b, c
+            costs.append(cost)
+        return costs
+
+    def pcfg_samples(self, entries, count, rng):
+        """Costos de `count` contraseñas generadas por la gramática"""
+        def sampler(counts, prefix, unseen_key):
+            items = list(counts.items())
+            seen, distinct = sum(counts.values()), len(counts)
+            costs = [entries[prefix + text] for text, _ in items]
+            weights = list(_accumulate(n for _, n in items))
+            unseen = entries[unseen_key]
+
+            def sample():
+                if rng.random() * (seen + distinct) < distinct:
+                    return unseen
+                return rng.choices(costs, cum_weights=weights)[0]
+            return sample
+
+        terminals = {key: sampler(counts, "T", f"U{key[0]}{key[1]}") for key, counts in self.terminals.items()}
+        masks = {length: sampler(counts, "C", f"V{length}") for length, counts in self.masks.items()}
+        structures = list(self.structures)
+        weights = list(_accumulate(self.structures.values()))
+
+        costs = []
+        for structure in rng.choices(structures, cum_weights=weights, k=count):
+            cost = entries["E" + structure]
+            for cls, length in re.findall(r"([LDS])(\d+)", structure):
+                length = int(length)
+                cost += terminals[(cls, length)]()
+                if cls == "L":
+                    cost += masks[length]()
+            costs.append(cost)
+        return costs
+
+
+def _accumulate(values):
+    total = 0
+    for value in values:
+        total += value
+        yield total
+
+
+def _hash_table(entries):
+    """Tabla hash de direccionamiento abierto (sondeo lineal), carga <= 1/2"""
+    slots = 8
+    while slots < 2 * len(entries):
+        slots *= 2
+    keys = array('Q', bytes(8 * slots))
+    values = array('H', bytes(2 * slots))
+    for text, cost in entries.items():
+        key = hash_key(text) or 1
+        slot = key & (slots - 1)
+        while keys[slot]:
+            slot = (slot + 1) & (slots - 1)
+        keys[slot] = key
+        values[slot] = cost
+    return slots, keys, values
+
+
+def _rank_table(costs):
+    """
+    Bits ordenados de las muestras y log2 del rango acumulado
+
+    Con n muestras de probabilidad p_i, el rango de una contraseña de
+    probabilidad p se estima como la suma de 1 / (n * p_i) sobre las
+    muestras más probables que ella.
+    """
+    bits = array('d', sorted(cost / SCALE for cost in costs))
+    ranks = array('d', [0.0])
+    total = 0.0
+    for value in bits:
+        total += 2 ** value / len(bits)
+        ranks.append(math.log2(max(total, 1.0)))
+    return bits, ranks
+
+
+def train_model(corpus_paths, output_path=DEFAULT_MODEL, samples=DEFAULT_SAMPLES, with_counts=False, seed=None):
+    """
+    Entrena la cadena de Markov y la PCFG y las guarda en un archivo binario
+
+    Args:
+        corpus_paths: Archivos de contraseñas (una por línea)
+        output_path: Ruta del modelo
+        samples: Muestras por modelo para estimar rangos
+        with_counts: Las líneas tienen el formato "ocurrencias contraseña"
+        seed: Semilla del muestreo (para archivos reproducibles)
+
+    Returns:
+        int: Número de contraseñas del corpus (contando repeticiones)
+    """
+    trainer = _Trainer()
+    for path in corpus_paths:
+        for password, weight in iter_corpus(path, with_counts):
+            trainer.add(password, weight)
+    if not trainer.passwords:
+        raise ValueError("El corpus no tiene contraseñas")
+
+    rng = random.Random(seed)
+    markov = trainer.markov_table()
+    entries = trainer.pcfg_entries()
+    slots, keys, values = _hash_table(entries)
+    sections = [markov, keys, values]
+    for costs in (trainer.markov_samples(markov, samples, rng), trainer.pcfg_samples(entries, samples, rng)):
+        sections.extend(_rank_table(costs))
+
+    tmp_path = output_path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, SCALE, ALPHABET, slots, samples, samples, trainer.passwords))
+        for section in sections:
+            if isinstance(section, array) and sys.byteorder != "little":
+                section = array(section.typecode, section)
+                section.byteswap()
+            data = bytes(section)
+            f.write(data + bytes(_align(len(data)) - len(data)))
+    os.replace(tmp_path, output_path)
+    return trainer.passwords
+
+
+class PasswordModel:
+    """
+    Modelo entrenado, mapeado en memoria
+
+    Las tablas se leen directamente del archivo (memoryview sobre el mmap),
+    así que abrir el modelo no depende de su tamaño y los workers de un
+    lote comparten las páginas del sistema operativo.
+    """
+
+    def __init__(self, path=DEFAULT_MODEL):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, scale, alphabet, slots, markov_samples, pcfg_samples, passwords = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or scale != SCALE or alphabet != ALPHABET:
+            self._mm.close()
+            raise ValueError(f"'{path}' no es un modelo de contraseñas válido")
+
+        self.passwords = passwords
+        self._slots = slots
+        self._views = []
+        offset = HEADER.size
+        self._markov, offset = self._section(offset, 'B', ALPHABET ** 3)
+        self._keys, offset = self._section(offset, 'Q', slots)
+        self._values, offset = self._section(offset, 'H', slots)
+        self._markov_bits, offset = self._section(offset, 'd', markov_samples)
+        self._markov_ranks, offset = self._section(offset, 'd', markov_samples + 1)
+        self._pcfg_bits, offset = self._section(offset, 'd', pcfg_samples)
+        self._pcfg_ranks, offset = self._section(offset, 'd', pcfg_samples + 1)
+
+    def _section(self, offset, typecode, count):
+        size = count * struct.calcsize(typecode)
+        view = memoryview(self._mm)[offset:offset + size]
+        if sys.byteorder != "little" and typecode != 'B':
+            # Archivo little-endian en una máquina big-endian: se copia la sección
+            values = array(typecode, view)
+            view.release()
+            values.byteswap()
+            return values, offset + _align(size)
+        view = view.cast(typecode)
+        self._views.append(view)
+        return view, offset + _align(size)
+
+    def _entry(self, text):
+        key = hash_key(text) or 1
+        mask = self._slots - 1
+        slot = key & mask
+        keys = self._keys
+        while keys[slot]:
+            if keys[slot] == key:
+                return self._values[slot]
+            slot = (slot + 1) & mask
+        return None
+
+    def markov_bits(self, password):
+        """-log2 de la probabilidad de la contraseña según la cadena de Markov"""
+        s = b"\0\0" + _symbols(password) + b"\0"
+        table = self._markov
+        return sum([table[(a * ALPHABET + b) * ALPHABET + c] for a, b, c in zip(s, s[1:], s[2:])]) / SCALE
+
+    def pcfg_bits(self, password):
+        """-log2 de la probabilidad según la PCFG (inf si la estructura no aparece en el corpus)"""
+        segments = _segments(password)
+        cost = self._entry("E" + _structure(segments))
+        if cost is None:
+            return math.inf
+        for cls, text in segments:
+            if cls == "L":
+                mask = text.translate(CASE_MASK)
+                mask_cost = self._entry("C" + mask)
+                if mask_cost is None:
+                    mask_cost = self._entry(f"V{len(text)}")
+                cost += len(text) * SCALE if mask_cost is None else mask_cost
+                text = text.lower()
+            term_cost = self._entry("T" + text)
+            if term_cost is None:
+                term_cost = self._entry(f"U{cls}{len(text)}")
+            if term_cost is None:
+                term_cost = _quantize(len(text) * math.log2(CLASS_SIZES[cls]), MAX_ENTRY_COST)
+            cost += term_cost
+        return cost / SCALE
+
+    @staticmethod
+    def _rank(bits, sample_bits, sample_ranks):
+        # Ninguna contraseña puede tener más de 1/p contraseñas más probables
+        k = bisect_left(sample_bits, bits)
+        if k == len(sample_bits):
+            return bits
+        return min(sample_ranks[k], bits)
+
+    def log2_rank(self, password):
+        """
+        log2 del rango estimado: intentos de un atacante que prueba las
+        contraseñas en orden de probabilidad con el mejor de los dos modelos
+        """
+        markov = self._rank(self.markov_bits(password), self._markov_bits, self._markov_ranks)
+        pcfg = self.pcfg_bits(password)
+        if pcfg != math.inf:
+            return min(markov, self._rank(pcfg, self._pcfg_bits, self._pcfg_ranks))
+        return markov
+
+    def log2_ranks(self, passwords):
+        """log2_rank de muchas contraseñas"""
+        return [self.log2_rank(password) for password in passwords]
+
+    def close(self):
+        for view in self._views:
+            view.release()
+        self._views = []
+        self._mm.close()
+
+
+def use_model(path):
+    """
+    Configura el modelo usado por model_rank (None para desactivarlo)
+
+    Sin llamar a esta función se usa data/password-model.bin si existe.
+    """
+    global _model, _model_loaded
+    if _model is not None:
+        _model.close()
+    _model = PasswordModel(path) if path else None
+    _model_loaded = True
+    return _model
+
+
+def get_model():
+    """Retorna el modelo en uso, o None si no hay uno entrenado"""
+    global _model, _model_loaded
+    if not _model_loaded:
+        _model = PasswordModel(DEFAULT_MODEL) if os.path.exists(DEFAULT_MODEL) else None
+        _model_loaded = True
+    return _model
+
+
+def model_rank(password):
+    """log2 del rango de la contraseña según el modelo, o None si no hay modelo"""
+    model = get_model()
+    if model is None or not password:
+        return None
+    return model.log2_rank(password)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Entrena el modelo de Markov/PCFG con un corpus de contraseñas")
+    parser.add_argument("corpus", nargs="*", default=[DEFAULT_CORPUS],
+                        help="Archivos con una contraseña por línea (por defecto data/common-passwords.txt)")
+    parser.add_argument("-o", "--output", default=DEFAULT_MODEL,
+                        help="Ruta del modelo (por defecto data/password-model.bin)")
+    parser.add_argument("--with-counts", action="store_true",
+                        help="Líneas con el formato 'ocurrencias contraseña' (rockyou-withcount)")
+    parser.add_argument("--samples", type=int, default=DEFAULT_SAMPLES,
+                        help=f"Muestras por modelo para estimar rangos (por defecto {DEFAULT_SAMPLES:,})")
+    parser.add_argument("--seed", type=int, help="Semilla del muestreo")
+    args = parser.parse_args(argv)
+
+    try:
+        count = train_model(args.corpus, args.output, args.samples, args.with_counts, args.seed)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    print(f"[OK] Modelo entrenado con {count:,} contraseñas guardado en: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
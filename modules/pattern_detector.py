@@ -1,59 +1,113 @@
+import math
+import os
 import re
 
-def detect_patterns(password):
+from modules.aho_corasick import AhoCorasick
+from modules.features import extract_features
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+# Diccionarios de patrones (uno por línea; se pueden ampliar sin costo por contraseña)
+KEYBOARD_PATTERNS_FILE = os.path.join(DATA_DIR, "keyboard-patterns.txt")
+COMMON_WORDS_FILE = os.path.join(DATA_DIR, "common-words.txt")
+COMMON_NAMES_FILE = os.path.join(DATA_DIR, "common-names.txt")
+
+NUMERIC_SEQUENCES = ['012', '123', '234', '345', '456', '567', '678', '789', '890']
+ALPHA_SEQUENCES = ['abc', 'bcd', 'cde', 'def', 'efg', 'fgh', 'ghi', 'hij', 'ijk', 'jkl', 'klm', 'lmn',
+                   'mno', 'nop', 'opq', 'pqr', 'qrs', 'rst', 'stu', 'tuv', 'uvw', 'vwx', 'wxy', 'xyz']
+
+REPEAT_RE = re.compile(r'(.)\1{2,}')
+YEAR_RE = re.compile(r'(19\d{2}|20\d{2})')
+
+# Matcher compilado (se construye una vez por proceso)
+_matcher = None
+
+def load_pattern_file(path):
+    """Lee un diccionario de patrones ignorando líneas vacías y comentarios"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            words = [line.strip().lower() for line in f]
+    except FileNotFoundError:
+        return []
+    return list(dict.fromkeys(word for word in words if word and not word.startswith('#')))
+
+# Categorías en el orden en que se reportan; las repeticiones y los años
+# (expresiones regulares) se reportan entre los patrones de teclado y las palabras
+NUMERIC, ALPHA, KEYBOARD, WORD, NAME = range(5)
+PATTERN_LABELS = {
+    NUMERIC: lambda word: "Secuencia numérica",
+    ALPHA: lambda word: "Secuencia alfabética",
+    KEYBOARD: lambda word: f"Patrón de teclado ({word})",
+    WORD: lambda word: f"Palabra común ({word})",
+    NAME: lambda word: f"Nombre común ({word})",
+}
+
+class PatternMatcher:
+    """
+    Detector de secuencias, patrones de teclado, palabras y nombres en una pasada
+
+    Todas las palabras de todos los diccionarios se compilan en un único
+    autómata de Aho-Corasick que recorre la contraseña en minúsculas una vez,
+    de modo que el costo por contraseña no depende del tamaño de los diccionarios.
+    """
+
+    def __init__(self, keyboard_patterns, common_words, common_names):
+        # Clave de cada palabra: (categoría, posición en su diccionario, palabra)
+        entries = [((NUMERIC, 0, None), word) for word in NUMERIC_SEQUENCES]
+        entries += [((ALPHA, 0, None), word) for word in ALPHA_SEQUENCES]
+        for category, words in ((KEYBOARD, keyboard_patterns), (WORD, common_words), (NAME, common_names)):
+            entries += [((category, i, word), word) for i, word in enumerate(words)]
+        self.automaton = AhoCorasick(entries)
+
+    @staticmethod
+    def _regex_patterns(password, patterns):
+        # Repeticiones
+        if REPEAT_RE.search(password):
+            patterns.append("Caracteres repetidos")
+        
+        # Años comunes
+        if YEAR_RE.search(password):
+            patterns.append("Año detectado")
+
+    def detect(self, password, lower=None):
+        """Retorna la lista de patrones en el mismo orden que detect_patterns"""
+        patterns = []
+        regex_done = False
+        
+        if lower is None:
+            lower = password.lower()
+        for category, _, word in sorted(self.automaton.search(lower)):
+            if category >= WORD and not regex_done:
+                self._regex_patterns(password, patterns)
+                regex_done = True
+            patterns.append(PATTERN_LABELS[category](word))
+        
+        if not regex_done:
+            self._regex_patterns(password, patterns)
+        return patterns
+
+def get_matcher():
+    """Retorna el matcher compilado a partir de los diccionarios de data/"""
+    global _matcher
+    if _matcher is None:
+        _matcher = PatternMatcher(load_pattern_file(KEYBOARD_PATTERNS_FILE),
+                                  load_pattern_file(COMMON_WORDS_FILE),
+                                  load_pattern_file(COMMON_NAMES_FILE))
+    return _matcher
+
+def detect_patterns(password, features=None):
     """Detecta patrones comunes en contraseñas"""
-    patterns = []
-    
-    # Secuencias numéricas
-    if re.search(r'(012|123|234|345|456|567|678|789|890)', password):
-        patterns.append("Secuencia numérica")
-    
-    # Secuencias alfabéticas
-    if re.search(r'(abc|bcd|cde|def|efg|fgh|ghi|hij|ijk|jkl|klm|lmn|mno|nop|opq|pqr|qrs|rst|stu|tuv|uvw|vwx|wxy|xyz)', password.lower()):
-        patterns.append("Secuencia alfabética")
-    
-    # Patrones de teclado
-    keyboard_patterns = [
-        'qwerty', 'asdfgh', 'zxcvbn', 'qwertz', 'azerty',
-        '1qaz', '2wsx', '3edc', '4rfv', '5tgb'
-    ]
-    for pattern in keyboard_patterns:
-        if pattern in password.lower():
-            patterns.append(f"Patrón de teclado ({pattern})")
-    
-    # Repeticiones
-    if re.search(r'(.)\1{2,}', password):
-        patterns.append("Caracteres repetidos")
-    
-    # Años comunes
-    if re.search(r'(19\d{2}|20\d{2})', password):
-        patterns.append("Año detectado")
-    
-    # Palabras comunes
-    common_words = ['password', 'pass', 'admin', 'user', 'root', 'test', 'demo', 'welcome']
-    for word in common_words:
-        if word in password.lower():
-            patterns.append(f"Palabra común ({word})")
-    
-    # Nombres comunes
-    common_names = ['maria', 'juan', 'pedro', 'ana', 'jose', 'luis', 'carlos', 'laura']
-    for name in common_names:
-        if name in password.lower():
-            patterns.append(f"Nombre común ({name})")
-    
-    return patterns
+    return get_matcher().detect(password, features.lower if features else None)
 
-def calculate_entropy(password):
+def calculate_entropy(password, features=None):
     """Calcula la entropía de Shannon de una contraseña"""
-    from collections import Counter
-    import math
-    
     if not password:
         return 0
     
     # Contar frecuencia de cada carácter
-    counter = Counter(password)
-    length = len(password)
+    features = features or extract_features(password)
+    counter = features.counts
+    length = features.length
     
     # Calcular entropía
     entropy = 0
@@ -66,12 +120,13 @@ def calculate_entropy(password):
     
     return round(total_entropy, 2)
 
-def get_charset_info(password):
+def get_charset_info(password, features=None):
     """Obtiene información sobre el conjunto de caracteres usado"""
-    has_lower = any(c.islower() for c in password)
-    has_upper = any(c.isupper() for c in password)
-    has_digit = any(c.isdigit() for c in password)
-    has_symbol = any(not c.isalnum() for c in password)
+    features = features or extract_features(password)
+    has_lower = features.has_lower
+    has_upper = features.has_upper
+    has_digit = features.has_digit
+    has_symbol = features.has_symbol
     
     charset_types = []
     if has_lower:
@@ -0,0 +1,247 @@
+import argparse
+import json
+import math
+import os
+import re
+import sys
+from collections import Counter
+
+from modules.aggregates import LEVELS, pattern_type
+
+# Políticas de contraseñas declarativas: un archivo JSON con una política por
+# nombre (una por unidad de negocio, por ejemplo) y sus reglas:
+#
+#   {"corporativa": {"longitud_minima": 12, "clases_minimas": 3,
+#                    "prohibir_comunes": true, "intentos_minimos": 1e10},
+#    "administradores": {"longitud_minima": 16, "listas_prohibidas": ["rockyou"]}}
+#
+# Todas las políticas de un archivo se compilan juntas en una sola función de
+# Python que recibe el resultado de analyze_password: los valores que usan
+# varias reglas (longitud, clases, tipos de patrón) se calculan una vez por
+# contraseña y cada regla es una comparación. Evaluar un archivo nuevo sobre
+# un reporte JSON Lines ya generado no requiere volver a analizar nada.
+
+EXAMPLE_POLICIES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                "data", "example-policies.json")
+
+# Nombre de la regla en el archivo para cada tipo de get_charset_info
+CLASS_NAMES = {"minúsculas": "minusculas", "MAYÚSCULAS": "mayusculas", "números": "numeros",
+               "símbolos": "simbolos"}
+LEVEL_INDEX = {level: i for i, level in enumerate(LEVELS)}
+
+# Valores compartidos: nombre -> expresión sobre el resultado del análisis
+SHARED = {
+    # Los resultados de una base de auditoría sin contraseñas traen 'longitud'
+    "length": "result['longitud'] if 'longitud' in result else len(result['password'])",
+    "classes": "frozenset([CLASS_NAMES[label] for label in result['charset_types']])",
+    "pattern_types": "{pattern_type(pattern) for pattern in result['patrones']}",
+    "level": "LEVEL_INDEX[result['nivel']]",
+}
+
+# Regla -> (tipo del valor, expresión que es verdadera si NO se cumple). En
+# la expresión, {value} es el valor ya convertido por _convert.
+RULES = {
+    "longitud_minima": (int, "length < {value}"),
+    "longitud_maxima": (int, "length > {value}"),
+    "clases_requeridas": (list, "not {value} <= classes"),
+    "clases_minimas": (int, "len(classes) < {value}"),
+    "score_minimo": (int, "result['score'] < {value}"),
+    "nivel_minimo": (str, "level < {value}"),
+    "intentos_minimos": (float, "result['log2_intentos'] < {value}"),
+    "max_patrones": (int, "len(result['patrones']) > {value}"),
+    "patrones_prohibidos": (list, "not {value}.isdisjoint(pattern_types)"),
+    "prohibir_comunes": (bool, "result['comun']"),
+    "listas_prohibidas": (list, "not {value}.isdisjoint(result['listas'])"),
+    "prohibir_casi_comunes": (bool, "result.get('casi_comun') is not None"),
+    "prohibir_pwned": (bool, "result['pwned']"),
+}
+
+# Claves que se aceptan en una política sin ser reglas
+DESCRIPTION = "descripcion"
+
+
+def _convert(policy, rule, value):
+    """Valida el valor de una regla y lo lleva a la forma que usa la expresión"""
+    kind, _ = RULES[rule]
+    where = f"Política '{policy}', regla '{rule}'"
+    if kind is bool:
+        if not isinstance(value, bool):
+            raise ValueError(f"{where}: se esperaba true o false")
+        return value
+    if kind is int:
+        if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+            raise ValueError(f"{where}: se esperaba un entero no negativo")
+        return value
+    if kind is float:
+        # Intentos en escala lineal (1e10); internamente se compara en log2
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or not 1 <= value < math.inf:
+            raise ValueError(f"{where}: se esperaba un número de intentos >= 1")
+        return math.log2(value)
+    if kind is str:
+        if value not in LEVEL_INDEX:
+            raise ValueError(f"{where}: nivel desconocido {value!r} (opciones: {', '.join(LEVELS)})")
+        return LEVEL_INDEX[value]
+    if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+        raise ValueError(f"{where}: se esperaba una lista de textos")
+    if rule == "clases_requeridas":
+        unknown = set(value) - set(CLASS_NAMES.values())
+        if unknown:
+            raise ValueError(f"{where}: clases desconocidas {sorted(unknown)} "
+                             f"(opciones: {', '.join(CLASS_NAMES.values())})")
+    return frozenset(value)
+
+
+def compile_policies(policies):
+    """
+    Compila varias políticas en una sola función de evaluación
+
+    Args:
+        policies: dict nombre -> reglas (como en el archivo JSON)
+
+    Returns:
+        tuple: (función, código fuente). La función recibe un resultado de
+        analyze_password y retorna, por política y en el mismo orden, la
+        lista de reglas que no se cumplen (vacía si la contraseña cumple).
+    """
+    constants = {}
+    used = set()
+    body = []
+    for i, (name, rules) in enumerate(policies.items()):
+        if not isinstance(name, str) or not name:
+            raise ValueError("Cada política necesita un nombre")
+        if not isinstance(rules, dict):
+            raise ValueError(f"Política '{name}': se esperaba un objeto con reglas")
+        unknown = set(rules) - set(RULES) - {DESCRIPTION}
+        if unknown:
+            raise ValueError(f"Política '{name}': reglas desconocidas {sorted(unknown)} "
+                             f"(opciones: {', '.join(RULES)})")
+        body.append(f"    failed_{i} = []")
+        # Las reglas se evalúan en el orden de RULES, no en el del archivo
+        for rule, (kind, expression) in RULES.items():
+            if rule not in rules:
+                continue
+            value = _convert(name, rule, rules[rule])
+            if kind is bool and not value:
+                continue
+            constant = f"value_{len(constants)}"
+            if "{value}" in expression:
+                constants[constant] = value
+            used.update(shared for shared in SHARED if re.search(rf"\b{shared}\b", expression))
+            body.append(f"    if {expression.format(value=constant)}:")
+            body.append(f"        failed_{i}.append({rule!r})")
+
+    lines = ["def evaluate(result):"]
+    lines += [f"    {shared} = {SHARED[shared]}" for shared in SHARED if shared in used]
+    lines += body
+    lines.append("    return (" + "".join(f"failed_{i}, " for i in range(len(policies))).rstrip() + ")")
+    source = "\n".join(lines) + "\n"
+
+    namespace = dict(constants, CLASS_NAMES=CLASS_NAMES, LEVEL_INDEX=LEVEL_INDEX, pattern_type=pattern_type)
+    exec(compile(source, "<políticas>", "exec"), namespace)
+    return namespace["evaluate"], source
+
+
+class PolicySet:
+    """Políticas compiladas juntas; ver compile_policies"""
+
+    def __init__(self, policies):
+        self.names = tuple(policies)
+        self.evaluate, self.source = compile_policies(policies)
+
+    def __len__(self):
+        return len(self.names)
+
+    def check(self, result):
+        """dict nombre de la política -> reglas que no se cumplen"""
+        return dict(zip(self.names, self.evaluate(result)))
+
+    def annotate(self, result):
+        """Copia del resultado con el campo 'politicas' (ver check)"""
+        return dict(result, politicas=self.check(result))
+
+
+def load_policies(path):
+    """Lee y compila un archivo JSON de políticas"""
+    with open(path, 'r', encoding='utf-8') as f:
+        policies = json.load(f)
+    if not isinstance(policies, dict) or not policies:
+        raise ValueError(f"'{path}' debe contener un objeto con al menos una política")
+    return PolicySet(policies)
+
+
+class PolicySummary:
+    """Cuántas contraseñas cumplen cada política y qué reglas fallan más"""
+
+    def __init__(self, names):
+        self.total = 0
+        self.passed = dict.fromkeys(names, 0)
+        self.failures = {name: Counter() for name in names}
+
+    def add(self, checked, weight=1):
+        """Agrega el campo 'politicas' de un resultado, contado `weight` veces"""
+        self.total += weight
+        for name, failed in checked.items():
+            if failed:
+                self.failures[name].update(dict.fromkeys(failed, weight))
+            else:
+                self.passed[name] += weight
+
+    def to_dict(self):
+        return {name: {"cumplen": passed, "no_cumplen": self.total - passed,
+                       "reglas": dict(self.failures[name].most_common())}
+                for name, passed in self.passed.items()}
+
+    def lines(self):
+        """Una línea por política, para la salida de la línea de comandos"""
+        for name, passed in self.passed.items():
+            share = passed / self.total * 100 if self.total else 0
+            line = f"{name}: {passed:,} de {self.total:,} cumplen ({share:.1f}%)"
+            if self.failures[name]:
+                line += "; incumplidas: " + ", ".join(f"{rule} {count:,}"
+                                                      for rule, count in self.failures[name].most_common())
+            yield line
+
+
+def main(argv=None):
+    """Evalúa políticas sobre un reporte JSON Lines ya generado, sin volver a analizar"""
+    parser = argparse.ArgumentParser(
+        prog="python -m modules.policy",
+        description="Evalúa un archivo de políticas sobre un reporte JSON Lines de 'auditor.py audit'")
+    parser.add_argument("policies", help="Archivo JSON de políticas")
+    parser.add_argument("report", help="Reporte JSON Lines (--json de audit) o '-' para stdin")
+    parser.add_argument("-o", "--output", metavar="RUTA",
+                        help="Escribir el reporte con el campo 'politicas' agregado (JSON Lines)")
+    parser.add_argument("--json", dest="json_output", action="store_true",
+                        help="Imprimir el resumen en JSON")
+    parser.add_argument("--show-source", action="store_true", help="Mostrar la función compilada")
+    args = parser.parse_args(argv)
+
+    policies = load_policies(args.policies)
+    if args.show_source:
+        print(policies.source)
+    summary = PolicySummary(policies.names)
+    lines = sys.stdin if args.report == '-' else open(args.report, 'r', encoding='utf-8')
+    output = open(args.output, 'w', encoding='utf-8') if args.output else None
+    try:
+        for line in lines:
+            if not line.strip():
+                continue
+            result = policies.annotate(json.loads(line))
+            summary.add(result['politicas'])
+            if output is not None:
+                output.write(json.dumps(result, ensure_ascii=False) + "\n")
+    finally:
+        if lines is not sys.stdin:
+            lines.close()
+        if output is not None:
+            output.close()
+
+    if args.json_output:
+        print(json.dumps(summary.to_dict(), ensure_ascii=False, indent=2))
+    else:
+        for line in summary.lines():
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,178 @@
 import hashlib
-import requests
+import threading
+
+from modules.hibp_cache import RangeCache, valid_range
+from modules.pwned_offline import PwnedStore
+
+# Almacén local de Pwned Passwords; cuando está configurado no se usa la red,
+# salvo que sea solo de respaldo para cuando la API no responde
+_offline_store = None
+_offline_fallback_only = False
+
+# Caché en disco de respuestas /range/ compartida entre ejecuciones
+_range_cache = None
+
+# Cliente HTTP concurrente (se crea al primer uso, con las opciones de configure_client)
+_client = None
+_client_options = {}
+_client_lock = threading.Lock()
+
+def use_offline_store(path, fallback_only=False):
+    """
+    Configura el almacén offline de HIBP usado por check_pwned_password
+
+    Args:
+        path: Ruta del binario generado por modules.pwned_offline (None para desactivarlo)
+        fallback_only: Si es True se sigue usando la API y el almacén solo
+            responde cuando la red falla o el circuit breaker está abierto
+    """
+    global _offline_store, _offline_fallback_only
+    if _offline_store is not None:
+        _offline_store.close()
+    _offline_store = PwnedStore(path) if path else None
+    _offline_fallback_only = fallback_only
+    return _offline_store
+
+def use_range_cache(directory, **options):
+    """
+    Activa la caché en disco de rangos HIBP (None para desactivarla)
+    
+    Args:
+        directory: Carpeta de la caché
+        **options: ttl y max_bytes, ver modules.hibp_cache.RangeCache
+    """
+    global _range_cache
+    _range_cache = RangeCache(directory, **options) if directory else None
+    return _range_cache
+
+def configure_client(**options):
+    """
+    Configura el cliente HTTP de HIBP (reemplaza al actual, si existe)
+    
+    El cliente se crea recién en la primera consulta a la API: así las
+    ejecuciones offline o sin HIBP no importan requests al arrancar.
+    
+    Args:
+        **options: base_url, max_in_flight, timeout, etc. Ver modules.hibp_client.HIBPClient
+    """
+    global _client, _client_options
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+        _client_options = options
+
+def get_client():
+    """Retorna el cliente HTTP de HIBP, creándolo la primera vez"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            from modules.hibp_client import HIBPClient
+            _client = HIBPClient(**_client_options)
+        return _client
+
+def hibp_counters():
+    """Contadores de la caché de rangos y del cliente HTTP (para las métricas)"""
+    counters = {}
+    if _range_cache is not None:
+        counters["range_cache_hits"] = _range_cache.hits
+        counters["range_cache_misses"] = _range_cache.misses
+    if _client is not None:
+        counters["hibp_requests"] = _client.requests_made
+        counters["hibp_throttled"] = _client.throttled
+        counters["hibp_errors"] = _client.errors
+    return counters
+
+def pwned_source():
+    """
+    Describe de dónde salen los resultados HIBP con la configuración actual
+
+    Returns:
+        tuple: (descripción, archivo offline o None, True si se consulta la API)
+    """
+    if _offline_store is None:
+        return "api", None, True
+    if _offline_fallback_only:
+        return "api+offline", _offline_store.path, True
+    return "offline", _offline_store.path, False
+
+def _offline_only():
+    return _offline_store is not None and not _offline_fallback_only
+
+def _offline_range(prefix):
+    """Respuesta /range/ desde el almacén offline, si hay uno configurado"""
+    return _offline_store.range_text(prefix) if _offline_store is not None else None
+
+def hash_parts(password):
+    """Retorna (prefijo, sufijo) del SHA-1 en hexadecimal de la contraseña"""
+    sha1_hash = hashlib.sha1(password.encode('utf-8')).hexdigest().upper()
+    return sha1_hash[:5], sha1_hash[5:]
+
+def find_suffix(range_text, suffix):
+    """Busca un sufijo en una respuesta /range/ y retorna (is_pwned, count)"""
+    for hash_line in range_text.splitlines():
+        hash_suffix, count = hash_line.split(':')
+        if hash_suffix == suffix:
+            return True, int(count)
+    return False, 0
+
+def parse_range(range_text):
+    """Convierte una respuesta /range/ en un diccionario sufijo -> ocurrencias"""
+    counts = {}
+    for hash_line in range_text.splitlines():
+        hash_suffix, count = hash_line.split(':')
+        counts[hash_suffix] = int(count)
+    return counts
+
+def fetch_range(prefix):
+    """
+    Obtiene la respuesta /range/ de un prefijo, usando la caché en disco si está activa
+    
+    Returns:
+        str: Texto de la respuesta, o None si no se pudo obtener
+    """
+    return fetch_ranges([prefix])[prefix]
+
+def fetch_ranges(prefixes):
+    """
+    Obtiene varios rangos: primero de la caché, luego de la API en paralelo
+    
+    Los rangos que la API no pudo entregar (o que no tienen la forma de un
+    rango) se resuelven con el almacén offline de respaldo si está
+    configurado; si no, quedan en None y se informan como error (-1).
+    
+    Returns:
+        dict: prefijo -> texto de la respuesta (None si no se pudo obtener)
+    """
+    ranges = {}
+    missing = []
+    for prefix in dict.fromkeys(prefixes):
+        text = _range_cache.get(prefix) if _range_cache is not None else None
+        if text is None:
+            missing.append(prefix)
+        else:
+            ranges[prefix] = text
+    
+    if not missing:
+        # Todo salió de la caché: ni siquiera se crea el cliente (que importa requests)
+        return ranges
+    
+    for prefix, text in get_client().fetch_ranges(missing).items():
+        if text is None or not valid_range(text):
+            # Error de conexión o de la API, o una respuesta que no es un
+            # rango (portal cautivo): no se cachea y se degrada a la ruta offline
+            text = _offline_range(prefix)
+        elif _range_cache is not None:
+            _range_cache.put(prefix, text)
+        ranges[prefix] = text
+    
+    return ranges
 
 def check_pwned_password(password):
     """
     Verifica si una contraseña ha sido comprometida usando la API de Have I Been Pwned
     Usa k-anonymity: solo envía los primeros 5 caracteres del hash SHA-1
+    Si hay un almacén offline configurado (use_offline_store) no se usa la red
     
     Returns:
         tuple: (is_pwned: bool, count: int)
@@ -12,39 +180,65 @@ def check_pwned_password(password):
         - count: Número de veces que apareció en brechas (0 si no fue encontrada)
     """
     
-    # Calcular SHA-1 hash de la contraseña
-    sha1_hash = hashlib.sha1(password.encode('utf-8')).hexdigest().upper()
+    # Calcular SHA-1 hash de la contraseña y dividirlo en prefijo/sufijo
+    prefix, suffix = hash_parts(password)
     
-    # Tomar los primeros 5 caracteres del hash
-    prefix = sha1_hash[:5]
-    suffix = sha1_hash[5:]
+    if _offline_only():
+        return _offline_store.lookup(prefix, suffix)
     
-    try:
-        # Hacer request a la API de HIBP
-        url = f"https://api.pwnedpasswords.com/range/{prefix}"
-        response = requests.get(url, timeout=3)
-        
-        if response.status_code == 200:
-            # Buscar el sufijo en la respuesta
-            hashes = response.text.splitlines()
-            
-            for hash_line in hashes:
-                hash_suffix, count = hash_line.split(':')
-                if hash_suffix == suffix:
-                    return True, int(count)
-            
-            # No se encontró en las brechas
-            return False, 0
-        else:
-            # Error en la API, asumir que no está comprometida
-            return False, -1
-            
-    except requests.exceptions.RequestException:
-        # Error de conexión, asumir que no está comprometida
-        return False, -1
-    except Exception:
-        # Cualquier otro error
+    range_text = fetch_range(prefix)
+    if range_text is None:
+        # Error de conexión o de la API, asumir que no está comprometida
         return False, -1
+    
+    # Buscar el sufijo en la respuesta
+    return find_suffix(range_text, suffix)
+
+def check_pwned_batch(passwords):
+    """
+    Verifica varias contraseñas agrupándolas por prefijo SHA-1
+    
+    Cada rango se descarga (o se lee de la caché) una sola vez aunque lo
+    compartan varias contraseñas, las descargas se hacen en paralelo y las
+    contraseñas repetidas no generan peticiones adicionales.
+    
+    Returns:
+        list: Tuplas (is_pwned, count) en el mismo orden que `passwords`
+    """
+    return check_pwned_hashes(prefix + suffix for prefix, suffix in map(hash_parts, passwords))
+
+def check_pwned_hashes(sha1_hashes):
+    """
+    Igual que check_pwned_batch, pero a partir de hashes SHA-1 ya calculados
+    
+    Sirve para hashes cuya contraseña se desconoce (por ejemplo, los de un
+    volcado de SHA-1 sin sal que no se encontraron en la wordlist).
+    
+    Args:
+        sha1_hashes: Hashes SHA-1 en hexadecimal (40 caracteres)
+    
+    Returns:
+        list: Tuplas (is_pwned, count) en el mismo orden
+    """
+    parts = [(sha1_hash[:5].upper(), sha1_hash[5:].upper()) for sha1_hash in sha1_hashes]
+    
+    if _offline_only():
+        return [_offline_store.lookup(prefix, suffix) for prefix, suffix in parts]
+    
+    ranges = {}
+    for prefix, range_text in fetch_ranges(prefix for prefix, _ in parts).items():
+        ranges[prefix] = parse_range(range_text) if range_text is not None else None
+    
+    results = []
+    for prefix, suffix in parts:
+        counts = ranges[prefix]
+        if counts is None:
+            results.append((False, -1))
+        elif suffix in counts:
+            results.append((True, counts[suffix]))
+        else:
+            results.append((False, 0))
+    return results
 
 def format_pwned_result(is_pwned, count):
     """
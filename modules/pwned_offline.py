@@ -0,0 +1,163 @@
+import argparse
+import mmap
+import os
+import struct
+
+# Formato del almacén offline de Have I Been Pwned:
+#   cabecera (16 bytes) | tabla de rangos (2^20 + 1 enteros) | registros
+# Cada registro ocupa 24 bytes: SHA-1 binario (20 bytes) + ocurrencias (uint32).
+# La tabla de rangos indica, para cada prefijo de 5 caracteres hex (20 bits),
+# dónde empieza su bloque de registros, igual que el endpoint /range/ de la API.
+MAGIC = b"PWHIBP01"
+HEADER = struct.Struct(">8sQ")
+PREFIX_BITS = 20
+FANOUT = struct.Struct(f">{(1 << PREFIX_BITS) + 1}Q")
+RECORD = struct.Struct(">20sI")
+HASH_SIZE = 20
+
+
+def iter_hibp_lines(source):
+    """
+    Itera tuplas (sha1_hex, count) de un volcado de Pwned Passwords
+
+    Acepta el archivo "ordered by hash" (HASH:COUNT por línea) o un directorio
+    con un archivo por rango (PREFIJO.txt con líneas SUFIJO:COUNT), como el
+    que genera el descargador oficial.
+    """
+    if os.path.isdir(source):
+        for name in sorted(os.listdir(source)):
+            prefix, ext = os.path.splitext(name)
+            if ext.lower() != ".txt" or len(prefix) != 5:
+                continue
+            with open(os.path.join(source, name), 'r', encoding='ascii') as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        suffix, count = line.split(':')
+                        yield prefix.upper() + suffix.upper(), int(count)
+    else:
+        with open(source, 'r', encoding='ascii') as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    sha1_hash, count = line.split(':')
+                    yield sha1_hash.upper(), int(count)
+
+
+def build_store(source, output_path):
+    """
+    Compila un volcado de Pwned Passwords ordenado por hash en un binario compacto
+
+    La escritura es en streaming (memoria constante), por lo que la entrada
+    debe estar ordenada por hash, como la distribuye HIBP.
+
+    Returns:
+        int: Número de hashes escritos
+    """
+    fanout = [0] * ((1 << PREFIX_BITS) + 1)
+    count = 0
+    previous = b""
+
+    tmp_path = output_path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, 0))
+        f.write(FANOUT.pack(*fanout))
+
+        for sha1_hash, occurrences in iter_hibp_lines(source):
+            digest = bytes.fromhex(sha1_hash)
+            if digest <= previous:
+                raise ValueError(f"El volcado no está ordenado por hash (línea {count + 1})")
+            previous = digest
+            fanout[(int.from_bytes(digest[:3], 'big') >> 4) + 1] += 1
+            f.write(RECORD.pack(digest, min(occurrences, 0xFFFFFFFF)))
+            count += 1
+
+        # Convertir los conteos por prefijo en offsets acumulados
+        for i in range(1, len(fanout)):
+            fanout[i] += fanout[i - 1]
+
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, count))
+        f.write(FANOUT.pack(*fanout))
+    os.replace(tmp_path, output_path)
+
+    return count
+
+
+class PwnedStore:
+    """Almacén offline de hashes comprometidos mapeado en memoria"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, count = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self._mm.close()
+            raise ValueError(f"'{path}' no es un almacén HIBP offline válido")
+
+        self.count = count
+        self._records_offset = HEADER.size + FANOUT.size
+        self._fanout = memoryview(self._mm)[HEADER.size:self._records_offset].cast('B')
+
+    def __len__(self):
+        return self.count
+
+    def _range_bounds(self, prefix_value):
+        start, end = struct.unpack_from(">QQ", self._fanout, prefix_value * 8)
+        return start, end
+
+    def lookup_digest(self, digest):
+        """
+        Busca un SHA-1 binario de 20 bytes
+
+        Returns:
+            tuple: (is_pwned, count) con la misma semántica que la API online
+        """
+        lo, hi = self._range_bounds(int.from_bytes(digest[:3], 'big') >> 4)
+        mm = self._mm
+        base = self._records_offset
+        while lo < hi:
+            mid = (lo + hi) // 2
+            offset = base + mid * RECORD.size
+            current = mm[offset:offset + HASH_SIZE]
+            if current < digest:
+                lo = mid + 1
+            elif current > digest:
+                hi = mid
+            else:
+                return True, RECORD.unpack_from(mm, offset)[1]
+        return False, 0
+
+    def lookup(self, prefix, suffix):
+        """Busca un hash dado como prefijo (5 hex) y sufijo (35 hex)"""
+        return self.lookup_digest(bytes.fromhex(prefix + suffix))
+
+    def range_text(self, prefix):
+        """Genera la respuesta de /range/{prefix} a partir del almacén local"""
+        start, end = self._range_bounds(int(prefix, 16))
+        lines = []
+        for i in range(start, end):
+            digest, occurrences = RECORD.unpack_from(self._mm, self._records_offset + i * RECORD.size)
+            lines.append(f"{digest.hex().upper()[5:]}:{occurrences}")
+        return "\n".join(lines)
+
+    def close(self):
+        self._fanout.release()
+        self._mm.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compila un volcado de Pwned Passwords para uso offline")
+    parser.add_argument("source", help="Archivo HASH:COUNT ordenado por hash o directorio de rangos")
+    parser.add_argument("-o", "--output", default="data/pwned-passwords.bin",
+                        help="Ruta del almacén binario (por defecto data/pwned-passwords.bin)")
+    args = parser.parse_args(argv)
+
+    count = build_store(args.source, args.output)
+    print(f"[OK] Almacén HIBP offline con {count:,} hashes guardado en: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,21 @@
-def get_recommendations(password, score, patterns, is_common):
+from modules.features import extract_features
+
+def get_recommendations(password, score, patterns, is_common, features=None):
     """Genera recomendaciones personalizadas para mejorar la contraseña"""
+    features = features or extract_features(password)
     recommendations = []
     
     # Longitud
-    if len(password) < 8:
+    if features.length < 8:
         recommendations.append("❌ Aumenta la longitud a mínimo 12 caracteres")
-    elif len(password) < 12:
+    elif features.length < 12:
         recommendations.append("⚠️ Considera usar al menos 12-16 caracteres")
     
     # Complejidad
-    has_lower = any(c.islower() for c in password)
-    has_upper = any(c.isupper() for c in password)
-    has_digit = any(c.isdigit() for c in password)
-    has_symbol = any(not c.isalnum() for c in password)
+    has_lower = features.has_lower
+    has_upper = features.has_upper
+    has_digit = features.has_digit
+    has_symbol = features.has_symbol
     
     if not has_lower:
         recommendations.append("❌ Agrega letras minúsculas")
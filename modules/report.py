@@ -1,32 +1,14 @@
-import pandas as pd
+import csv
+import html
+import io
+import json
 from datetime import datetime
 
-def generate_report(results, output_csv="audit_report.csv", output_html="audit_report.html"):
-    """Genera reportes en formato CSV y HTML"""
-    
-    if not results:
-        print("[WARN] No hay resultados para generar reporte")
-        return
-    
-    # Crear DataFrame
-    df = pd.DataFrame(results)
-    
-    # Guardar CSV
-    df.to_csv(output_csv, index=False, encoding='utf-8-sig')
-    print(f"[OK] Reporte CSV guardado en: {output_csv}")
-    
-    # Generar HTML
-    html_content = generate_html_report(results)
-    with open(output_html, 'w', encoding='utf-8') as f:
-        f.write(html_content)
-    print(f"[OK] Reporte HTML guardado en: {output_html}")
+from modules.aggregates import LEVELS, AuditSummary, reused_rows
+from modules.crack_time import ATTACKER_PROFILES
+from modules.metrics import get_metrics
 
-def generate_html_report(results):
-    """Genera un reporte HTML con estilo profesional"""
-    
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    
-    html = f"""
+HTML_HEAD = """
 <!DOCTYPE html>
 <html lang="es">
 <head>
@@ -48,6 +30,8 @@ def generate_html_report(results):
         }}
         
         .container {{
+            display: flex;
+            flex-direction: column;
             max-width: 1200px;
             margin: 0 auto;
             background: white;
@@ -73,6 +57,12 @@ def generate_html_report(results):
             font-size: 1.1em;
         }}
         
+        /* Las estadísticas se escriben al final (streaming) pero se muestran arriba */
+        .header {{ order: 0; }}
+        .stats {{ order: 1; }}
+        .results {{ order: 2; }}
+        .footer {{ order: 3; }}
+        
         .stats {{
             display: grid;
             grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
@@ -227,81 +217,92 @@ def generate_html_report(results):
             <p style="font-size: 0.9em; margin-top: 10px;">Generado: {timestamp}</p>
         </div>
         
-        <div class="stats">
+        <div class="results">
+            <h2 style="margin-bottom: 20px; color: #333;">Resultados Detallados</h2>
+"""
+
+HTML_STATS = """        <div class="stats">
             <div class="stat-card">
-                <h3>{len(results)}</h3>
+                <h3>{total}</h3>
                 <p>Contraseñas Analizadas</p>
             </div>
             <div class="stat-card">
-                <h3>{sum(1 for r in results if r.get('nivel') in ['Fuerte', 'Muy Fuerte'])}</h3>
+                <h3>{strong}</h3>
                 <p>Contraseñas Fuertes</p>
             </div>
             <div class="stat-card">
-                <h3>{sum(1 for r in results if r.get('comun', False))}</h3>
+                <h3>{common}</h3>
                 <p>Contraseñas Comprometidas</p>
             </div>
             <div class="stat-card">
-                <h3>{sum(1 for r in results if r.get('nivel') in ['Muy Débil', 'Débil'])}</h3>
+                <h3>{weak}</h3>
                 <p>Requieren Atención</p>
             </div>
+            <div class="stat-card">
+                <h3>{reused}</h3>
+                <p>Filas Repetidas</p>
+            </div>
         </div>
-        
-        <div class="results">
-            <h2 style="margin-bottom: 20px; color: #333;">Resultados Detallados</h2>
 """
-    
-    for result in results:
-        nivel = result.get('nivel', 'Desconocido')
-        badge_class = f"badge-{nivel.lower().replace(' ', '-')}"
-        
-        html += f"""
+
+HTML_CARD = """
             <div class="password-card">
                 <div class="password-header">
-                    <span class="password-text">{result.get('password', 'N/A')}</span>
+                    <span class="password-text">{password}</span>
                     <span class="badge {badge_class}">{nivel}</span>
                 </div>
                 
                 <div class="info-grid">
                     <div class="info-item">
                         <div class="info-label">Puntuación</div>
-                        <div class="info-value">{result.get('score', 0)}/10</div>
+                        <div class="info-value">{score}/10</div>
                     </div>
                     <div class="info-item">
                         <div class="info-label">Tiempo de Crackeo</div>
-                        <div class="info-value">{result.get('tiempo_crack_legible', 'N/A')}</div>
+                        <div class="info-value">{crack_time}</div>
                     </div>
                     <div class="info-item">
                         <div class="info-label">Entropía</div>
-                        <div class="info-value">{result.get('entropia', 0)} bits</div>
+                        <div class="info-value">{entropy} bits</div>
                     </div>
                     <div class="info-item">
                         <div class="info-label">Contraseña Común</div>
-                        <div class="info-value">{'❌ Sí' if result.get('comun', False) else '✅ No'}</div>
+                        <div class="info-value">{common}</div>
+                    </div>
+                    <div class="info-item">
+                        <div class="info-label">Ocurrencias</div>
+                        <div class="info-value">{occurrences}</div>
                     </div>
                 </div>
 """
-        
-        if result.get('recomendaciones'):
-            html += f"""
+
+HTML_CRACK_PROFILES = """
+                <div class="info-grid">
+{items}
+                </div>
+"""
+
+HTML_CRACK_PROFILE = """                    <div class="info-item">
+                        <div class="info-label">{label}</div>
+                        <div class="info-value">{value}</div>
+                    </div>"""
+
+HTML_RECOMMENDATIONS = """
                 <div class="recommendations">
                     <h4>📋 Recomendaciones</h4>
                     <ul>
-"""
-            for rec in result.get('recomendaciones', []):
-                html += f"                        <li>{rec}</li>\n"
-            
-            html += """
+{items}
                     </ul>
                 </div>
 """
-        
-        html += """
+
+HTML_CARD_END = """
             </div>
 """
-    
-    html += """
-        </div>
+
+HTML_FOOTER = """        </div>
         
+{stats}        
         <div class="footer">
             <p>🔐 Password Auditor v2.0 - Herramienta de Auditoría de Seguridad</p>
             <p>Desarrollado para análisis de seguridad y auditorías internas</p>
@@ -310,5 +311,205 @@ def generate_html_report(results):
 </body>
 </html>
 """
+
+
+def _csv_value(value):
+    """Convierte un valor del resultado en una celda CSV"""
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple)):
+        return "; ".join(str(item) for item in value)
+    if isinstance(value, dict):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+class ReportWriter:
+    """
+    Escribe reportes CSV, HTML y JSON Lines de forma incremental
+
+    Cada resultado se escribe apenas llega en archivos con buffer, sin
+    guardar la lista completa en memoria, por lo que el consumo es el mismo
+    para 100 o 10 millones de contraseñas. Las estadísticas del HTML se
+    acumulan con contadores y se escriben al cerrar. Los archivos se crean
+    con el primer resultado. Cualquier ruta en None omite ese formato.
+
+    `output_summary` genera además un resumen agregado (modules.aggregates)
+    de tamaño fijo: HTML, o JSON si la ruta termina en .json.
+    """
+
+    def __init__(self, output_csv=None, output_html=None, output_json=None, buffer_size=1 << 20,
+                 output_summary=None):
+        self.output_csv = output_csv
+        self.output_html = output_html
+        self.output_json = output_json
+        self.output_summary = output_summary
+        self.summary = AuditSummary() if output_summary else None
+        self.buffer_size = buffer_size
+        self.count = 0
+        self.total = 0
+        self.strong = 0
+        self.common = 0
+        self.weak = 0
+        self.reused = 0
+        self._csv_file = None
+        self._csv_writer = None
+        self._fields = None
+        self._html_file = None
+        self._json_file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _open(self, path):
+        if hasattr(path, "write"):
+            return path
+        return open(path, 'w', encoding='utf-8', newline='', buffering=self.buffer_size)
+
+    def _start(self, result):
+        if self.output_csv:
+            if hasattr(self.output_csv, "write"):
+                self._csv_file = self.output_csv
+            else:
+                self._csv_file = open(self.output_csv, 'w', encoding='utf-8-sig', newline='',
+                                      buffering=self.buffer_size)
+            self._fields = list(result.keys())
+            self._csv_writer = csv.writer(self._csv_file)
+            self._csv_writer.writerow(self._fields)
+        if self.output_html:
+            self._html_file = self._open(self.output_html)
+            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            self._html_file.write(HTML_HEAD.format(timestamp=timestamp))
+        if self.output_json:
+            self._json_file = self._open(self.output_json)
+
+    def write(self, result, weight=1):
+        """
+        Agrega un resultado a todos los reportes abiertos
+
+        `weight` es cuántas filas representa el resultado (sus ocurrencias
+        cuando hay una fila por contraseña distinta) en las estadísticas del
+        HTML y en el resumen agregado.
+        """
+        registry = get_metrics()
+        if registry:
+            clock = registry.clock()
+        if self.count == 0:
+            self._start(result)
+        self.count += 1
+        self.total += weight
+
+        nivel = result.get('nivel', 'Desconocido')
+        if nivel in LEVELS[3:]:
+            self.strong += weight
+        elif nivel in LEVELS[:2]:
+            self.weak += weight
+        if result.get('comun', False):
+            self.common += weight
+        self.reused += reused_rows(result, weight)
+
+        if self._csv_writer is not None:
+            self._csv_writer.writerow([_csv_value(result.get(field)) for field in self._fields])
+        if self._html_file is not None:
+            self._html_file.write(render_html_card(result))
+        if self._json_file is not None:
+            self._json_file.write(json.dumps(result, ensure_ascii=False) + "\n")
+        if self.summary is not None:
+            self.summary.add(result, weight)
+        if registry:
+            registry.lap("report_write", clock)
+
+    def close(self):
+        """Escribe el pie del HTML y cierra los archivos"""
+        if self._html_file is not None:
+            stats = HTML_STATS.format(total=self.total, strong=self.strong,
+                                      common=self.common, weak=self.weak, reused=self.reused)
+            self._html_file.write(HTML_FOOTER.format(stats=stats))
+        if self.summary is not None and self.count:
+            if str(self.output_summary).lower().endswith(".json"):
+                self.summary.write_json(self.output_summary)
+            else:
+                self.summary.write_html(self.output_summary)
+        for output, handle in ((self.output_csv, self._csv_file),
+                               (self.output_html, self._html_file),
+                               (self.output_json, self._json_file)):
+            if handle is not None and not hasattr(output, "write"):
+                handle.close()
+        self._csv_file = self._csv_writer = self._html_file = self._json_file = None
+
+    def print_summary(self):
+        """Informa qué reportes se generaron"""
+        if not self.count:
+            print("[WARN] No hay resultados para generar reporte")
+            return
+        for label, path in (("CSV", self.output_csv), ("HTML", self.output_html), ("JSON", self.output_json),
+                            ("resumen", self.output_summary)):
+            if path and not hasattr(path, "write"):
+                print(f"[OK] Reporte {label} guardado en: {path}")
+
+
+def render_html_card(result):
+    """Genera la tarjeta HTML de un resultado"""
+    nivel = result.get('nivel', 'Desconocido')
+    entropy = result.get('entropia', 0)
+
+    parts = [HTML_CARD.format(
+        password=html.escape(str(result.get('password', 'N/A'))),
+        badge_class=f"badge-{nivel.lower().replace(' ', '-')}",
+        nivel=html.escape(nivel),
+        score=result.get('score', 0),
+        crack_time=html.escape(str(result.get('tiempo_crack_legible', 'N/A'))),
+        entropy="N/A" if entropy is None else entropy,
+        common='❌ Sí' if result.get('comun', False) else '✅ No',
+        occurrences=result.get('ocurrencias', 1),
+    )]
+
+    if result.get('tiempos_crack'):
+        items = "\n".join(HTML_CRACK_PROFILE.format(
+            label=html.escape(ATTACKER_PROFILES[profile][0] if profile in ATTACKER_PROFILES else profile),
+            value=html.escape(readable))
+            for profile, readable in result['tiempos_crack'].items())
+        parts.append(HTML_CRACK_PROFILES.format(items=items))
+
+    if result.get('recomendaciones'):
+        items = "\n".join(f"                        <li>{html.escape(rec)}</li>"
+                          for rec in result['recomendaciones'])
+        parts.append(HTML_RECOMMENDATIONS.format(items=items))
+
+    parts.append(HTML_CARD_END)
+    return "".join(parts)
+
+
+def generate_report(results, output_csv="audit_report.csv", output_html="audit_report.html", output_json=None,
+                    output_summary=None):
+    """
+    Genera reportes en formato CSV, HTML y JSON Lines, y opcionalmente el resumen agregado
+    
+    `results` puede ser una lista o un generador: los resultados se escriben
+    a medida que se consumen. Cualquier ruta en None omite ese formato.
     
-    return html
+    Returns:
+        int: Número de resultados escritos
+    """
+    with ReportWriter(output_csv, output_html, output_json, output_summary=output_summary) as writer:
+        for result in results:
+            writer.write(result)
+    writer.print_summary()
+    return writer.count
+
+
+def generate_html_report(results):
+    """Genera un reporte HTML con estilo profesional"""
+    buffer = io.StringIO()
+    with ReportWriter(output_html=buffer) as writer:
+        for result in results:
+            writer.write(result)
+    if not writer.count:
+        # ReportWriter crea el reporte con el primer resultado: sin resultados, documento vacío
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        stats = HTML_STATS.format(total=0, strong=0, common=0, weak=0, reused=0)
+        return HTML_HEAD.format(timestamp=timestamp) + HTML_FOOTER.format(stats=stats)
+    return buffer.getvalue()
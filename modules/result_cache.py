@@ -0,0 +1,59 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAX_ENTRIES = 100_000
+
+
+def password_key(password):
+    """Clave del caché: BLAKE2b de 16 bytes (no se guarda la contraseña como clave)"""
+    return hashlib.blake2b(password.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+
+
+class ResultCache:
+    """
+    Caché LRU de resultados de analyze_password
+
+    Cada entrada guarda el resultado de una contraseña y cuántas veces
+    apareció hasta el momento. Al superar `max_entries` se descartan las
+    contraseñas usadas hace más tiempo (su contador vuelve a empezar si
+    reaparecen). Es seguro usarlo desde varios hilos.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Retorna el resultado cacheado de una clave, o None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def record(self, key, result):
+        """
+        Registra una aparición de la contraseña y retorna la fila a reportar
+
+        La fila es una copia de `result` con la columna 'ocurrencias'.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = [result, 0]
+                if len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            else:
+                self._entries.move_to_end(key)
+            entry[1] += 1
+            return dict(entry[0], ocurrencias=entry[1])
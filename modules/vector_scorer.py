@@ -0,0 +1,207 @@
+import math
+
+from modules.evaluator import GUESS_SCORE_CAPS
+from modules.features import SCORE_SYMBOLS
+
+try:
+    import numpy as np
+except ImportError:  # numpy es opcional: solo lo necesita este módulo
+    np = None
+
+# Memoria aproximada (en elementos) del cubo de comparaciones por bloque
+BLOCK_BUDGET = 1 << 24
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("modules.vector_scorer requiere numpy (pip install numpy)")
+
+
+CHAR_CLASSES = ("lower", "upper", "digit", "symbol", "decimal", "score_symbol",
+                "ascii_lower", "ascii_upper")
+
+# Máscaras de clases (un bit por clase) del plano multilingüe básico, más una
+# entrada final vacía para el relleno. Se construye al primer uso.
+_bmp_table = None
+
+
+def _char_table(codepoints):
+    """Clasifica códigos Unicode con las mismas reglas que el código escalar"""
+    table = np.zeros(len(codepoints), dtype=np.uint8)
+    for i, c in enumerate(map(chr, codepoints.tolist())):
+        bits = (c.islower(), c.isupper(), c.isdigit(), not c.isalnum(), c.isdecimal(),
+                c in SCORE_SYMBOLS, 'a' <= c <= 'z', 'A' <= c <= 'Z')
+        table[i] = sum(bit << position for position, bit in enumerate(bits))
+    return table
+
+
+def _classify(codepoints, valid):
+    """Máscara de clases de cada contraseña: tabla densa para el BMP y np.unique para el resto"""
+    global _bmp_table
+    if _bmp_table is None:
+        _bmp_table = np.append(_char_table(np.arange(0x10000)), np.uint8(0))
+
+    astral = (codepoints > 0xFFFF) & valid
+    classes = _bmp_table[np.where(valid & ~astral, codepoints, 0x10000)]
+    if astral.any():
+        unique_cps, inverse = np.unique(codepoints[astral], return_inverse=True)
+        classes[astral] = _char_table(unique_cps)[inverse]
+    mask = np.bitwise_or.reduce(classes, axis=1)
+    return {name: (mask >> position & 1).astype(bool) for position, name in enumerate(CHAR_CLASSES)}
+
+
+def _round2(values):
+    """round(x, 2) de Python vectorizado (los casos límite se resuelven con round)"""
+    scaled = values * 100
+    result = np.rint(scaled) / 100
+    fraction = np.abs(scaled - np.trunc(scaled))
+    borderline = np.flatnonzero(np.abs(fraction - 0.5) < 1e-6)
+    for i in borderline.tolist():
+        result[i] = round(float(values[i]), 2)
+    return result
+
+
+def _entropy_terms(max_length):
+    """Tabla exacta de p*log2(p) para p = c/L, calculada con math igual que calculate_entropy"""
+    terms = np.zeros((max_length + 1, max_length + 1))
+    for length in range(1, max_length + 1):
+        for count in range(1, length + 1):
+            probability = count / length
+            terms[count, length] = probability * math.log2(probability)
+    return terms
+
+
+def _score_block(passwords, lengths, terms):
+    """Calcula todas las métricas de un bloque de contraseñas de longitud similar"""
+    n = len(passwords)
+    width = max(1, int(lengths.max()) if n else 1)
+    codepoints = np.array(passwords, dtype=f"<U{width}").view(np.uint32).reshape(n, width)
+    valid = np.arange(width)[None, :] < lengths[:, None]
+
+    # Clases de caracteres con una tabla precalculada por código Unicode
+    flags = _classify(codepoints, valid)
+
+    # Frecuencias y primeras apariciones (orden de inserción de Counter). El
+    # relleno se sustituye por valores fuera de Unicode distintos por columna
+    # para que no coincida con ningún carácter ni con otro relleno.
+    padded = np.where(valid, codepoints, 0x110000 + np.arange(width, dtype=np.uint32)[None, :])
+    same = padded[:, :, None] == padded[:, None, :]
+    counts = np.count_nonzero(same, axis=2)
+    first = valid & (same.argmax(axis=2) == np.arange(width)[None, :])
+    unique_count = first.sum(axis=1)
+
+    # Entropía de Shannon con el mismo orden de operaciones que calculate_entropy
+    term = np.where(first, terms[counts, lengths[:, None]], 0.0)
+    entropy = np.zeros(n)
+    for j in range(width):
+        entropy -= term[:, j]
+    entropy = entropy * lengths
+    entropy = _round2(entropy)
+    entropy[lengths == 0] = 0
+
+    # Puntuación (strength_score sin los ajustes por listas/patrones)
+    score = np.select([lengths >= 16, lengths >= 12, lengths >= 8], [3, 2, 1], 0)
+    score = score + flags["ascii_upper"] + flags["ascii_lower"] + flags["decimal"] + flags["score_symbol"]
+    float_lengths = lengths.astype(np.float64)
+    score = score + np.select([unique_count >= float_lengths * 0.8, unique_count >= float_lengths * 0.6], [2, 1], 0)
+    score = np.minimum(score + (lengths >= 20), 10)
+
+    # Tamaño del charset (mismas reglas que estimate_crack_time)
+    lower, upper, digit, symbol = flags["lower"], flags["upper"], flags["digit"], flags["symbol"]
+    charset_size = np.select(
+        [symbol, digit & upper & lower, digit & (upper | lower), digit,
+         upper & lower, upper | lower],
+        [94, 62, 36, 10, 52, 26], 10)
+
+    return {
+        "length": lengths,
+        "has_lower": lower,
+        "has_upper": upper,
+        "has_digit": digit,
+        "has_symbol": symbol,
+        "unique_count": unique_count,
+        "entropy": entropy,
+        "score": score,
+        "charset_size": charset_size,
+    }
+
+
+def _guess_score_cap(log2_guesses):
+    """guess_score_cap vectorizado (misma conversión a log10 y mismos cortes)"""
+    limits = np.array([limit for limit, _ in GUESS_SCORE_CAPS], dtype=np.float64)
+    caps = np.array([cap for _, cap in GUESS_SCORE_CAPS] + [10])
+    return caps[np.searchsorted(limits, log2_guesses * math.log10(2), side="right")]
+
+
+def score_batch(passwords, log2_guesses, attempts_per_second=1e10):
+    """
+    Calcula métricas de muchas contraseñas con operaciones vectorizadas
+
+    Es una API de biblioteca para corpus grandes (el pipeline de auditoría
+    usa analyze_password, que además busca en listas, HIBP y patrones). Las
+    contraseñas se ordenan por longitud y se procesan en bloques como una
+    matriz de códigos Unicode con relleno más un vector de longitudes, de modo
+    que el relleno se mantiene pequeño. Los resultados coinciden exactamente
+    con strength_score (con el tope por intentos estimados, sin los ajustes
+    de analyze_password por listas y patrones), calculate_entropy, las
+    banderas de get_charset_info y el log2 de estimate_crack_time;
+    crack_seconds se calcula con np.exp2 y puede diferir de 2 ** x en el
+    último bit.
+
+    Args:
+        passwords: Contraseñas a evaluar
+        log2_guesses: Intentos (log2) de cada contraseña, en el mismo orden:
+            GuessEstimate.log2_guesses de modules.guess_estimator. El
+            estimador recorre cada contraseña en Python, así que no se
+            ejecuta aquí; quien ya lo tiene (p. ej. de un análisis previo)
+            no lo repite.
+        attempts_per_second: Velocidad del atacante para crack_seconds
+
+    Returns:
+        dict: Arrays de numpy en el orden de entrada: length, has_lower,
+        has_upper, has_digit, has_symbol, unique_count, entropy, score,
+        charset_size, log2_guesses, crack_seconds y log2_crack_seconds
+    """
+    _require_numpy()
+    passwords = list(passwords)
+    log2_guesses = np.asarray(log2_guesses, dtype=np.float64)
+    if len(log2_guesses) != len(passwords):
+        raise ValueError("log2_guesses debe tener un valor por contraseña")
+    lengths = np.fromiter(map(len, passwords), dtype=np.int64, count=len(passwords))
+    order = np.argsort(lengths, kind="stable")
+    max_length = int(lengths.max()) if len(passwords) else 0
+    terms = _entropy_terms(max_length)
+
+    columns = {}
+    start = 0
+    while start < len(passwords):
+        # Bloque lo más grande posible sin que el cubo de comparaciones supere BLOCK_BUDGET
+        width = max(1, int(lengths[order[start]]))
+        end = min(len(passwords), start + max(1, BLOCK_BUDGET // (width * width)))
+        while end - start > 1:
+            width = max(1, int(lengths[order[end - 1]]))
+            limit = start + max(1, BLOCK_BUDGET // (width * width))
+            if end <= limit:
+                break
+            end = limit
+
+        index = order[start:end]
+        block = _score_block([passwords[i] for i in index.tolist()], lengths[index], terms)
+        for name, values in block.items():
+            if name not in columns:
+                columns[name] = np.empty(len(passwords), dtype=values.dtype)
+            columns[name][index] = values
+        start = end
+
+    if not passwords:
+        return {}
+
+    # Mismo tope que strength_score y mismo tiempo que estimate_crack_time
+    columns["score"] = np.minimum(columns["score"], _guess_score_cap(log2_guesses))
+    columns["log2_guesses"] = log2_guesses
+    log2_seconds = log2_guesses - math.log2(attempts_per_second)
+    columns["log2_crack_seconds"] = log2_seconds
+    # Como seconds_from_log2: inf si no cabe en un float
+    with np.errstate(over="ignore"):
+        columns["crack_seconds"] = np.exp2(log2_seconds)
+    return columns
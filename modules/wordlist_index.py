@@ -0,0 +1,341 @@
+import argparse
+import hashlib
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+from operator import itemgetter
+
+from modules.mangling import MIN_MANGLED_LENGTH, canonical_form, describe_mangling, mangled_candidates
+from modules.near_miss import DeletionIndex, build_deletion_index, deletion_index_path_for
+
+# Formato del índice compilado:
+#   cabecera (64 bytes) | registros ordenados (16 bytes c/u) | blob de valores
+# Cada registro es (clave de 64 bits, offset del valor en el blob). La clave es
+# un hash BLAKE2b truncado, por lo que la búsqueda binaria es O(log n) sobre un
+# archivo mapeado en memoria sin cargar la lista en el heap de Python.
+MAGIC = b"PWIDX001"
+HEADER = struct.Struct(">8sQQ40s")
+RECORD = struct.Struct(">QQ")
+# La compilación reparte las entradas en 256 particiones por el byte alto de
+# la clave y ordena una por vez (como el índice de borrados), así que ni los
+# registros ni los valores se juntan en memoria. En las particiones cada
+# entrada es (clave, longitud del valor) seguida del valor.
+PARTITION_BITS = 8
+PARTITION_ENTRY = struct.Struct(">QI")
+
+
+def hash_key(text):
+    """Calcula la clave de 64 bits de un texto"""
+    digest = hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big')
+
+
+def normalize_word(word):
+    """Normaliza una entrada de la wordlist (misma regla que is_common_password)"""
+    return word.strip().lower()
+
+
+def index_path_for(wordlist_path):
+    """Retorna la ruta del índice compilado asociado a una wordlist"""
+    base, _ = os.path.splitext(wordlist_path)
+    return base + ".idx"
+
+
+def canonical_index_path_for(index_path):
+    """Retorna la ruta del índice canónico (variantes leet/mayúsculas) de un índice"""
+    base, _ = os.path.splitext(index_path)
+    return base + ".cidx"
+
+
+def build_index(entries, output_path, tag=""):
+    """
+    Compila pares (clave, valor) en un índice binario ordenado
+
+    Los pares repetidos se guardan una sola vez. Cada registro tiene su
+    propia copia del valor en el blob, en el orden de los registros.
+
+    Args:
+        entries: Iterable de tuplas (texto_clave, texto_valor)
+        output_path: Ruta del archivo .idx a generar
+        tag: Etiqueta con la que se reportan las coincidencias
+
+    Returns:
+        int: Número de registros escritos
+    """
+    shift = 64 - PARTITION_BITS
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(output_path))) as workdir:
+        partitions = [open(os.path.join(workdir, f"{i}.part"), 'w+b') for i in range(1 << PARTITION_BITS)]
+        blob_path = os.path.join(workdir, "blob")
+        count = 0
+        try:
+            for key_text, value in entries:
+                key = hash_key(key_text)
+                data = value.encode('utf-8', 'surrogatepass')
+                partitions[key >> shift].write(PARTITION_ENTRY.pack(key, len(data)) + data)
+
+            tmp_path = output_path + ".tmp"
+            with open(tmp_path, 'wb') as f, open(blob_path, 'w+b') as blob:
+                f.write(HEADER.pack(MAGIC, 0, 0, b""))
+                for partition in partitions:
+                    for key, data in _read_partition(partition):
+                        f.write(RECORD.pack(key, blob.tell()))
+                        blob.write(data + b"\n")
+                        count += 1
+                blob.seek(0)
+                shutil.copyfileobj(blob, f)
+                f.seek(0)
+                f.write(HEADER.pack(MAGIC, count, HEADER.size + RECORD.size * count, tag.encode('utf-8')[:40]))
+            os.replace(tmp_path, output_path)
+        finally:
+            for partition in partitions:
+                partition.close()
+
+    return count
+
+
+def _read_partition(partition):
+    """
+    Lee una partición temporal de build_index
+
+    Returns:
+        list: Pares (clave, valor en bytes) distintos, ordenados por clave y,
+        dentro de una clave, en el orden en que aparecieron
+    """
+    partition.seek(0)
+    data = partition.read()
+    entries = []
+    position = 0
+    while position < len(data):
+        key, size = PARTITION_ENTRY.unpack_from(data, position)
+        position += PARTITION_ENTRY.size
+        entries.append((key, data[position:position + size]))
+        position += size
+    return sorted(dict.fromkeys(entries), key=itemgetter(0))
+
+
+def iter_wordlist(path):
+    """Itera las palabras normalizadas de un archivo de texto"""
+    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+        for line in f:
+            word = normalize_word(line)
+            if word:
+                yield word
+
+
+def build_canonical_index(words, output_path, tag=""):
+    """
+    Compila el índice canónico de una wordlist: forma canónica -> palabra
+
+    Las palabras con la misma forma canónica ("hello", "he11o") quedan bajo
+    la misma clave y lookup las retorna todas.
+    """
+    entries = ((canonical_form(word), word) for word in words if len(word) >= MIN_MANGLED_LENGTH)
+    return build_index(entries, output_path, tag)
+
+
+def build_wordlist_index(wordlist_path, output_path=None, tag=None, near_miss=True):
+    """
+    Compila una wordlist de texto plano en un índice .idx, su índice canónico
+    .cidx y (con `near_miss`) su índice de borrados .didx
+    """
+    output_path = output_path or index_path_for(wordlist_path)
+    if tag is None:
+        tag = os.path.splitext(os.path.basename(wordlist_path))[0]
+    entries = ((word, word) for word in iter_wordlist(wordlist_path))
+    build_index(entries, output_path, tag)
+    build_canonical_index(iter_wordlist(wordlist_path), canonical_index_path_for(output_path), tag)
+    if near_miss:
+        build_deletion_index(iter_wordlist(wordlist_path), deletion_index_path_for(output_path))
+    return output_path
+
+
+def ensure_wordlist_index(wordlist_path):
+    """Compila los índices de una wordlist solo si no existen o están desactualizados"""
+    output_path = index_path_for(wordlist_path)
+    modified = os.path.getmtime(wordlist_path)
+    if any(not os.path.exists(path) or os.path.getmtime(path) < modified
+           for path in (output_path, canonical_index_path_for(output_path), deletion_index_path_for(output_path))):
+        build_wordlist_index(wordlist_path, output_path)
+    return output_path
+
+
+class WordlistIndex:
+    """Índice compilado y mapeado en memoria con búsqueda binaria"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, count, blob_offset, tag = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self._mm.close()
+            raise ValueError(f"'{path}' no es un índice de wordlist válido")
+
+        self.count = count
+        self.tag = tag.rstrip(b"\0").decode('utf-8')
+        self._blob_offset = blob_offset
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, word):
+        # La clave es un hash de 64 bits: una coincidencia se confirma con el valor guardado
+        word = normalize_word(word)
+        return word in self.lookup(word)
+
+    def _key_at(self, i):
+        return RECORD.unpack_from(self._mm, HEADER.size + i * RECORD.size)[0]
+
+    def _find(self, key):
+        """Retorna la posición del primer registro con la clave, o None"""
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key_at(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.count and self._key_at(lo) == key:
+            return lo
+        return None
+
+    def _value_at(self, i):
+        offset = self._blob_offset + RECORD.unpack_from(self._mm, HEADER.size + i * RECORD.size)[1]
+        end = self._mm.find(b"\n", offset)
+        return self._mm[offset:end].decode('utf-8', 'surrogatepass')
+
+    def lookup(self, key_text):
+        """Retorna todos los valores asociados a una clave"""
+        key = hash_key(key_text)
+        i = self._find(key)
+        values = []
+        while i is not None and i < self.count and self._key_at(i) == key:
+            values.append(self._value_at(i))
+            i += 1
+        return values
+
+    def values(self):
+        """Itera los valores del índice (en el orden de los registros)"""
+        offset = self._blob_offset
+        size = len(self._mm)
+        while offset < size:
+            end = self._mm.find(b"\n", offset)
+            yield self._mm[offset:end].decode('utf-8', 'surrogatepass')
+            offset = end + 1
+
+    def close(self):
+        self._mm.close()
+
+
+class WordlistSet:
+    """
+    Conjunto de índices consultados juntos, cada uno con su etiqueta
+
+    `canonical` y `deletion` son los índices canónicos y de borrados de cada
+    lista (o None si una lista no tiene), usados por mangled_match y
+    near_miss.
+    """
+
+    def __init__(self, indexes=None, canonical=None, deletion=None):
+        self.indexes = list(indexes or [])
+        self.canonical = list(canonical or [None] * len(self.indexes))
+        self.deletion = list(deletion or [None] * len(self.indexes))
+
+    def __len__(self):
+        return sum(len(index) for index in self.indexes)
+
+    def __contains__(self, word):
+        return any(word in index for index in self.indexes)
+
+    def matching_tags(self, word):
+        """Retorna las etiquetas de las listas que contienen la palabra"""
+        return [index.tag for index in self.indexes if word in index]
+
+    def mangled_match(self, password):
+        """
+        Busca la contraseña como variante de una palabra de las listas
+
+        Returns:
+            dict: palabra, lista y transformaciones de la primera variante
+            encontrada (ver modules.mangling), o None
+        """
+        canonical = [index for index in self.canonical if index is not None]
+        if not canonical:
+            return None
+        for text, prefix, suffix, reversed_text in mangled_candidates(password):
+            key = canonical_form(text)
+            for index in canonical:
+                for word in index.lookup(key):
+                    transformations = describe_mangling(text, word, prefix, suffix, reversed_text)
+                    if transformations is not None:
+                        return {"palabra": word, "lista": index.tag, "transformaciones": transformations}
+        return None
+
+    def near_miss(self, password):
+        """
+        Busca la palabra de las listas más cercana a la contraseña (distancia de edición 1-2)
+
+        Returns:
+            dict: palabra, lista y distancia, o None
+        """
+        best = None
+        for index in self.deletion:
+            if index is None:
+                continue
+            found = index.nearest(password)
+            if found and (best is None or found[1] < best["distancia"]):
+                best = {"palabra": found[0], "lista": index.tag, "distancia": found[1]}
+        return best
+
+    def close(self):
+        for index in self.indexes + self.canonical + self.deletion:
+            if index is not None:
+                index.close()
+
+
+def open_wordlists(paths):
+    """
+    Abre varias wordlists como un WordlistSet
+
+    Acepta archivos .idx ya compilados o archivos de texto, que se compilan
+    la primera vez (y cuando cambian) junto al archivo original. Los índices
+    canónico (.cidx) y de borrados (.didx) se abren si están junto al .idx.
+    """
+    indexes = []
+    canonical = []
+    deletion = []
+    for path in paths:
+        if not path.endswith(".idx"):
+            path = ensure_wordlist_index(path)
+        index = WordlistIndex(path)
+        indexes.append(index)
+        canonical_path = canonical_index_path_for(path)
+        canonical.append(WordlistIndex(canonical_path) if os.path.exists(canonical_path) else None)
+        deletion_path = deletion_index_path_for(path)
+        deletion.append(DeletionIndex(deletion_path, index.tag) if os.path.exists(deletion_path) else None)
+    return WordlistSet(indexes, canonical, deletion)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compila una wordlist en un índice binario")
+    parser.add_argument("wordlist", help="Archivo de texto con una contraseña por línea")
+    parser.add_argument("-o", "--output", help="Ruta del índice (por defecto <wordlist>.idx)")
+    parser.add_argument("-t", "--tag", help="Etiqueta de la lista (por defecto el nombre del archivo)")
+    parser.add_argument("--no-near-miss", action="store_true",
+                        help="No compilar el índice de borrados (ocupa unos 40 registros por palabra)")
+    args = parser.parse_args(argv)
+
+    output_path = build_wordlist_index(args.wordlist, args.output, args.tag, near_miss=not args.no_near_miss)
+    index = WordlistIndex(output_path)
+    print(f"[OK] Índice '{index.tag}' con {len(index):,} entradas guardado en: {output_path} "
+          f"(variantes en {canonical_index_path_for(output_path)})")
+    if not args.no_near_miss:
+        print(f"[OK] Índice de borrados guardado en: {deletion_index_path_for(output_path)}")
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
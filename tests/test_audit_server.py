@@ -0,0 +1,85 @@
+import asyncio
+import json
+
+from modules import audit_server, guess_estimator, password_model, pattern_detector
+
+
+async def _request(host, port, raw):
+    """Envía un request HTTP crudo y retorna (código, cuerpo decodificado)"""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.write(raw)
+        await writer.drain()
+        status = int((await reader.readline()).split()[1])
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        body = await reader.readexactly(int(headers["content-length"]))
+        return status, json.loads(body)
+    finally:
+        writer.close()
+
+
+def _post(path, body):
+    data = body if isinstance(body, bytes) else json.dumps(body).encode("utf-8")
+    return (f"POST {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(data)}\r\n"
+            f"Connection: close\r\n\r\n").encode("latin-1") + data
+
+
+async def _exercise(loaded):
+    loop = asyncio.get_running_loop()
+    ready = loop.create_future()
+    task = asyncio.create_task(audit_server._serve([], "127.0.0.1", 0, None, ready.set_result,
+                                                   check_pwned=False))
+    try:
+        address = await asyncio.wait_for(ready, 60)
+        # Todo lo pesado ya está cargado cuando el servidor empieza a escuchar
+        loaded.update(estimator=guess_estimator._estimator is not None,
+                      matcher=pattern_detector._matcher is not None,
+                      model=password_model._model_loaded)
+        host, port = address[len("http://"):].rsplit(":", 1)
+        port = int(port)
+        return {
+            "check": await _request(host, port, _post("/check", {"password": "P@ssw0rd2024"})),
+            "batch": await _request(host, port, _post("/batch", {"passwords": ["123456", "hunter2"]})),
+            "bad_json": await _request(host, port, _post("/check", b"{no es json")),
+            "missing": await _request(host, port, _post("/check", {"clave": "x"})),
+            "bad_line": await _request(host, port, b"GARBAGE\r\n\r\n"),
+            "unknown": await _request(host, port, b"GET /nada HTTP/1.1\r\nConnection: close\r\n\r\n"),
+        }
+    finally:
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+
+def test_server_round_trip(monkeypatch):
+    monkeypatch.setattr(guess_estimator, "_estimator", None)
+    monkeypatch.setattr(pattern_detector, "_matcher", None)
+    monkeypatch.setattr(password_model, "_model_loaded", False)
+    loaded = {}
+    responses = asyncio.run(_exercise(loaded))
+
+    assert loaded == {"estimator": True, "matcher": True, "model": True}
+
+    status, result = responses["check"]
+    assert status == 200
+    assert result["password"] == "P@ssw0rd2024"
+    for field in ("score", "nivel", "log2_intentos", "comun", "pwned", "patrones", "recomendaciones"):
+        assert field in result
+    assert result["pwned_message"] == "Verificación omitida"
+
+    status, body = responses["batch"]
+    assert status == 200
+    assert [result["password"] for result in body["results"]] == ["123456", "hunter2"]
+
+    for name, expected in (("bad_json", 400), ("missing", 400), ("bad_line", 400), ("unknown", 404)):
+        status, body = responses[name]
+        assert status == expected, name
+        assert "error" in body
@@ -0,0 +1,97 @@
+import json
+import sqlite3
+
+from modules.audit_store import AuditStore, analysis_fingerprint
+from modules.result_cache import password_key
+
+
+def _result(password, comun=False):
+    return {"password": password, "score": 1, "comun": comun}
+
+
+def _audit(path, passwords, settings, results=None, **kwargs):
+    """Corre una auditoría sobre el almacén; retorna (reutilizados, filas generadas)"""
+    with AuditStore(str(path), **kwargs) as store:
+        store.begin(None, settings)
+        keys = [password_key(password) for password in passwords]
+        reused = store.get_many(list(dict.fromkeys(keys)))
+        new = {key: (results or {}).get(password, _result(password))
+               for key, password in zip(keys, passwords) if key not in reused}
+        store.record(keys, new)
+        store.finish()
+        return reused, list(store.iter_results())
+
+
+def test_results_are_reused_only_with_same_settings(tmp_path):
+    path = tmp_path / "store.db"
+    _audit(path, ["hunter2"], "a")
+    reused, _ = _audit(path, ["hunter2"], "a")
+    assert len(reused) == 1
+    reused, rows = _audit(path, ["hunter2"], "b", results={"hunter2": _result("hunter2", comun=True)})
+    assert reused == {}
+    assert rows[0]["comun"] is True
+
+
+def test_fingerprint_changes_with_wordlist_and_options(tmp_path):
+    wordlist = tmp_path / "wl.txt"
+    wordlist.write_text("hunter2\n", encoding="utf-8")
+    base = analysis_fingerprint([])
+    assert analysis_fingerprint([str(wordlist)]) != base
+    assert analysis_fingerprint([], check_pwned=False) != base
+    assert analysis_fingerprint([], compute_entropy=False) != base
+    assert analysis_fingerprint([], hibp_source=("offline", str(wordlist))) != base
+    assert analysis_fingerprint([]) == base
+
+
+def test_passwords_are_not_stored_by_default(tmp_path):
+    path = tmp_path / "store.db"
+    _, rows = _audit(path, ["hunter2", "hunter2", "abc"], "a")
+    assert rows[0]["password"] == "blake2b:" + password_key("hunter2").hex()
+    assert rows[0]["longitud"] == 7
+    assert rows[0]["ocurrencias"] == 2
+    stored = sqlite3.connect(str(path)).execute("SELECT result FROM results").fetchall()
+    assert all("hunter2" not in result for (result,) in stored)
+
+    _, rows = _audit(tmp_path / "plain.db", ["hunter2"], "a", keep_passwords=True)
+    assert rows[0]["password"] == "hunter2"
+
+
+def test_expired_results_are_analyzed_again(tmp_path):
+    path = tmp_path / "store.db"
+    _audit(path, ["hunter2"], "a")
+    with AuditStore(str(path)) as store:
+        store.begin(None, "a", max_age=-1)
+        assert store.get_many([password_key("hunter2")]) == {}
+
+
+def test_old_schema_is_migrated(tmp_path):
+    path = tmp_path / "store.db"
+    conn = sqlite3.connect(str(path))
+    conn.executescript(
+        "CREATE TABLE results (key BLOB PRIMARY KEY, result TEXT NOT NULL);"
+        "CREATE TABLE audits (id INTEGER PRIMARY KEY, fingerprint TEXT, started TEXT NOT NULL,"
+        " rows_done INTEGER NOT NULL DEFAULT 0, finished INTEGER NOT NULL DEFAULT 0);")
+    conn.execute("INSERT INTO results VALUES (?, ?)",
+                 (password_key("hunter2"), json.dumps(_result("hunter2"))))
+    conn.commit()
+    conn.close()
+    reused, rows = _audit(path, ["hunter2"], "a")
+    assert reused == {}
+    assert rows[0]["ocurrencias"] == 1
+
+
+def test_rerun_prints_stored_rows(tmp_path, capsys):
+    from auditor import run_cli
+
+    passwords = tmp_path / "in.txt"
+    passwords.write_text("hunter2\nabc123\nhunter2\n", encoding="utf-8")
+    argv = ["audit", str(passwords), "--no-hibp", "--no-hibp-cache", "--store", str(tmp_path / "s.db"),
+            "--workers", "1", "--fail-on", "Muy Débil"]
+    outputs = []
+    for _ in range(2):
+        run_cli(argv)
+        outputs.append(capsys.readouterr().out.splitlines())
+    # La segunda vez todo sale de la base: sin contraseñas en texto plano
+    assert [line.split("\t")[:2] for line in outputs[0]] == [line.split("\t")[:2] for line in outputs[1]]
+    assert [line.split("\t")[2] for line in outputs[1]] == [
+        "blake2b:" + password_key(password).hex() for password in ("hunter2", "abc123", "hunter2")]
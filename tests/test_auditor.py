@@ -0,0 +1,9 @@
+from modules.benchmark import STARTUP_FORBIDDEN, startup_imports
+
+
+def test_import_loads_only_the_standard_library():
+    # Cada acción importa sus módulos; al importar auditor.py no se carga ninguno
+    loaded = startup_imports()
+    assert "auditor" in loaded
+    assert "modules" not in loaded
+    assert not loaded & set(STARTUP_FORBIDDEN)
@@ -0,0 +1,40 @@
+import multiprocessing
+
+import pytest
+
+from modules import batch_engine, password_model
+from modules.batch_engine import BatchEngine
+from modules.password_model import PasswordModel, train_model
+
+CORPUS = ["password", "password1", "monkey", "dragon", "qwerty", "letmein", "iloveyou",
+          "sunshine", "princess", "football", "shadow123", "master", "hello123"] * 20
+PASSWORDS = ["password1", "dragon12", "xK9#mQ2$vL7!", "sunshine", "monkey99", "qwerty"]
+
+
+@pytest.fixture
+def model_path(tmp_path):
+    corpus = tmp_path / "corpus.txt"
+    corpus.write_text("\n".join(CORPUS) + "\n", encoding="utf-8")
+    path = str(tmp_path / "model.bin")
+    train_model([str(corpus)], path, samples=2000, seed=1)
+    return path
+
+
+@pytest.mark.parametrize("method", ["spawn", "forkserver"])
+def test_workers_use_model(model_path, method, monkeypatch):
+    if method not in multiprocessing.get_all_start_methods():
+        pytest.skip(f"{method} no disponible")
+    # El proceso principal no tiene modelo: solo lo pueden abrir los workers
+    monkeypatch.setattr(password_model, "_model", None)
+    monkeypatch.setattr(password_model, "_model_loaded", True)
+    monkeypatch.setattr(batch_engine.multiprocessing, "Pool", multiprocessing.get_context(method).Pool)
+
+    engine = BatchEngine([], workers=2, chunk_size=2, check_pwned=False, model_path=model_path)
+    results = list(engine.run(PASSWORDS))
+
+    model = PasswordModel(model_path)
+    try:
+        expected = [round(model.log2_rank(password), 2) for password in PASSWORDS]
+    finally:
+        model.close()
+    assert [result["log2_rango_modelo"] for result in results] == expected
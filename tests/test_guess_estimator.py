@@ -0,0 +1,59 @@
+import math
+
+import pytest
+
+from modules.guess_estimator import GuessEstimator, leet_variations
+from modules.mangling import leet_substitutions
+
+WORDS = ["password", "dragon", "monkey", "secret", "lime", "iime"]
+
+
+@pytest.fixture(scope="module")
+def estimator():
+    return GuessEstimator([("palabras", WORDS, True)])
+
+
+@pytest.mark.parametrize("password, word", [
+    ("p@ssw0rd", "password"),
+    ("P@ssw0rd", "password"),
+    ("dr4g0n", "dragon"),
+    ("m0nk3y", "monkey"),
+    ("$3cr3t", "secret"),
+    ("1ime", "lime"),
+])
+def test_leet_dictionary_words(estimator, password, word):
+    estimate = estimator.estimate(password)
+    assert len(estimate.sequence) == 1
+    assert estimate.labels[0].startswith(f"Diccionario palabras ({word}, leet ")
+    # Unas pocas variantes del ranking, lejos de la fuerza bruta
+    assert estimate.log2_guesses < 10
+
+
+def test_leet_guesses_follow_rank_and_variations(estimator):
+    # password es la primera palabra: 2 sustituciones sin la letra original -> 4
+    assert estimator.estimate("p@ssw0rd").log2_guesses == pytest.approx(2.0)
+    # Con la mayúscula inicial se duplica
+    assert estimator.estimate("P@ssw0rd").log2_guesses == pytest.approx(3.0)
+    # Invertida se duplica
+    labels = estimator.estimate("dr0wss@p").labels
+    assert labels == ["Diccionario palabras (password, leet 0→o, @→a, invertida)"]
+
+
+def test_leet_inside_longer_password(estimator):
+    estimate = estimator.estimate("xq!dr4g0n2019")
+    assert any(label.startswith("Diccionario palabras (dragon, leet") for label in estimate.labels)
+
+
+def test_letters_are_not_substitutions(estimator):
+    # "l" por "i" no es leet: solo dígitos y símbolos reemplazan letras
+    assert not any("leet" in label for label in estimator.estimate("lime").labels)
+    assert not any("leet" in label for label in estimator.estimate("passwbesd").labels)
+
+
+def test_leet_variations():
+    assert leet_variations("p@ssw0rd", {"@": "a", "0": "o"}) == 4
+    # Una 'a' sustituida y dos sin sustituir: C(3, 1) formas
+    assert leet_variations("b@nana", {"@": "a"}) == math.comb(3, 1)
+    assert leet_substitutions("p@ssw0rd", "password") == {"@": "a", "0": "o"}
+    assert leet_substitutions("pa55word", "password") == {"5": "s"}
+    assert leet_substitutions("pessword", "password") is None
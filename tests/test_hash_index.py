@@ -0,0 +1,134 @@
+import hashlib
+import os
+
+import pytest
+
+from modules.hash_index import (HEADER, HashIndex, _md4, build_hash_index, ensure_hash_index,
+                                hash_index_path_for, hash_password, open_hash_index, parse_hash_line,
+                                resolve_hashes)
+
+WORDS = ["password", "123456", "Summer2024!", "contraseña", "hunter2", "password"]
+
+
+@pytest.fixture
+def wordlist(tmp_path):
+    path = tmp_path / "wl.txt"
+    path.write_text("\n".join(WORDS) + "\n", encoding="utf-8")
+    return str(path)
+
+
+@pytest.mark.parametrize("data, expected", [
+    # RFC 1320, apéndice A.5
+    (b"", "31d6cfe0d16ae931b73c59d7e0c089c0"),
+    (b"a", "bde52cb31de33e46245e05fbdbd6fb24"),
+    (b"abc", "a448017aaf21d8525fc10ae87aa6729d"),
+    (b"message digest", "d9130a8164549fe818874806e1c7014b"),
+    (b"12345678901234567890123456789012345678901234567890123456789012345678901234567890",
+     "e33b4ddc9c38f2199c3e7b164fcc0536"),
+])
+def test_pure_python_md4(data, expected):
+    assert _md4(data).hex() == expected
+
+
+def test_ntlm_vectors():
+    assert hash_password("password", "ntlm").hex() == "8846f7eaee8fb117ad06bdd830b7586c"
+    assert hash_password("", "ntlm").hex() == "31d6cfe0d16ae931b73c59d7e0c089c0"
+    assert _md4("password".encode("utf-16-le")).hex() == "8846f7eaee8fb117ad06bdd830b7586c"
+
+
+@pytest.mark.parametrize("algorithm", ["ntlm", "sha1", "md5"])
+def test_build_and_lookup(wordlist, algorithm):
+    path = hash_index_path_for(wordlist, algorithm)
+    # Las repetidas se guardan una sola vez
+    assert build_hash_index(wordlist, algorithm) == len(set(WORDS))
+    index = HashIndex(path)
+    try:
+        assert index.algorithm == algorithm
+        for word in set(WORDS):
+            assert index.lookup(hash_password(word, algorithm)) == word
+        assert index.lookup(hash_password("no-está", algorithm)) is None
+        digests = [hash_password(word, algorithm) for word in ("hunter2", "contraseña", "otra")]
+        assert index.resolve(digests) == {digests[0]: "hunter2", digests[1]: "contraseña"}
+    finally:
+        index.close()
+
+
+def test_partitioned_build_is_sorted_and_deduplicated(tmp_path):
+    words = [f"pw{i % 3000}" for i in range(5000)]
+    path = tmp_path / "big.txt"
+    path.write_text("\n".join(words) + "\n", encoding="utf-8")
+    assert build_hash_index(str(path), "sha1") == 3000
+    index = HashIndex(hash_index_path_for(str(path), "sha1"))
+    try:
+        digests = [index._digest_at(i) for i in range(len(index))]
+        assert digests == sorted(set(digests))
+        assert index.resolve(hash_password(word, "sha1") for word in words) == {
+            hash_password(word, "sha1"): word for word in set(words)}
+    finally:
+        index.close()
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["big.sha1.hidx", "big.txt"]
+
+
+def test_resolve_dump(wordlist):
+    lines = [
+        "admin:500:aad3b435b51404eeaad3b435b51404ee:8846f7eaee8fb117ad06bdd830b7586c:::",
+        "web:" + hashlib.sha1(b"hunter2").hexdigest(),
+        hashlib.md5(b"123456").hexdigest().upper(),
+        "otro:" + hashlib.sha1(b"desconocida").hexdigest(),
+    ]
+    entries = [parse_hash_line(line) for line in lines]
+    assert entries[0] == ("admin", "8846f7eaee8fb117ad06bdd830b7586c", ("ntlm",))
+    assert entries[2][2] == ("ntlm", "md5")
+    resolved = resolve_hashes(entries, [wordlist])
+    assert resolved == {
+        ("ntlm", "8846f7eaee8fb117ad06bdd830b7586c"): "password",
+        ("sha1", hashlib.sha1(b"hunter2").hexdigest()): "hunter2",
+        ("md5", hashlib.md5(b"123456").hexdigest()): "123456",
+    }
+    assert parse_hash_line("no es un hash") is None
+    assert parse_hash_line("usuario:abc123") is None
+
+
+def test_stale_index_is_rebuilt(wordlist):
+    path = ensure_hash_index(wordlist, "sha1")
+    with open(wordlist, "a", encoding="utf-8") as f:
+        f.write("nueva\n")
+    # El índice queda más viejo que la wordlist
+    old = os.path.getmtime(wordlist) - 10
+    os.utime(path, (old, old))
+    assert ensure_hash_index(wordlist, "sha1") == path
+    index = HashIndex(path)
+    try:
+        assert index.lookup(hash_password("nueva", "sha1")) == "nueva"
+    finally:
+        index.close()
+
+
+@pytest.mark.parametrize("content", [
+    b"",
+    b"PWHASH",
+    b"NOTHASH0" + b"\0" * (HEADER.size - 8),
+    HEADER.pack(b"PWHASH01", b"md6", 0, HEADER.size),
+    HEADER.pack(b"PWHASH01", b"sha1", 10, HEADER.size + 28 * 10),
+])
+def test_invalid_index(tmp_path, wordlist, content):
+    path = tmp_path / "wl.sha1.hidx"
+    path.write_bytes(content)
+    with pytest.raises(ValueError):
+        HashIndex(str(path))
+    # Al resolver un volcado, un índice dañado se vuelve a compilar
+    os.utime(path, (os.path.getmtime(wordlist) + 10,) * 2)
+    index = open_hash_index(wordlist, "sha1")
+    try:
+        assert index.lookup(hash_password("hunter2", "sha1")) == "hunter2"
+    finally:
+        index.close()
+
+
+def test_wrong_algorithm_is_rebuilt(wordlist):
+    build_hash_index(wordlist, "md5", hash_index_path_for(wordlist, "sha1"))
+    index = open_hash_index(wordlist, "sha1")
+    try:
+        assert index.algorithm == "sha1"
+    finally:
+        index.close()
@@ -0,0 +1,97 @@
+import random
+import string
+
+import pytest
+
+from modules.near_miss import DeletionIndex, allowed_distance, build_deletion_index, within_distance
+
+
+def osa_distance(a, b):
+    """Distancia de alineamiento óptimo por programación dinámica completa (referencia)"""
+    d = [[0] * (len(b) + 1) for _ in range(len(a) + 1)]
+    for i in range(len(a) + 1):
+        d[i][0] = i
+    for j in range(len(b) + 1):
+        d[0][j] = j
+    for i in range(1, len(a) + 1):
+        for j in range(1, len(b) + 1):
+            d[i][j] = min(d[i - 1][j] + 1, d[i][j - 1] + 1, d[i - 1][j - 1] + (a[i - 1] != b[j - 1]))
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                d[i][j] = min(d[i][j], d[i - 2][j - 2] + 1)
+    return d[-1][-1]
+
+
+def brute_force_nearest(text, words):
+    """Distancia mínima (1 o 2, según las longitudes) a alguna palabra indexable, o None"""
+    best = None
+    for word in words:
+        if not 4 <= len(word) <= 16 or word == text:
+            continue
+        distance = osa_distance(text, word)
+        if distance <= min(allowed_distance(word), allowed_distance(text)) and (best is None or distance < best):
+            best = distance
+    return best
+
+
+def mutate(rng, word):
+    chars = list(word)
+    for _ in range(rng.randint(0, 3)):
+        position = rng.randrange(len(chars) + 1)
+        operation = rng.randrange(4)
+        if operation == 0 and position < len(chars):
+            chars[position] = rng.choice("abxz019")
+        elif operation == 1:
+            chars.insert(position, rng.choice("abxz019"))
+        elif operation == 2 and position < len(chars) and len(chars) > 4:
+            del chars[position]
+        elif operation == 3 and position + 1 < len(chars):
+            chars[position], chars[position + 1] = chars[position + 1], chars[position]
+    return "".join(chars)
+
+
+def random_word(rng, alphabet=string.ascii_lowercase + string.digits):
+    return "".join(rng.choice(alphabet) for _ in range(rng.randint(6, 10)))
+
+
+@pytest.mark.parametrize("a, b", [("password", "pasword"), ("password", "passwrod"), ("dragon", "dargno"),
+                                  ("monkey", "monkey12"), ("abc", "xyz"), ("qwerty", "qwerty")])
+def test_within_distance_matches_osa(a, b):
+    for limit in (0, 1, 2):
+        assert within_distance(a, b, limit) == (osa_distance(a, b) <= limit)
+
+
+def test_nearest_matches_brute_force(tmp_path):
+    rng = random.Random(1)
+    roots = ["password", "qwerty", "monkey", "dragon", "letmein", "shadow", "master", "iloveyou"]
+    words = list(dict.fromkeys(rng.choice(roots) + "".join(rng.choice("0123456789") for _ in range(rng.randint(0, 3)))
+                               if rng.random() < 0.7 else random_word(rng, "abcdefghijklmnop")
+                               for _ in range(2500)))
+    build_deletion_index(words, str(tmp_path / "list.didx"))
+    index = DeletionIndex(str(tmp_path / "list.didx"))
+    try:
+        for _ in range(200):
+            text = mutate(rng, rng.choice(words))
+            found = index.nearest(text)
+            expected = brute_force_nearest(text, words)
+            assert (found[1] if found else None) == expected, text
+            if found:
+                assert osa_distance(text, found[0]) == found[1]
+    finally:
+        index.close()
+
+
+def test_crc_collisions_are_not_reported(tmp_path):
+    # Con millones de registros de 32 bits, una consulta al azar comparte
+    # claves con palabras que no se le parecen en nada
+    rng = random.Random(7)
+    words = list(dict.fromkeys(random_word(rng) for _ in range(100_000)))
+    build_deletion_index(words, str(tmp_path / "large.didx"))
+    index = DeletionIndex(str(tmp_path / "large.didx"))
+    try:
+        for _ in range(3000):
+            text = random_word(rng) if rng.random() < 0.8 else mutate(rng, rng.choice(words))
+            found = index.nearest(text)
+            if found:
+                assert osa_distance(text, found[0]) == found[1], (text, found)
+    finally:
+        index.close()
@@ -0,0 +1,124 @@
+import math
+import random
+from itertools import product
+
+import pytest
+
+from modules import password_generator
+from modules.password_generator import (PassphrasePolicy, PasswordPolicy, RandomSource, chi_square_uniformity,
+                                        load_wordlist)
+
+
+@pytest.fixture
+def seeded_urandom(monkeypatch):
+    """os.urandom determinista, para que las pruebas estadísticas no fallen al azar"""
+    rng = random.Random(20240601)
+    monkeypatch.setattr(password_generator.os, "urandom", rng.randbytes)
+
+
+class SkewedSource(RandomSource):
+    """Fuente sesgada: el primer carácter del alfabeto sale el doble de veces"""
+
+    def symbols(self, alphabet, count):
+        return super().symbols(alphabet + alphabet[0], count)
+
+
+def tiny_policy(classes, length):
+    """Política con clases chicas (las reales son demasiado grandes para contar por fuerza bruta)"""
+    policy = PasswordPolicy()
+    policy.length = length
+    policy.classes = list(classes)
+    policy.alphabet = "".join(classes)
+    policy._class_sets = [frozenset(chars) for chars in classes]
+    return policy
+
+
+@pytest.mark.parametrize("classes, length", [
+    (["ab", "c"], 3),
+    (["ab", "c", "de"], 4),
+    (["a", "b", "c"], 5),
+    (["abc", "de", "f", "gh"], 5),
+])
+def test_count_matches_brute_force(classes, length):
+    policy = tiny_policy(classes, length)
+    valid = [text for text in map("".join, product(policy.alphabet, repeat=length)) if policy.accepts(text)]
+    assert policy.count() == len(valid)
+    assert policy.entropy() == pytest.approx(math.log2(len(valid)))
+    # Probabilidad de cada carácter en la primera posición
+    probabilities = policy.symbol_probabilities()
+    for char in policy.alphabet:
+        assert probabilities[char] == pytest.approx(sum(text[0] == char for text in valid) / len(valid))
+
+
+def test_default_policy_entropy():
+    policy = PasswordPolicy(length=12)
+    assert policy.count() < 94 ** 12
+    assert policy.entropy() == pytest.approx(math.log2(policy.count()))
+
+
+def test_chi_square_uniformity(seeded_urandom):
+    policy = tiny_policy(["abc", "de", "f"], 4)
+    statistic, df, critical = chi_square_uniformity(policy, 20_000, RandomSource())
+    assert df == len(policy.alphabet) - 1
+    assert statistic < critical
+    # Una fuente que favorece al primer carácter no pasa la prueba
+    statistic, _, critical = chi_square_uniformity(policy, 20_000, SkewedSource())
+    assert statistic > critical
+
+
+def test_generated_passwords_satisfy_policy(seeded_urandom):
+    policy = PasswordPolicy(length=10)
+    passwords = list(policy.generate(RandomSource(), 500))
+    assert len(passwords) == 500
+    assert all(len(password) == 10 and policy.accepts(password) for password in passwords)
+
+
+@pytest.mark.parametrize("words", [1, 3, 6])
+def test_passphrase_entropy(words):
+    wordlist = load_wordlist()
+    policy = PassphrasePolicy(words=words, capitalize=False, number=False)
+    assert policy.entropy() == words * math.log2(len(wordlist))
+    policy = PassphrasePolicy(words=words)
+    assert policy.entropy() == pytest.approx(words * math.log2(len(wordlist)) + words + math.log2(1000))
+
+
+def test_passphrase_wordlist_formats(tmp_path):
+    path = tmp_path / "words.txt"
+    path.write_text("11111\tabaco\n11112\tBarco\nbarco\ncasa-2\ndado\n", encoding="utf-8")
+    policy = PassphrasePolicy(words=2, capitalize=False, number=False, wordlist=str(path))
+    assert policy.wordlist == ("abaco", "barco", "dado")
+    assert policy.entropy() == 2 * math.log2(3)
+
+
+@pytest.mark.parametrize("n", [1, 2, 3, 10, 26, 94, 255, 256, 257, 1000, 7776, 65537, 2 ** 24 + 3])
+def test_below_stays_in_range(n, seeded_urandom):
+    source = RandomSource(buffer_size=256)
+    assert all(0 <= source.below(n) < n for _ in range(2000))
+
+
+def test_below_rejects_the_incomplete_cycle():
+    # Con n = 3 y un byte por muestra, 255 no completa un ciclo y se descarta
+    source = RandomSource()
+    feed = iter([b"\xff", b"\xff", b"\xfe"])
+    source._take = lambda size: next(feed)
+    assert source.below(3) == 254 % 3
+    # Con n = 1000 (dos bytes) el límite es 65000
+    source = RandomSource()
+    feed = iter([(65535).to_bytes(2, "big"), (65000).to_bytes(2, "big"), (64999).to_bytes(2, "big")])
+    source._take = lambda size: next(feed)
+    assert source.below(1000) == 64999 % 1000
+
+
+def test_symbols_drop_rejected_bytes():
+    source = RandomSource()
+    # Alfabeto de 3: los bytes 255 se descartan, el resto se reduce módulo 3
+    feed = iter([bytes([255, 0, 1, 255, 2, 3]) + bytes(64)])
+    source._take = lambda size: next(feed)
+    assert source.symbols("xyz", 4) == "xyzx"
+
+
+@pytest.mark.parametrize("alphabet", ["ab", "abc", "abcdefghij", "".join(map(chr, range(33, 127)))])
+def test_symbols_use_only_the_alphabet(alphabet, seeded_urandom):
+    text = RandomSource(buffer_size=64).symbols(alphabet, 20_000)
+    assert len(text) == 20_000
+    assert set(text) == set(alphabet)
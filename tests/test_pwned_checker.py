@@ -0,0 +1,214 @@
+import hashlib
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from modules import pwned_checker
+from modules.hibp_cache import RangeCache, valid_range
+from modules.hibp_client import HIBPClient
+from modules.pwned_offline import build_store
+
+PASSWORD = "password"
+SHA1 = hashlib.sha1(PASSWORD.encode()).hexdigest().upper()
+PREFIX, SUFFIX = SHA1[:5], SHA1[5:]
+VALID_BODY = f"0018A45C4D1DEF81644B54AB7F969B88D65:1\r\n{SUFFIX}:9545824\r\n"
+GARBAGE_BODY = "<html><body>Inicie sesión para usar la red Wi-Fi: acepte los términos</body></html>"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    body = GARBAGE_BODY
+
+    def do_GET(self):
+        data = type(self).body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_api(tmp_path):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    pwned_checker.configure_client(base_url=f"http://127.0.0.1:{server.server_port}", max_retries=0, timeout=5)
+    cache = pwned_checker.use_range_cache(str(tmp_path / "hibp"))
+    yield cache
+    pwned_checker.use_range_cache(None)
+    pwned_checker.configure_client()
+    server.shutdown()
+    server.server_close()
+
+
+def test_garbage_body_is_a_lookup_error(stub_api, monkeypatch):
+    monkeypatch.setattr(StubHandler, "body", GARBAGE_BODY)
+    assert pwned_checker.check_pwned_batch([PASSWORD, "otra"]) == [(False, -1), (False, -1)]
+    assert pwned_checker.check_pwned_password(PASSWORD) == (False, -1)
+    assert stub_api.get(PREFIX) is None
+    assert pwned_checker.get_client().errors >= 1
+
+
+def test_valid_body_is_cached(stub_api, monkeypatch):
+    monkeypatch.setattr(StubHandler, "body", VALID_BODY)
+    assert pwned_checker.check_pwned_batch([PASSWORD]) == [(True, 9545824)]
+    assert stub_api.get(PREFIX).splitlines() == VALID_BODY.splitlines()
+
+
+def test_cached_ranges_do_not_create_the_client(stub_api, monkeypatch):
+    monkeypatch.setattr(StubHandler, "body", VALID_BODY)
+    pwned_checker.check_pwned_batch([PASSWORD])
+    pwned_checker.configure_client(base_url="http://127.0.0.1:9", max_retries=0)
+    assert pwned_checker.check_pwned_batch([PASSWORD]) == [(True, 9545824)]
+    assert pwned_checker._client is None
+
+
+def test_cache_drops_invalid_entries(tmp_path):
+    cache = RangeCache(str(tmp_path))
+    with open(os.path.join(str(tmp_path), PREFIX + ".txt"), "w", encoding="ascii") as f:
+        f.write("<html></html>")
+    assert cache.get(PREFIX) is None
+    assert not os.path.exists(os.path.join(str(tmp_path), PREFIX + ".txt"))
+    with pytest.raises(ValueError):
+        cache.put(PREFIX, GARBAGE_BODY)
+
+
+@pytest.mark.parametrize("text, expected", [
+    (VALID_BODY, True),
+    (f"{SUFFIX}:0", True),
+    ("", False),
+    (GARBAGE_BODY, False),
+    (f"{SUFFIX}:abc", False),
+    (f"{SUFFIX[:-1]}:3", False),
+])
+def test_valid_range(text, expected):
+    assert valid_range(text) is expected
+
+
+class ScriptedHandler(BaseHTTPRequestHandler):
+    """Responde con la lista `script` de (código, cabeceras, cuerpo) y luego con VALID_BODY"""
+
+    protocol_version = "HTTP/1.1"
+    script = []
+    log = []
+    delay = 0.0
+    active = 0
+    max_active = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        cls = type(self)
+        with cls.lock:
+            cls.log.append(time.monotonic())
+            cls.active += 1
+            cls.max_active = max(cls.max_active, cls.active)
+            status, headers, body = cls.script.pop(0) if cls.script else (200, {}, VALID_BODY)
+        try:
+            time.sleep(cls.delay)
+            data = body.encode("utf-8")
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        finally:
+            with cls.lock:
+                cls.active -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def scripted_api(monkeypatch):
+    monkeypatch.setattr(ScriptedHandler, "script", [])
+    monkeypatch.setattr(ScriptedHandler, "log", [])
+    monkeypatch.setattr(ScriptedHandler, "max_active", 0)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ScriptedHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.parametrize("status", [429, 503])
+def test_retry_after_is_honored(scripted_api, status):
+    ScriptedHandler.script.append((status, {"Retry-After": "0.4"}, "Too Many Requests"))
+    client = HIBPClient(scripted_api, max_in_flight=8)
+    try:
+        assert client.fetch_range(PREFIX) == VALID_BODY
+        first, second = ScriptedHandler.log
+        assert second - first >= 0.4
+        assert client.throttled == 1 and client.errors == 0
+    finally:
+        client.close()
+
+
+def test_concurrency_limit_halves_and_recovers(scripted_api):
+    ScriptedHandler.script.extend([(429, {"Retry-After": "0"}, "")] * 2)
+    client = HIBPClient(scripted_api, max_in_flight=8)
+    try:
+        assert client.fetch_range(PREFIX) == VALID_BODY
+        # Dos 429: 8 -> 4 -> 2, y la respuesta correcta suma uno
+        assert client.throttled == 2
+        assert client.limit == 3
+        for expected in (4, 5, 6, 7, 8, 8):
+            client.fetch_range(PREFIX)
+            assert client.limit == expected
+    finally:
+        client.close()
+
+
+def test_requests_in_flight_are_bounded(scripted_api, monkeypatch):
+    monkeypatch.setattr(ScriptedHandler, "delay", 0.05)
+    client = HIBPClient(scripted_api, max_in_flight=3)
+    try:
+        prefixes = [f"{i:05X}" for i in range(24)]
+        ranges = client.fetch_ranges(prefixes)
+        assert list(ranges) == prefixes and all(text == VALID_BODY for text in ranges.values())
+        assert 1 < ScriptedHandler.max_active <= 3
+    finally:
+        client.close()
+
+
+def test_circuit_breaker_falls_back_to_offline_store(scripted_api, tmp_path):
+    dump = tmp_path / "pwned.txt"
+    dump.write_text(f"{SHA1}:42\n", encoding="utf-8")
+    build_store(str(dump), str(tmp_path / "pwned.bin"))
+    pwned_checker.configure_client(base_url=scripted_api, max_retries=0, breaker_threshold=3,
+                                   breaker_cooldown=0.3)
+    pwned_checker.use_offline_store(str(tmp_path / "pwned.bin"), fallback_only=True)
+    try:
+        client = pwned_checker.get_client()
+        ScriptedHandler.script.extend([(500, {}, "error")] * 4)
+
+        # Cerrado: cada fallo llega al servidor y se responde con el almacén offline
+        for attempt in range(3):
+            assert pwned_checker.check_pwned_batch([PASSWORD]) == [(True, 42)]
+        assert client.errors == 3 and client.breaker_open
+        # Abierto: no se usa la red
+        assert pwned_checker.check_pwned_batch([PASSWORD]) == [(True, 42)]
+        assert len(ScriptedHandler.log) == 3
+
+        # Semiabierto tras el enfriamiento: un fallo lo vuelve a abrir enseguida
+        time.sleep(0.35)
+        assert pwned_checker.check_pwned_batch([PASSWORD]) == [(True, 42)]
+        assert len(ScriptedHandler.log) == 4 and client.breaker_open
+
+        # Semiabierto otra vez: una respuesta correcta lo cierra
+        time.sleep(0.35)
+        assert pwned_checker.check_pwned_batch([PASSWORD]) == [(True, 9545824)]
+        assert len(ScriptedHandler.log) == 5 and not client.breaker_open
+        assert client._consecutive_failures == 0
+    finally:
+        pwned_checker.use_offline_store(None)
+        pwned_checker.configure_client()
@@ -0,0 +1,75 @@
+import io
+import json
+import re
+from html.parser import HTMLParser
+
+from modules.report import ReportWriter, generate_html_report
+
+
+def _result(password, nivel, comun=False, **extra):
+    return dict({"password": password, "score": 1, "nivel": nivel, "comun": comun, "entropia": 10.0,
+                 "patrones": [], "pwned_count": -1, "tiempo_crack_legible": "Instantáneo",
+                 "recomendaciones": []}, **extra)
+
+
+def _stats(html):
+    """Valores de las tarjetas de estadísticas, en orden"""
+    return [int(value) for value in re.findall(r"<h3>(\d+)</h3>", html)]
+
+
+def test_stat_cards_are_weighted_by_occurrences(tmp_path):
+    # Una fila por contraseña distinta, como las que genera la base de auditoría
+    rows = [
+        _result("blake2b:00", "Muy Débil", comun=True, ocurrencias=3, longitud=6),
+        _result("blake2b:01", "Fuerte", ocurrencias=1, longitud=14),
+    ]
+    buffer = io.StringIO()
+    summary_path = tmp_path / "summary.json"
+    with ReportWriter(output_html=buffer, output_summary=str(summary_path)) as writer:
+        for row in rows:
+            writer.write(row, row["ocurrencias"])
+
+    # Analizadas, fuertes, comprometidas, requieren atención, filas repetidas
+    assert _stats(buffer.getvalue()) == [4, 1, 3, 3, 2]
+    summary = json.loads(summary_path.read_text(encoding="utf-8"))
+    assert (summary["total"], summary["distinct"], summary["reused"], summary["common"]) == (4, 2, 2, 3)
+    assert summary["length"]["min"] == 6 and summary["length"]["max"] == 14
+
+
+def test_stat_cards_per_row(tmp_path):
+    # Sin base: una fila por aparición, 'ocurrencias' cuenta hasta ese punto
+    rows = [
+        _result("123456", "Muy Débil", ocurrencias=1),
+        _result("123456", "Muy Débil", ocurrencias=2),
+        _result("Tr0ub4dor&3xK", "Media", ocurrencias=1),
+    ]
+    buffer = io.StringIO()
+    with ReportWriter(output_html=buffer) as writer:
+        for row in rows:
+            writer.write(row)
+    assert _stats(buffer.getvalue()) == [3, 0, 0, 2, 1]
+
+
+def test_empty_html_report_is_a_document():
+    html = generate_html_report([])
+    assert "<!DOCTYPE html>" in html and html.rstrip().endswith("</html>")
+    assert _stats(html) == [0, 0, 0, 0, 0]
+
+    # Las etiquetas abiertas se cierran en orden
+    class Checker(HTMLParser):
+        VOID = {"meta", "br", "hr", "img", "input", "link"}
+
+        def __init__(self):
+            super().__init__()
+            self.stack = []
+
+        def handle_starttag(self, tag, attrs):
+            if tag not in self.VOID:
+                self.stack.append(tag)
+
+        def handle_endtag(self, tag):
+            assert self.stack and self.stack.pop() == tag
+
+    checker = Checker()
+    checker.feed(html)
+    assert checker.stack == []
@@ -0,0 +1,49 @@
+import math
+import random
+import string
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from modules.crack_time import estimate_crack_time
+from modules.pattern_detector import calculate_entropy
+from modules.evaluator import strength_score
+from modules.guess_estimator import estimate_guesses
+from modules.vector_scorer import score_batch
+
+
+def _corpus():
+    rng = random.Random(7)
+    alphabet = string.ascii_letters + string.digits + "!@#$ ñ€"
+    passwords = ["", "123456", "P@ssw0rd", "Tr0ub4dor&3", "correct horse battery staple",
+                 "ñandú2024", "qwertyuiop", "1985-02-11", "a" * 24]
+    passwords += ["".join(rng.choice(alphabet) for _ in range(rng.randint(1, 30))) for _ in range(500)]
+    return passwords
+
+
+def test_batch_matches_scalar_functions():
+    passwords = _corpus()
+    guesses = [estimate_guesses(password).log2_guesses for password in passwords]
+    metrics = score_batch(passwords, guesses)
+    for i, password in enumerate(passwords):
+        assert metrics["score"][i] == strength_score(password, None, guesses[i])
+        assert metrics["log2_crack_seconds"][i] == guesses[i] - math.log2(1e10)
+        assert metrics["crack_seconds"][i] == pytest.approx(estimate_crack_time(password), rel=1e-15)
+        assert metrics["entropy"][i] == calculate_entropy(password)
+
+
+def test_guesses_are_required():
+    passwords = ["P@ssw0rd", "xK9#mQ2$vL7!"]
+    guesses = [estimate_guesses(password).log2_guesses for password in passwords]
+    metrics = score_batch(passwords, guesses)
+    assert metrics["log2_guesses"].tolist() == guesses
+    with pytest.raises(ValueError):
+        score_batch(passwords, guesses[:1])
+    with pytest.raises(TypeError):
+        score_batch(passwords)
+
+
+def test_crack_seconds_overflow_is_inf():
+    metrics = score_batch(["x" * 300], [2000.0])
+    assert metrics["crack_seconds"][0] == math.inf
@@ -0,0 +1,69 @@
+import hashlib
+
+from modules import wordlist_index
+from modules.wordlist_index import WordlistIndex, WordlistSet, build_index, build_wordlist_index, open_wordlists
+
+WORDS = ["password", "Hunter2", "contraseña", "qwerty", "hunter2", "p4ssword", "dragon"]
+
+
+def test_build_and_lookup(tmp_path):
+    wordlist = tmp_path / "wl.txt"
+    wordlist.write_text("\n".join(WORDS) + "\n", encoding="utf-8")
+    wordlists = open_wordlists([str(wordlist)])
+    try:
+        index = wordlists.indexes[0]
+        # "Hunter2" y "hunter2" se normalizan a la misma entrada
+        assert len(index) == len(set(word.lower() for word in WORDS))
+        assert sorted(index.values()) == sorted(set(word.lower() for word in WORDS))
+        assert "PASSWORD" in wordlists and "contraseña" in index
+        assert "password1" not in wordlists
+        assert wordlists.matching_tags("dragon") == ["wl"]
+        # En el índice canónico las palabras con la misma forma quedan en el orden de la lista
+        assert wordlists.canonical[0].lookup("password") == ["password", "p4ssword"]
+    finally:
+        wordlists.close()
+
+
+def test_key_collisions_are_confirmed_with_the_value(tmp_path, monkeypatch):
+    # Con una clave de 4 bits casi todas las palabras chocan entre sí
+    monkeypatch.setattr(wordlist_index, "hash_key",
+                        lambda text: hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest()[0] >> 4)
+    path = tmp_path / "wl.idx"
+    build_index(((word, word) for word in ("alpha", "beta", "gamma")), str(path), "wl")
+    wordlists = WordlistSet([WordlistIndex(str(path))])
+    try:
+        candidates = [f"word{i}" for i in range(200)]
+        assert any(wordlist_index.hash_key(word) == wordlist_index.hash_key("alpha") for word in candidates)
+        assert not any(word in wordlists for word in candidates)
+        assert not any(wordlists.matching_tags(word) for word in candidates)
+        assert all(word in wordlists for word in ("alpha", "beta", "gamma"))
+    finally:
+        wordlists.close()
+
+
+def test_partitioned_build_matches_a_sorted_build(tmp_path):
+    words = [f"pw{i % 3000}" for i in range(5000)]
+    path = tmp_path / "big.idx"
+    assert build_index(((word, word) for word in words), str(path)) == 3000
+    index = WordlistIndex(str(path))
+    try:
+        keys = [index._key_at(i) for i in range(len(index))]
+        assert keys == sorted(keys)
+        assert sorted(index.values()) == sorted(set(words))
+        assert all(index.lookup(word) == [word] for word in ("pw0", "pw1234", "pw2999"))
+    finally:
+        index.close()
+    assert [p.name for p in tmp_path.iterdir()] == ["big.idx"]
+
+
+def test_rebuild_replaces_index(tmp_path):
+    wordlist = tmp_path / "wl.txt"
+    wordlist.write_text("alpha\n", encoding="utf-8")
+    path = build_wordlist_index(str(wordlist), near_miss=False)
+    wordlist.write_text("beta\n", encoding="utf-8")
+    build_wordlist_index(str(wordlist), near_miss=False)
+    index = WordlistIndex(str(path))
+    try:
+        assert "beta" in index and "alpha" not in index
+    finally:
+        index.close()